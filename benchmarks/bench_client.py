@@ -0,0 +1,86 @@
+"""Client throughput against the in-process simulator.
+
+The simulator adds no latency, so these measure SDK and httpx overhead per
+call at different levels of concurrency.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+from facevault import AsyncFaceVaultClient, FaceVaultClient
+from facevault.testing import FakeFaceVault
+from harness import benchmark
+
+
+BATCH = 64
+
+
+def _sync_bench(concurrency: int) -> None:
+    @contextlib.contextmanager
+    def setup(operation: str):
+        fake = FakeFaceVault(seed=0)
+        with contextlib.ExitStack() as stack:
+            client = stack.enter_context(FaceVaultClient("fv_test_bench", transport=fake.transport()))
+            session_id = client.create_session("bench").session_id
+            pool = stack.enter_context(ThreadPoolExecutor(max_workers=concurrency)) if concurrency > 1 else None
+
+            if operation == "create":
+                def call(i):
+                    return client.create_session(f"user-{i}")
+            else:
+                def call(_):
+                    return client.get_session(session_id)
+
+            def run():
+                if pool is None:
+                    for i in range(BATCH):
+                        call(i)
+                else:
+                    list(pool.map(call, range(BATCH)))
+
+            yield run
+
+    benchmark(f"client.sync.create_session.c{concurrency}", ops=BATCH, setup=True)(lambda: setup("create"))
+    benchmark(f"client.sync.get_session.c{concurrency}", ops=BATCH, setup=True)(lambda: setup("get"))
+
+
+def _async_bench(concurrency: int) -> None:
+    @contextlib.contextmanager
+    def setup(operation: str):
+        fake = FakeFaceVault(seed=0)
+        loop = asyncio.new_event_loop()
+        client = AsyncFaceVaultClient("fv_test_bench", transport=fake.async_transport())
+        try:
+            session_id = loop.run_until_complete(client.create_session("bench")).session_id
+
+            if operation == "create":
+                def call(i):
+                    return client.create_session(f"user-{i}")
+            else:
+                def call(_):
+                    return client.get_session(session_id)
+
+            async def bounded():
+                semaphore = asyncio.Semaphore(concurrency)
+
+                async def one(i):
+                    async with semaphore:
+                        await call(i)
+
+                await asyncio.gather(*(one(i) for i in range(BATCH)))
+
+            yield lambda: loop.run_until_complete(bounded())
+        finally:
+            loop.run_until_complete(client.close())
+            loop.close()
+
+    benchmark(f"client.async.create_session.c{concurrency}", ops=BATCH, setup=True)(lambda: setup("create"))
+    benchmark(f"client.async.get_session.c{concurrency}", ops=BATCH, setup=True)(lambda: setup("get"))
+
+
+for _concurrency in (1, 8, 32):
+    _sync_bench(_concurrency)
+    _async_bench(_concurrency)
@@ -0,0 +1,22 @@
+"""Cold import time of the package, in a fresh interpreter."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import time
+
+from harness import benchmark
+
+
+def _time_command(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True)
+    return time.perf_counter() - start
+
+
+@benchmark("import.facevault", kind="measure", unit="s")
+def import_time():
+    # Subtract interpreter startup so the result reflects the import alone.
+    baseline = min(_time_command("pass") for _ in range(3))
+    return min(_time_command("import facevault") for _ in range(3)) - baseline
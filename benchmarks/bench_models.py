@@ -0,0 +1,73 @@
+"""Model construction speed and memory footprint."""
+
+from __future__ import annotations
+
+import tracemalloc
+
+from facevault import SessionStatus
+from harness import benchmark
+
+
+FIELDS = {
+    "session_id": "sess_bench",
+    "status": "completed",
+    "steps": {"liveness": True, "document": True},
+    "face_match_passed": True,
+    "error": "",
+    "created_at": "2026-01-01T00:00:00Z",
+    "completed_at": "2026-01-01T00:05:00Z",
+    "trust_score": 85.0,
+    "trust_decision": "accept",
+    "require_poa": False,
+    "poa": None,
+    "anti_spoofing": {"score": 0.92, "passed": True},
+    "credential": None,
+}
+
+COUNT = 10_000
+
+
+@benchmark("models.session_status.construct")
+def construct():
+    SessionStatus(**FIELDS)
+
+
+@benchmark("models.session_status.bytes_per_instance", kind="measure", unit="bytes")
+def bytes_per_instance():
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    # Share nothing but interned strings, as instances built from separate responses would.
+    instances = [
+        SessionStatus(**{**FIELDS, "steps": dict(FIELDS["steps"]), "anti_spoofing": dict(FIELDS["anti_spoofing"])})
+        for _ in range(COUNT)
+    ]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del instances
+    return allocated / COUNT
+
+
+INSTANCE = SessionStatus(**FIELDS)
+ENCODED = INSTANCE.to_bytes()
+
+
+@benchmark("models.session_status.to_bytes")
+def to_bytes():
+    INSTANCE.to_bytes()
+
+
+@benchmark("models.session_status.from_bytes")
+def from_bytes():
+    SessionStatus.from_bytes(ENCODED)
+
+
+@benchmark("models.session_status.encoded_size", kind="measure", unit="bytes")
+def encoded_size():
+    return len(ENCODED)
+
+
+@benchmark("models.session_status.completed_at_epoch")
+def completed_at_epoch():
+    # Fresh instance each time: measures the first, parsing access (memoized across instances).
+    SessionStatus(**FIELDS).completed_at_epoch
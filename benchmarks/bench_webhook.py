@@ -0,0 +1,85 @@
+"""Webhook signature verification and event parsing."""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+
+from facevault import parse_event, verify_many, verify_signature
+from harness import benchmark
+
+
+SECRET = "whsec_bench"
+
+
+def _payload(large: bool) -> dict:
+    payload = {
+        "event": "verification.completed",
+        "session_id": "sess_bench",
+        "status": "completed",
+        "external_user_id": "user-42",
+        "face_match_passed": True,
+        "face_match_score": 0.95,
+        "anti_spoofing_score": 0.88,
+        "anti_spoofing_passed": True,
+        "completed_at": "2026-01-01T00:00:00Z",
+        "trust_score": 85.0,
+        "trust_decision": "accept",
+        "sanctions_hit": False,
+    }
+    if large:
+        payload["confirmed_data"] = {f"field_{i}": "x" * 64 for i in range(200)}
+        payload["document_check"] = {"checks": [{"name": f"check_{i}", "passed": True} for i in range(500)]}
+        payload["poa"] = {"status": "verified", "lines": ["123 Example Street"] * 100}
+    return payload
+
+
+def _signed(large: bool) -> tuple[bytes, str]:
+    body = json.dumps(_payload(large), separators=(",", ":"), sort_keys=True).encode()
+    return body, hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+
+SMALL_BODY, SMALL_SIG = _signed(large=False)
+LARGE_BODY, LARGE_SIG = _signed(large=True)
+# Same payload re-serialized with different key order and whitespace.
+SMALL_PRETTY = json.dumps(_payload(False), indent=2).encode()
+
+
+@benchmark("webhook.verify_signature.small")
+def verify_small():
+    verify_signature(SMALL_BODY, SMALL_SIG, SECRET)
+
+
+@benchmark("webhook.verify_signature.small_noncanonical")
+def verify_small_noncanonical():
+    verify_signature(SMALL_PRETTY, SMALL_SIG, SECRET)
+
+
+@benchmark("webhook.verify_signature.large")
+def verify_large():
+    verify_signature(LARGE_BODY, LARGE_SIG, SECRET)
+
+
+@benchmark("webhook.parse_event.small")
+def parse_small():
+    parse_event(SMALL_BODY)
+
+
+@benchmark("webhook.parse_event.large")
+def parse_large():
+    parse_event(LARGE_BODY)
+
+
+BATCH = [(SMALL_BODY, SMALL_SIG)] * 400 + [(LARGE_BODY, LARGE_SIG)] * 100
+
+
+@benchmark("webhook.verify_signature.loop_500", ops=len(BATCH))
+def verify_loop():
+    for body, signature in BATCH:
+        verify_signature(body, signature, SECRET)
+
+
+@benchmark("webhook.verify_many.batch_500", ops=len(BATCH))
+def verify_batch():
+    verify_many(BATCH, SECRET)
@@ -0,0 +1,129 @@
+"""Minimal benchmark harness: registration, timing, JSON results and comparison.
+
+Benchmarks are plain functions registered with :func:`benchmark`. A timing
+benchmark performs ``ops`` operations per call; the harness calls it
+repeatedly and reports the time per operation. A measurement benchmark
+(``kind="measure"``) returns a number directly, e.g. bytes per instance.
+Benchmarks that need resources register a context manager factory with
+``setup=True``: it is entered only when the benchmark runs, yields the
+function to time, and cleans up on exit.
+Every result has a ``value`` where lower is better, which is what the
+regression gate compares.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+
+@dataclass
+class Benchmark:
+    name: str
+    func: Callable
+    ops: int = 1
+    kind: str = "time"
+    unit: str = "s"
+    setup: bool = False
+
+
+REGISTRY: list[Benchmark] = []
+
+
+def benchmark(
+    name: str, *, ops: int = 1, kind: str = "time", unit: str | None = None, setup: bool = False
+) -> Callable:
+    """Register a benchmark function (or, with ``setup``, a context manager factory) under ``name``."""
+
+    def decorator(func: Callable) -> Callable:
+        REGISTRY.append(Benchmark(name, func, ops, kind, unit or ("s" if kind == "time" else ""), setup))
+        return func
+
+    return decorator
+
+
+def run_one(bench: Benchmark, *, min_time: float = 0.2, rounds: int = 5) -> dict:
+    """Run a single benchmark and return its result record."""
+    with bench.func() if bench.setup else contextlib.nullcontext(bench.func) as func:
+        return _measure(bench, func, min_time, rounds)
+
+
+def _measure(bench: Benchmark, func: Callable, min_time: float, rounds: int) -> dict:
+    if bench.kind == "measure":
+        samples = [float(func()) for _ in range(rounds)]
+        value = statistics.median(samples)
+        return {"unit": bench.unit, "value": value, "samples": samples}
+
+    # Warm up and pick a loop count that runs for at least min_time per round.
+    func()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    per_op = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        per_op.append((time.perf_counter() - start) / (loops * bench.ops))
+
+    median = statistics.median(per_op)
+    return {
+        "unit": "s",
+        "value": median,
+        "min": min(per_op),
+        "mean": statistics.fmean(per_op),
+        "stdev": statistics.stdev(per_op) if len(per_op) > 1 else 0.0,
+        "rounds": rounds,
+        "loops": loops,
+        "ops_per_sec": 1 / median if median else None,
+    }
+
+
+def environment() -> dict:
+    import facevault
+
+    return {
+        "facevault": facevault.__version__,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": time.time(),
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Return a description of every benchmark that regressed by more than ``threshold``."""
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not before.get("value"):
+            continue
+        change = result["value"] / before["value"] - 1
+        if change > threshold:
+            regressions.append(
+                f"{name}: {before['value']:.4g} -> {result['value']:.4g} {result['unit']} (+{change:.1%})"
+            )
+    return regressions
+
+
+def dump(results: dict, path: str | None) -> None:
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if path:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,64 @@
+"""Run the FaceVault SDK benchmark suite.
+
+Usage:
+    python benchmarks/run.py                          # run everything, print JSON
+    python benchmarks/run.py -k webhook -o new.json   # filter by name, write results
+    python benchmarks/run.py --compare old.json       # fail if anything regressed >10%
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import harness  # noqa: E402
+
+
+MODULES = ("bench_webhook", "bench_client", "bench_models", "bench_import")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", "--filter", help="Only run benchmarks whose name contains this string")
+    parser.add_argument("-o", "--output", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a previous JSON result")
+    parser.add_argument(
+        "--threshold", type=float, default=0.10,
+        help="Allowed slowdown before --compare fails, as a fraction (default: 0.10)",
+    )
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per round")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per benchmark")
+    args = parser.parse_args(argv)
+
+    for module in MODULES:
+        importlib.import_module(module)
+
+    results = {"environment": harness.environment(), "results": {}}
+    for bench in harness.REGISTRY:
+        if args.filter and args.filter not in bench.name:
+            continue
+        result = harness.run_one(bench, min_time=args.min_time, rounds=args.rounds)
+        results["results"][bench.name] = result
+        print(f"{bench.name:<50} {result['value']:.4g} {result['unit']}", file=sys.stderr)
+
+    harness.dump(results, args.output)
+
+    if args.compare:
+        import json
+
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = harness.compare(baseline, results, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
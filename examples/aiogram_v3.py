@@ -13,9 +13,11 @@ User flow:
     4. Webhook delivers result (aiogram v3 inline keyboard mode)
 """
 
+import asyncio
 import logging
 import os
 
+import anyio
 from aiogram import Bot, Dispatcher
 from aiogram.filters import Command
 from aiogram.types import (
@@ -25,7 +27,7 @@ from aiogram.types import (
     WebAppInfo,
 )
 
-from facevault import AsyncFaceVaultClient
+from facevault import AsyncFaceVaultClient, PrefetchPolicy, SQLiteSessionRegistry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -36,11 +38,18 @@ FACEVAULT_API_KEY = os.environ["FACEVAULT_API_KEY"]
 bot = Bot(token=BOT_TOKEN)
 dp = Dispatcher()
 
-fv = AsyncFaceVaultClient(api_key=FACEVAULT_API_KEY)
+# Remembers each user's sessions across restarts, so /check can find them.
+registry = SQLiteSessionRegistry("facevault_sessions.db")
+# /start creates a session in the background, so the /verify button appears instantly.
+fv = AsyncFaceVaultClient(api_key=FACEVAULT_API_KEY, registry=registry, prefetch=PrefetchPolicy(ttl=300))
+background_tasks: set = set()
 
 
 @dp.message(Command("start"))
 async def start(message: Message) -> None:
+    task = asyncio.create_task(fv.prefetch(str(message.from_user.id)))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
     await message.answer("Welcome! Use /verify to start identity verification.")
 
 
@@ -65,10 +74,22 @@ async def verify(message: Message) -> None:
 
 @dp.message(Command("check"))
 async def check(message: Message) -> None:
-    """Poll the most recent session (simplified — in production, store session_id)."""
+    """Report the status of the user's most recent session."""
+    # SQLite is blocking I/O; keep it off the event loop.
+    record = await anyio.to_thread.run_sync(registry.latest_for_user, str(message.from_user.id))
+    if record is None:
+        await message.answer("No session yet. Use /verify first.")
+        return
+
+    # Finished sessions are answered from the registry; only open ones hit the API.
+    if not record.is_terminal:
+        status = await fv.get_session(record.session_id)
+        record = await anyio.to_thread.run_sync(registry.get, status.session_id)
+
     await message.answer(
-        "Use webhooks to receive results automatically.\n"
-        "See the FaceVault docs for webhook setup."
+        f"Session: {record.session_id}\n"
+        f"Status: {record.status}\n"
+        f"Face match: {record.face_match_passed}"
     )
 
 
@@ -78,5 +99,4 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
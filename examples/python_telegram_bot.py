@@ -17,6 +17,7 @@ import json
 import logging
 import os
 
+import anyio
 from telegram import (
     KeyboardButton,
     ReplyKeyboardMarkup,
@@ -32,7 +33,7 @@ from telegram.ext import (
     filters,
 )
 
-from facevault import FaceVaultClient
+from facevault import FaceVaultBridge, SQLiteSessionRegistry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -40,7 +41,11 @@ logger = logging.getLogger(__name__)
 BOT_TOKEN = os.environ["BOT_TOKEN"]
 FACEVAULT_API_KEY = os.environ["FACEVAULT_API_KEY"]
 
-fv = FaceVaultClient(api_key=FACEVAULT_API_KEY)
+# Remembers each user's sessions across restarts, so /check can find them.
+registry = SQLiteSessionRegistry("facevault_sessions.db")
+# Handlers are async, so calls must not block the event loop: the bridge
+# routes them to an async client and returns awaitables inside handlers.
+fv = FaceVaultBridge(api_key=FACEVAULT_API_KEY, registry=registry)
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -52,10 +57,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 async def verify(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Create a FaceVault session and show the Mini App button."""
     user_id = str(update.effective_user.id)
-    session = fv.create_session(external_user_id=user_id)
-
-    # Store session_id for later lookup
-    context.user_data["session_id"] = session.session_id
+    session = await fv.create_session(external_user_id=user_id)  # recorded in the registry
 
     # Reply keyboard with web_app button — triggers sendData on completion
     keyboard = ReplyKeyboardMarkup(
@@ -94,16 +96,21 @@ async def handle_web_app_data(update: Update, context: ContextTypes.DEFAULT_TYPE
 
 async def check(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Poll session status (alternative to webhook/sendData)."""
-    session_id = context.user_data.get("session_id")
-    if not session_id:
+    # SQLite is blocking I/O; keep it off the event loop.
+    record = await anyio.to_thread.run_sync(registry.latest_for_user, str(update.effective_user.id))
+    if record is None:
         await update.message.reply_text("No active session. Use /verify first.")
         return
 
-    status = fv.get_session(session_id)
+    # Finished sessions are answered from the registry; only open ones hit the API.
+    if not record.is_terminal:
+        status = await fv.get_session(record.session_id)
+        record = await anyio.to_thread.run_sync(registry.get, status.session_id)
+
     await update.message.reply_text(
-        f"Session: {status.session_id}\n"
-        f"Status: {status.status}\n"
-        f"Face match: {status.face_match_passed}"
+        f"Session: {record.session_id}\n"
+        f"Status: {record.status}\n"
+        f"Face match: {record.face_match_passed}"
     )
 
 
@@ -4,20 +4,67 @@ __version__ = "1.0.0"
 
 from ._async_client import AsyncFaceVaultClient
 from ._client import FaceVaultClient
-from .exceptions import AuthError, FaceVaultError, NotFoundError, RateLimitError
+from .batching import EventBatcher
+from .bridge import FaceVaultBridge
+from .circuit import CircuitBreaker
+from .events import EventBus
+from .exceptions import (
+    AuthError,
+    CircuitOpenError,
+    DeadlineExceededError,
+    FaceVaultError,
+    LoopBlockingWarning,
+    NotFoundError,
+    PartialBatchError,
+    PayloadTooLargeError,
+    RateLimitError,
+)
+from .hedging import HedgePolicy
+from .lanes import LanePolicy
+from .metrics import ClientStats, MetricsHook, RequestMetrics
 from .models import Session, SessionStatus, WebhookEvent
-from .webhook import parse_event, verify_signature
+from .prefetch import PrefetchPolicy, UnusedPrefetch
+from .registry import InMemorySessionRegistry, SessionRecord, SessionRegistry, SQLiteSessionRegistry
+from .sweeper import AsyncSweeper, StatusChange, Sweeper
+from .tracing import Tracer
+from .webhook import StreamingVerifier, parse_event, verify_many, verify_signature
 
 __all__ = [
     "AsyncFaceVaultClient",
+    "AsyncSweeper",
     "AuthError",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "DeadlineExceededError",
+    "EventBatcher",
+    "EventBus",
+    "ClientStats",
+    "FaceVaultBridge",
     "FaceVaultClient",
     "FaceVaultError",
+    "HedgePolicy",
+    "InMemorySessionRegistry",
+    "LanePolicy",
+    "LoopBlockingWarning",
+    "MetricsHook",
     "NotFoundError",
+    "PartialBatchError",
+    "PayloadTooLargeError",
+    "PrefetchPolicy",
     "RateLimitError",
+    "RequestMetrics",
+    "SQLiteSessionRegistry",
     "Session",
+    "SessionRecord",
+    "SessionRegistry",
     "SessionStatus",
+    "StatusChange",
+    "StreamingVerifier",
+    "Sweeper",
+    "Tracer",
+    "UnusedPrefetch",
     "WebhookEvent",
     "parse_event",
+    "verify_many",
     "verify_signature",
 ]
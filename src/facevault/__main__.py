@@ -0,0 +1,24 @@
+"""Command-line entry point: ``python -m facevault <command>``."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from . import __version__, export, loadtest, server
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m facevault", description="FaceVault SDK tools.")
+    parser.add_argument("--version", action="version", version=f"facevault {__version__}")
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    subparsers.required = True
+    export.add_parser(subparsers)
+    loadtest.add_parser(subparsers)
+    server.add_parser(subparsers)
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
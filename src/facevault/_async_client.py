@@ -2,16 +2,37 @@
 
 from __future__ import annotations
 
+import functools
+import logging
+import math
+from typing import Sequence
+
+import anyio
+import anyio.to_thread
 import httpx
 
-from ._client import _validate_api_key, _validate_url
-from .exceptions import AuthError, FaceVaultError, NotFoundError, RateLimitError
+from ._client import _pool_limits, _validate_api_key, _validate_url
+from .circuit import CircuitBreaker
+from ._deadline import _Deadline
+from .exceptions import AuthError, DeadlineExceededError, FaceVaultError, NotFoundError, RateLimitError
+from .hedging import HedgePolicy, _Hedger
+from .lanes import BATCH, INTERACTIVE, LanePolicy, _AsyncLanes, _check_priority
+from .metrics import ClientStats, MetricsHook, _emit, _emit_circuit_state, _RequestTimer
 from .models import Session, SessionStatus
+from .prefetch import PrefetchPolicy, UnusedPrefetch, _Prefetcher
+from .registry import SessionRegistry
+from .tracing import Span, Tracer
+
 
+logger = logging.getLogger("facevault")
 
 _DEFAULT_BASE_URL = "https://api.facevault.id"
 _DEFAULT_WEBAPP_BASE = "https://app.facevault.id"
 
+# Timeouts that fire within this many seconds of the deadline are reported as DeadlineExceededError.
+_DEADLINE_SLACK = 0.01
+
+
 
 class AsyncFaceVaultClient:
     """Async client for the FaceVault verification API.
@@ -26,6 +47,30 @@ class AsyncFaceVaultClient:
         webapp_base: Webapp base URL for constructing ``webapp_url``.
             Defaults to ``https://app.facevault.id``. Must use HTTPS.
         timeout: Request timeout in seconds. Defaults to 15.
+        hooks: Optional :class:`~facevault.metrics.MetricsHook` instances
+            notified after every request.
+        tracer: Optional :class:`~facevault.tracing.Tracer`. When set, each
+            call produces a span with a child span per HTTP attempt, and
+            requests carry a W3C ``traceparent`` header.
+        transport: Optional httpx transport, e.g. a simulator from
+            :mod:`facevault.testing`.
+        hedge: Optional :class:`~facevault.hedging.HedgePolicy` enabling
+            hedged ``get_session`` requests to cut tail latency.
+        circuit_breaker: Optional :class:`~facevault.circuit.CircuitBreaker`.
+            While open, calls raise :class:`CircuitOpenError` immediately.
+        lanes: Optional :class:`~facevault.lanes.LanePolicy` scheduling
+            ``"interactive"`` and ``"batch"`` calls through separate
+            concurrency lanes over the shared pool and rate budget.
+        registry: Optional :class:`~facevault.registry.SessionRegistry`
+            that records every created session and ``get_session`` result.
+        prefetch: Optional :class:`~facevault.prefetch.PrefetchPolicy`
+            enabling :meth:`prefetch`.
+        body_offload_threshold: Response bodies of at least this many bytes
+            (or of unknown length) are streamed, then decompressed and
+            joined on a worker thread, where zlib runs without holding the
+            GIL. JSON decoding holds the GIL wherever it runs, so it stays
+            on the loop. ``None`` reads everything on the loop. Defaults to
+            256 KiB.
     """
 
     def __init__(
@@ -35,6 +80,15 @@ class AsyncFaceVaultClient:
         base_url: str = _DEFAULT_BASE_URL,
         webapp_base: str = _DEFAULT_WEBAPP_BASE,
         timeout: float = 15,
+        hooks: Sequence[MetricsHook] | None = None,
+        tracer: Tracer | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        hedge: HedgePolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        lanes: LanePolicy | None = None,
+        registry: SessionRegistry | None = None,
+        prefetch: PrefetchPolicy | None = None,
+        body_offload_threshold: int | None = 256 * 1024,
     ):
         _validate_api_key(api_key)
         self._api_key = api_key
@@ -44,7 +98,218 @@ class AsyncFaceVaultClient:
             base_url=self._base_url,
             headers={"X-FaceVault-Api-Key": api_key},
             timeout=timeout,
+            transport=transport,
+            limits=_pool_limits(lanes),
         )
+        self._stats = ClientStats()
+        self._hooks = (self._stats, *(hooks or ()))
+        self._tracer = tracer
+        self._breaker = circuit_breaker
+        self._registry = registry
+        self._lanes = _AsyncLanes(lanes) if lanes is not None else None
+        if circuit_breaker is not None:
+            circuit_breaker._subscribe(self._on_circuit_state)
+        self._hedger = _Hedger(hedge) if hedge is not None else None
+        self._prefetcher = _Prefetcher(prefetch, self._stats) if prefetch is not None else None
+        self._body_offload_threshold = body_offload_threshold
+
+    def stats(self) -> ClientStats:
+        """Return the built-in request counters and latency histograms."""
+        return self._stats
+
+    def _on_circuit_state(self, endpoint: str, old_state: str, new_state: str) -> None:
+        _emit_circuit_state(self._hooks, endpoint, old_state, new_state)
+
+    async def _request(
+        self,
+        operation: str,
+        method: str,
+        url: str,
+        endpoint: str,
+        *,
+        hedge: bool = False,
+        deadline: _Deadline | None = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Perform one logical API call, bounded by its deadline if one was given."""
+        if deadline is None:
+            return await self._guarded(operation, method, url, endpoint, hedge=hedge, **kwargs)
+        try:
+            remaining = deadline.check("before the call started")
+            with anyio.fail_after(remaining):
+                return await self._guarded(operation, method, url, endpoint, hedge=hedge, deadline=deadline, **kwargs)
+        except DeadlineExceededError:
+            self._stats.increment("deadline_exceeded")
+            raise
+        except (TimeoutError, httpx.TimeoutException) as exc:
+            if deadline.remaining() > _DEADLINE_SLACK:
+                raise
+            self._stats.increment("deadline_exceeded")
+            raise DeadlineExceededError(f"Deadline exceeded during {operation}") from exc
+
+    async def _guarded(
+        self, operation: str, method: str, url: str, endpoint: str, *, hedge: bool = False, **kwargs
+    ) -> httpx.Response:
+        """Perform one logical API call, guarded by the circuit breaker if configured."""
+        breaker = self._breaker
+        if breaker is None:
+            return await self._call(operation, method, url, endpoint, hedge=hedge, **kwargs)
+        probe = breaker._before(endpoint)
+        success = None
+        try:
+            response = await self._call(operation, method, url, endpoint, hedge=hedge, **kwargs)
+            # Judge speed by the HTTP attempt alone (``elapsed``), not by lane
+            # or rate-limit queueing, which says nothing about the API's health.
+            success = breaker._is_success(response.status_code, response.elapsed.total_seconds())
+            return response
+        except DeadlineExceededError:
+            raise
+        except Exception:
+            success = False
+            raise
+        finally:
+            breaker._after(endpoint, success, probe)
+
+    async def _call(
+        self, operation: str, method: str, url: str, endpoint: str, *, hedge: bool = False, **kwargs
+    ) -> httpx.Response:
+        """Perform one logical API call, tracing it if a tracer is configured."""
+        send = self._send_hedged if hedge and self._hedger is not None else self._send
+        if self._tracer is None:
+            return await send(method, url, endpoint, **kwargs)
+        with self._tracer.start_span(f"facevault.{operation}", attributes={
+            "http.request.method": method,
+            "facevault.endpoint": endpoint,
+        }) as span:
+            response = await send(method, url, endpoint, span=span, **kwargs)
+            span.set_attribute("http.response.status_code", response.status_code)
+            span.set_status("ok" if response.is_success else "error")
+            return response
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        *,
+        span: Span | None = None,
+        attempt: int = 0,
+        priority: str = INTERACTIVE,
+        deadline: _Deadline | None = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Send a single HTTP attempt, recording metrics for it."""
+        timer = _RequestTimer()
+        request = self._client.build_request(method, url, extensions={"trace": timer.atrace}, **kwargs)
+        attempt_span = None
+        if span is not None:
+            attempt_span = self._tracer.start_span(f"HTTP {method}", parent=span, attributes={
+                "http.request.method": method,
+                "url.path": request.url.path,
+                "facevault.attempt": attempt,
+            })
+            request.headers["traceparent"] = attempt_span.traceparent
+        response = None
+        error = None
+        admitted = False
+        try:
+            if self._lanes is not None:
+                timer.queue_wait = await self._lanes.acquire(priority, deadline)
+                admitted = True
+            if deadline is not None:
+                request.extensions["timeout"] = deadline.limit(self._client.timeout).as_dict()
+            streamed = await self._client.send(request, stream=True)
+            try:
+                response = await self._read(streamed)
+            finally:
+                with anyio.CancelScope(shield=True):
+                    await streamed.aclose()
+            timer.stamp_elapsed(response)
+            return response
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            if admitted:
+                self._lanes.release(priority)
+            _emit(self._hooks, timer.metrics(
+                method, endpoint, request, response, error, retries=attempt, priority=priority
+            ))
+            if attempt_span is not None:
+                if isinstance(error, anyio.get_cancelled_exc_class()):
+                    attempt_span.set_attribute("facevault.cancelled", True)
+                elif error is not None:
+                    attempt_span.record_exception(error)
+                else:
+                    attempt_span.set_attribute("http.response.status_code", response.status_code)
+                attempt_span.end()
+
+    async def _send_hedged(self, method: str, url: str, endpoint: str, **kwargs) -> httpx.Response:
+        """Send a request, racing a second copy if the first one is slow."""
+        hedger = self._hedger
+        hedger.started()
+        # Each attempt reports (number, response, error); the buffer never blocks a sender.
+        send_outcome, receive_outcome = anyio.create_memory_object_stream(2)
+
+        async def attempt(number: int) -> None:
+            start = anyio.current_time()
+            response = error = None
+            try:
+                response = await self._send(method, url, endpoint, attempt=number, **kwargs)
+            except Exception as exc:
+                error = exc
+            finally:
+                # Failed and cancelled attempts count too: a cancelled loser took at least
+                # this long, and leaving it out would bias the delay toward fast responses.
+                hedger.observe(anyio.current_time() - start)
+            send_outcome.send_nowait((number, response, error))
+
+        with send_outcome, receive_outcome:
+            async with anyio.create_task_group() as tasks:
+                tasks.start_soon(attempt, 0)
+                outcome = None
+                with anyio.move_on_after(hedger.delay()):
+                    outcome = await receive_outcome.receive()
+                if outcome is None:
+                    if not hedger.try_acquire():
+                        self._stats.increment("hedges_over_budget")
+                        outcome = await receive_outcome.receive()
+                    else:
+                        self._stats.increment("hedges_sent")
+                        tasks.start_soon(attempt, 1)
+                        outcome = await receive_outcome.receive()
+                        if outcome[2] is not None:
+                            # Prefer a successful attempt; only surface an error once both have failed.
+                            other = await receive_outcome.receive()
+                            if other[2] is None or other[0] == 0:
+                                outcome = other
+                        if outcome[0] == 1 and outcome[2] is None:
+                            self._stats.increment("hedges_won")
+                # The losing attempt, if any, is cancelled when the task group exits.
+                tasks.cancel_scope.cancel()
+        _, response, error = outcome
+        if error is not None:
+            raise error
+        return response
+
+    async def _read(self, response: httpx.Response) -> httpx.Response:
+        """Read a streamed response's body, decompressing it off the event loop if it is large.
+
+        Returns ``response`` itself once read, or a read copy of it. Counts
+        bodies handed to a worker thread (``body_offloaded``).
+        """
+        threshold = self._body_offload_threshold
+        length = response.headers.get("Content-Length", "")
+        if response.is_stream_consumed or threshold is None or (length.isdigit() and int(length) < threshold):
+            await response.aread()
+            return response
+        # Only collect the raw chunks here; decompressing and joining a large
+        # body is left to the worker thread along with everything else.
+        chunks = [chunk async for chunk in response.aiter_raw()]
+        self._stats.increment("body_offloaded")
+        buffered = await anyio.to_thread.run_sync(_buffered, response, chunks)
+        buffered.elapsed = response.elapsed
+        return buffered
 
     def _raise_for_status(self, response: httpx.Response) -> None:
         if response.is_success:
@@ -68,22 +333,62 @@ class AsyncFaceVaultClient:
         else:
             raise FaceVaultError(msg, status_code=response.status_code)
 
-    async def create_session(self, external_user_id: str, *, require_poa: bool | None = None) -> Session:
+    async def create_session(
+        self,
+        external_user_id: str,
+        *,
+        require_poa: bool | None = None,
+        priority: str = INTERACTIVE,
+        timeout: float | None = None,
+        deadline: float | None = None,
+    ) -> Session:
         """Create a new verification session.
 
         Args:
             external_user_id: Your user identifier (e.g. Telegram chat ID).
             require_poa: If True, require proof-of-address during verification.
+            priority: ``"interactive"`` (default) or ``"batch"``; see
+                :mod:`facevault.lanes`.
+            timeout: Total time budget for this call in seconds, shared by
+                queueing, rate limiting, connection pool waits and the
+                request itself.
+            deadline: Absolute Unix timestamp (as from ``time.time()``) by
+                which the call must finish. If both are given, the earlier
+                limit applies.
 
         Returns:
             Session with ``session_id``, ``session_token``, and ``webapp_url``.
+
+        Raises:
+            DeadlineExceededError: If the budget is already spent, cannot be
+                met, or runs out during the call.
         """
+        _check_priority(priority)
+        budget = _Deadline.from_args(timeout, deadline)
+        if self._prefetcher is not None:
+            session = await self._prefetcher.take(
+                (external_user_id, require_poa), math.inf if budget is None else budget.remaining()
+            )
+            if session is not None:
+                self._stats.increment("prefetch_hits")
+                return session
+            self._stats.increment("prefetch_misses")
+        return await self._create_session(external_user_id, require_poa, priority, budget)
+
+    async def _create_session(
+        self, external_user_id: str, require_poa: bool | None, priority: str, deadline: _Deadline | None
+    ) -> Session:
         params = {"external_user_id": external_user_id}
         if require_poa is not None:
             params["require_poa"] = str(require_poa).lower()
-        response = await self._client.post(
+        response = await self._request(
+            "create_session",
+            "POST",
+            "/api/v1/sessions",
             "/api/v1/sessions",
             params=params,
+            priority=priority,
+            deadline=deadline,
         )
         self._raise_for_status(response)
         data = response.json()
@@ -91,30 +396,106 @@ class AsyncFaceVaultClient:
         session_id = data["session_id"]
         session_token = data.get("session_token", "")
 
-        return Session(
+        session = Session(
             session_id=session_id,
             session_token=session_token,
             steps=data.get("steps", []),
             webapp_url=f"{self._webapp_base}/?sid={session_id}&st={session_token}",
             challenge_nonce=data.get("challenge_nonce"),
         )
+        if self._registry is not None:
+            # Registry writes block (SQLite commits), so keep them off the event loop.
+            await anyio.to_thread.run_sync(functools.partial(self._registry.record_session, session, external_user_id))
+        return session
 
-    async def get_session(self, session_id: str) -> SessionStatus:
+    async def prefetch(self, external_user_id: str, *, require_poa: bool | None = None) -> bool:
+        """Create a session for ``external_user_id`` ahead of ``create_session``.
+
+        Call this when the user is likely to verify soon, as a background
+        task (e.g. ``asyncio.create_task(...)`` or ``nursery.start_soon(...)``)
+        so it doesn't delay your reply. The next ``create_session`` for the
+        same user and ``require_poa`` returns this session immediately, or
+        waits for it if it is still being created. Uses the ``"batch"``
+        priority lane. Does nothing if a session is already prefetched or
+        being prefetched for the user.
+
+        Args:
+            external_user_id: Your user identifier (e.g. Telegram chat ID).
+            require_poa: Must match the later ``create_session`` call.
+
+        Returns:
+            True if a session is prefetched for the user. Errors are logged
+            and counted (``prefetch_failed``) rather than raised.
+
+        Raises:
+            RuntimeError: If the client was created without ``prefetch=``.
+        """
+        prefetcher = self._prefetcher
+        if prefetcher is None:
+            raise RuntimeError("Prefetching is disabled; pass prefetch=PrefetchPolicy() to the client")
+        key = (external_user_id, require_poa)
+        slot = prefetcher.begin(key)
+        if slot is None:
+            return True
+        self._stats.increment("prefetch_started")
+        session = None
+        try:
+            session = await self._create_session(external_user_id, require_poa, BATCH, None)
+        except Exception as exc:
+            self._stats.increment("prefetch_failed")
+            logger.warning("Prefetching a session for %s failed: %s", external_user_id, exc)
+        finally:
+            prefetcher.finish(key, slot, session)
+        return session is not None
+
+    def unused_prefetches(self) -> list[UnusedPrefetch]:
+        """Return, and forget, the prefetched sessions that went unused since the last call."""
+        return self._prefetcher.unused() if self._prefetcher is not None else []
+
+    async def get_session(
+        self,
+        session_id: str,
+        *,
+        priority: str = INTERACTIVE,
+        timeout: float | None = None,
+        deadline: float | None = None,
+    ) -> SessionStatus:
         """Get the status of a verification session.
 
         Args:
             session_id: The session ID returned by ``create_session()``.
+            priority: ``"interactive"`` (default) or ``"batch"``; see
+                :mod:`facevault.lanes`.
+            timeout: Total time budget for this call in seconds, shared by
+                queueing, rate limiting, connection pool waits and the
+                request itself.
+            deadline: Absolute Unix timestamp (as from ``time.time()``) by
+                which the call must finish. If both are given, the earlier
+                limit applies.
 
         Returns:
             SessionStatus with current state and results.
+
+        Raises:
+            DeadlineExceededError: If the budget is already spent, cannot be
+                met, or runs out during the call.
         """
         if not session_id or "/" in session_id or ".." in session_id:
             raise ValueError("Invalid session_id")
-        response = await self._client.get(f"/api/v1/sessions/{session_id}")
+        _check_priority(priority)
+        response = await self._request(
+            "get_session",
+            "GET",
+            f"/api/v1/sessions/{session_id}",
+            "/api/v1/sessions/{session_id}",
+            hedge=True,
+            priority=priority,
+            deadline=_Deadline.from_args(timeout, deadline),
+        )
         self._raise_for_status(response)
         data = response.json()
 
-        return SessionStatus(
+        status = SessionStatus(
             session_id=data["session_id"],
             status=data["status"],
             steps=data.get("steps", {}),
@@ -129,9 +510,16 @@ class AsyncFaceVaultClient:
             anti_spoofing=data.get("anti_spoofing"),
             credential=data.get("credential"),
         )
+        if self._registry is not None:
+            await anyio.to_thread.run_sync(self._registry.record_status, status)
+        return status
 
     async def close(self) -> None:
         """Close the underlying HTTP client."""
+        if self._breaker is not None:
+            self._breaker._unsubscribe(self._on_circuit_state)
+        if self._prefetcher is not None:
+            self._prefetcher.close()
         await self._client.aclose()
 
     def __repr__(self) -> str:
@@ -142,3 +530,14 @@ class AsyncFaceVaultClient:
 
     async def __aexit__(self, *args: object) -> None:
         await self.close()
+
+
+def _buffered(response: httpx.Response, chunks: list[bytes]) -> httpx.Response:
+    """A read copy of a streamed ``response`` whose raw body arrived as ``chunks``."""
+    return httpx.Response(
+        response.status_code,
+        headers=response.headers,
+        content=b"".join(chunks),
+        request=response.request,
+        extensions=response.extensions,
+    )
@@ -2,15 +2,39 @@
 
 from __future__ import annotations
 
+import asyncio
+import os
+import sys
+import time
+import warnings
+import weakref
+from typing import Sequence
+
 import httpx
 
-from .exceptions import AuthError, FaceVaultError, NotFoundError, RateLimitError
+from .circuit import CircuitBreaker
+from ._deadline import _Deadline, _DeadlineStream
+from .exceptions import (
+    AuthError,
+    DeadlineExceededError,
+    FaceVaultError,
+    LoopBlockingWarning,
+    NotFoundError,
+    RateLimitError,
+)
+from .lanes import INTERACTIVE, LanePolicy, _SyncLanes, _check_priority
+from .metrics import ClientStats, MetricsHook, _emit, _emit_circuit_state, _RequestTimer
 from .models import Session, SessionStatus
+from .registry import SessionRegistry
+from .tracing import Span, Tracer
 
 
 _DEFAULT_BASE_URL = "https://api.facevault.id"
 _DEFAULT_WEBAPP_BASE = "https://app.facevault.id"
 
+# Timeouts that fire within this many seconds of the deadline are reported as DeadlineExceededError.
+_DEADLINE_SLACK = 0.01
+
 
 def _validate_url(url: str, label: str) -> str:
     """Validate a URL uses HTTPS. Returns the cleaned URL."""
@@ -23,6 +47,48 @@ def _validate_url(url: str, label: str) -> str:
     return url
 
 
+def _pool_limits(lanes: LanePolicy | None) -> httpx.Limits:
+    """Size the connection pool to match the lane policy, if any."""
+    if lanes is None:
+        return httpx.Limits()
+    return httpx.Limits(
+        max_connections=lanes.max_concurrency,
+        max_keepalive_connections=lanes.max_concurrency,
+    )
+
+
+_live_clients: weakref.WeakSet[FaceVaultClient] = weakref.WeakSet()
+
+
+def _after_fork_in_child() -> None:
+    for client in list(_live_clients):
+        client._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _current_loop() -> object | None:
+    """The asyncio loop, or the trio run (as its token), running in this thread."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    trio = sys.modules.get("trio")  # only imported if the application uses it
+    if trio is not None:
+        try:
+            return trio.lowlevel.current_trio_token()
+        except RuntimeError:
+            pass
+    return None
+
+
+def _loop_running() -> bool:
+    """True if an asyncio or trio event loop is running in this thread."""
+    return _current_loop() is not None
+
+
 def _validate_api_key(api_key: str) -> None:
     """Validate the API key is non-empty."""
     if not api_key or not api_key.strip():
@@ -32,6 +98,13 @@ def _validate_api_key(api_key: str) -> None:
 class FaceVaultClient:
     """Synchronous client for the FaceVault verification API.
 
+    One client can be shared by any number of threads: requests share its
+    connection pool, and its stats, circuit breaker and lanes are
+    synchronized. It is also safe to create before ``os.fork()`` (e.g. at
+    import time in a Gunicorn prefork worker): the child process gets a
+    fresh connection pool instead of reusing the parent's sockets, and fresh
+    stats. A custom ``transport`` is kept as-is in the child.
+
     Args:
         api_key: Your FaceVault API key (``fv_live_...`` or ``fv_test_...``).
         base_url: API base URL. Defaults to ``https://api.facevault.id``.
@@ -39,6 +112,20 @@ class FaceVaultClient:
         webapp_base: Webapp base URL for constructing ``webapp_url``.
             Defaults to ``https://app.facevault.id``. Must use HTTPS.
         timeout: Request timeout in seconds. Defaults to 15.
+        hooks: Optional :class:`~facevault.metrics.MetricsHook` instances
+            notified after every request.
+        tracer: Optional :class:`~facevault.tracing.Tracer`. When set, each
+            call produces a span with a child span per HTTP attempt, and
+            requests carry a W3C ``traceparent`` header.
+        transport: Optional httpx transport, e.g. a simulator from
+            :mod:`facevault.testing`.
+        circuit_breaker: Optional :class:`~facevault.circuit.CircuitBreaker`.
+            While open, calls raise :class:`CircuitOpenError` immediately.
+        lanes: Optional :class:`~facevault.lanes.LanePolicy` scheduling
+            ``"interactive"`` and ``"batch"`` calls through separate
+            concurrency lanes over the shared pool and rate budget.
+        registry: Optional :class:`~facevault.registry.SessionRegistry`
+            that records every created session and ``get_session`` result.
     """
 
     def __init__(
@@ -48,16 +135,206 @@ class FaceVaultClient:
         base_url: str = _DEFAULT_BASE_URL,
         webapp_base: str = _DEFAULT_WEBAPP_BASE,
         timeout: float = 15,
+        hooks: Sequence[MetricsHook] | None = None,
+        tracer: Tracer | None = None,
+        transport: httpx.BaseTransport | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        lanes: LanePolicy | None = None,
+        registry: SessionRegistry | None = None,
     ):
         _validate_api_key(api_key)
         self._api_key = api_key
         self._base_url = _validate_url(base_url, "base_url")
         self._webapp_base = _validate_url(webapp_base, "webapp_base")
-        self._client = httpx.Client(
-            base_url=self._base_url,
-            headers={"X-FaceVault-Api-Key": api_key},
-            timeout=timeout,
-        )
+        self._http_options = {
+            "base_url": self._base_url,
+            "headers": {"X-FaceVault-Api-Key": api_key},
+            "timeout": timeout,
+            "transport": transport,
+            "limits": _pool_limits(lanes),
+        }
+        self._client = httpx.Client(**self._http_options)
+        self._stats = ClientStats()
+        self._hooks = (self._stats, *(hooks or ()))
+        self._tracer = tracer
+        self._breaker = circuit_breaker
+        self._registry = registry
+        self._lane_policy = lanes
+        self._lanes = _SyncLanes(lanes) if lanes is not None else None
+        if circuit_breaker is not None:
+            circuit_breaker._subscribe(self._on_circuit_state)
+        _live_clients.add(self)
+
+    def _after_fork(self) -> None:
+        """Reset per-process state in a forked child."""
+        if self._client.is_closed:
+            return
+        # The inherited pool's sockets are still in use by the parent. Drop it
+        # without close(): nothing must be read from or written to them here.
+        self._client = httpx.Client(**self._http_options)
+        self._stats._after_fork()
+        if self._breaker is not None:
+            self._breaker._after_fork()
+        if self._lane_policy is not None:
+            self._lanes = _SyncLanes(self._lane_policy)
+
+    def stats(self) -> ClientStats:
+        """Return the built-in request counters and latency histograms."""
+        return self._stats
+
+    def _on_circuit_state(self, endpoint: str, old_state: str, new_state: str) -> None:
+        _emit_circuit_state(self._hooks, endpoint, old_state, new_state)
+
+    def _request(
+        self, operation: str, method: str, url: str, endpoint: str, **kwargs
+    ) -> httpx.Response:
+        """Perform one logical API call, warning if it blocks a running event loop."""
+        if not _loop_running():
+            return self._bounded(operation, method, url, endpoint, **kwargs)
+        start = time.perf_counter()
+        try:
+            return self._bounded(operation, method, url, endpoint, **kwargs)
+        finally:
+            self._stats.increment("loop_blocking_calls")
+            warnings.warn(
+                f"FaceVaultClient.{operation}() blocked the running event loop for "
+                f"{(time.perf_counter() - start) * 1000:.0f} ms; use AsyncFaceVaultClient "
+                "or facevault.bridge.FaceVaultBridge in async code",
+                LoopBlockingWarning,
+                stacklevel=3,
+            )
+
+    def _bounded(
+        self,
+        operation: str,
+        method: str,
+        url: str,
+        endpoint: str,
+        *,
+        deadline: _Deadline | None = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Perform one logical API call, bounded by its deadline if one was given."""
+        if deadline is None:
+            return self._guarded(operation, method, url, endpoint, **kwargs)
+        try:
+            deadline.check("before the call started")
+            return self._guarded(operation, method, url, endpoint, deadline=deadline, **kwargs)
+        except DeadlineExceededError:
+            self._stats.increment("deadline_exceeded")
+            raise
+        except httpx.TimeoutException as exc:
+            if deadline.remaining() > _DEADLINE_SLACK:
+                raise
+            self._stats.increment("deadline_exceeded")
+            raise DeadlineExceededError(f"Deadline exceeded during {operation}") from exc
+
+    def _guarded(
+        self, operation: str, method: str, url: str, endpoint: str, **kwargs
+    ) -> httpx.Response:
+        """Perform one logical API call, guarded by the circuit breaker if configured."""
+        breaker = self._breaker
+        if breaker is None:
+            return self._call(operation, method, url, endpoint, **kwargs)
+        probe = breaker._before(endpoint)
+        success = None
+        try:
+            response = self._call(operation, method, url, endpoint, **kwargs)
+            # Judge speed by the HTTP attempt alone (``elapsed``), not by lane
+            # or rate-limit queueing, which says nothing about the API's health.
+            success = breaker._is_success(response.status_code, response.elapsed.total_seconds())
+            return response
+        except DeadlineExceededError:
+            raise
+        except Exception:
+            success = False
+            raise
+        finally:
+            breaker._after(endpoint, success, probe)
+
+    def _call(
+        self, operation: str, method: str, url: str, endpoint: str, **kwargs
+    ) -> httpx.Response:
+        """Perform one logical API call, tracing it if a tracer is configured."""
+        if self._tracer is None:
+            return self._send(method, url, endpoint, **kwargs)
+        with self._tracer.start_span(f"facevault.{operation}", attributes={
+            "http.request.method": method,
+            "facevault.endpoint": endpoint,
+        }) as span:
+            response = self._send(method, url, endpoint, span=span, **kwargs)
+            span.set_attribute("http.response.status_code", response.status_code)
+            span.set_status("ok" if response.is_success else "error")
+            return response
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        *,
+        span: Span | None = None,
+        attempt: int = 0,
+        priority: str = INTERACTIVE,
+        deadline: _Deadline | None = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Send a single HTTP attempt, recording metrics for it."""
+        timer = _RequestTimer()
+        request = self._client.build_request(method, url, extensions={"trace": timer.trace}, **kwargs)
+        attempt_span = None
+        if span is not None:
+            attempt_span = self._tracer.start_span(f"HTTP {method}", parent=span, attributes={
+                "http.request.method": method,
+                "url.path": request.url.path,
+                "facevault.attempt": attempt,
+            })
+            request.headers["traceparent"] = attempt_span.traceparent
+        response = None
+        error = None
+        admitted = False
+        try:
+            if self._lanes is not None:
+                timer.queue_wait = self._lanes.acquire(priority, deadline)
+                admitted = True
+            if deadline is None:
+                response = self._client.send(request)
+            else:
+                request.extensions["timeout"] = deadline.limit(self._client.timeout).as_dict()
+                response = self._send_within(request, deadline)
+            timer.stamp_elapsed(response)
+            return response
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            if admitted:
+                self._lanes.release(priority)
+            _emit(self._hooks, timer.metrics(
+                method, endpoint, request, response, error, retries=attempt, priority=priority
+            ))
+            if attempt_span is not None:
+                if error is not None:
+                    attempt_span.record_exception(error)
+                else:
+                    attempt_span.set_attribute("http.response.status_code", response.status_code)
+                attempt_span.end()
+
+    def _send_within(self, request: httpx.Request, deadline: _Deadline) -> httpx.Response:
+        """Send ``request``, checking ``deadline`` after the headers and each body chunk.
+
+        httpx applies its timeouts per network read, so a body that trickles
+        in could otherwise run far past the budget. A single read can still
+        overrun by up to the read timeout it started with.
+        """
+        response = self._client.send(request, stream=True)
+        try:
+            deadline.check("while waiting for the response")
+            response.stream = _DeadlineStream(response.stream, deadline)
+            response.read()
+        finally:
+            response.close()
+        return response
 
     def _raise_for_status(self, response: httpx.Response) -> None:
         if response.is_success:
@@ -82,22 +359,48 @@ class FaceVaultClient:
         else:
             raise FaceVaultError(msg, status_code=response.status_code)
 
-    def create_session(self, external_user_id: str, *, require_poa: bool | None = None) -> Session:
+    def create_session(
+        self,
+        external_user_id: str,
+        *,
+        require_poa: bool | None = None,
+        priority: str = INTERACTIVE,
+        timeout: float | None = None,
+        deadline: float | None = None,
+    ) -> Session:
         """Create a new verification session.
 
         Args:
             external_user_id: Your user identifier (e.g. Telegram chat ID).
             require_poa: If True, require proof-of-address during verification.
+            priority: ``"interactive"`` (default) or ``"batch"``; see
+                :mod:`facevault.lanes`.
+            timeout: Total time budget for this call in seconds, shared by
+                queueing, rate limiting, connection pool waits and the
+                request itself.
+            deadline: Absolute Unix timestamp (as from ``time.time()``) by
+                which the call must finish. If both are given, the earlier
+                limit applies.
 
         Returns:
             Session with ``session_id``, ``session_token``, and ``webapp_url``.
+
+        Raises:
+            DeadlineExceededError: If the budget is already spent, cannot be
+                met, or runs out during the call.
         """
+        _check_priority(priority)
         params = {"external_user_id": external_user_id}
         if require_poa is not None:
             params["require_poa"] = str(require_poa).lower()
-        response = self._client.post(
+        response = self._request(
+            "create_session",
+            "POST",
+            "/api/v1/sessions",
             "/api/v1/sessions",
             params=params,
+            priority=priority,
+            deadline=_Deadline.from_args(timeout, deadline),
         )
         self._raise_for_status(response)
         data = response.json()
@@ -105,30 +408,60 @@ class FaceVaultClient:
         session_id = data["session_id"]
         session_token = data.get("session_token", "")
 
-        return Session(
+        session = Session(
             session_id=session_id,
             session_token=session_token,
             steps=data.get("steps", []),
             webapp_url=f"{self._webapp_base}/?sid={session_id}&st={session_token}",
             challenge_nonce=data.get("challenge_nonce"),
         )
+        if self._registry is not None:
+            self._registry.record_session(session, external_user_id)
+        return session
 
-    def get_session(self, session_id: str) -> SessionStatus:
+    def get_session(
+        self,
+        session_id: str,
+        *,
+        priority: str = INTERACTIVE,
+        timeout: float | None = None,
+        deadline: float | None = None,
+    ) -> SessionStatus:
         """Get the status of a verification session.
 
         Args:
             session_id: The session ID returned by ``create_session()``.
+            priority: ``"interactive"`` (default) or ``"batch"``; see
+                :mod:`facevault.lanes`.
+            timeout: Total time budget for this call in seconds, shared by
+                queueing, rate limiting, connection pool waits and the
+                request itself.
+            deadline: Absolute Unix timestamp (as from ``time.time()``) by
+                which the call must finish. If both are given, the earlier
+                limit applies.
 
         Returns:
             SessionStatus with current state and results.
+
+        Raises:
+            DeadlineExceededError: If the budget is already spent, cannot be
+                met, or runs out during the call.
         """
         if not session_id or "/" in session_id or ".." in session_id:
             raise ValueError("Invalid session_id")
-        response = self._client.get(f"/api/v1/sessions/{session_id}")
+        _check_priority(priority)
+        response = self._request(
+            "get_session",
+            "GET",
+            f"/api/v1/sessions/{session_id}",
+            "/api/v1/sessions/{session_id}",
+            priority=priority,
+            deadline=_Deadline.from_args(timeout, deadline),
+        )
         self._raise_for_status(response)
         data = response.json()
 
-        return SessionStatus(
+        status = SessionStatus(
             session_id=data["session_id"],
             status=data["status"],
             steps=data.get("steps", {}),
@@ -143,9 +476,15 @@ class FaceVaultClient:
             anti_spoofing=data.get("anti_spoofing"),
             credential=data.get("credential"),
         )
+        if self._registry is not None:
+            self._registry.record_status(status)
+        return status
 
     def close(self) -> None:
         """Close the underlying HTTP client."""
+        if self._breaker is not None:
+            self._breaker._unsubscribe(self._on_circuit_state)
+        _live_clients.discard(self)
         self._client.close()
 
     def __repr__(self) -> str:
@@ -0,0 +1,143 @@
+"""Compact, versioned binary encoding for the SDK models.
+
+Layout (little-endian)::
+
+    header   B version, B type tag, B flags, B field count,
+             I presence bitmap, I boolean bitmap
+    payload  for each present, non-boolean field in declaration order:
+               float fields:        d
+               str/time/json fields: I byte length + UTF-8 bytes
+
+Fields are only ever appended to a model, so a reader that knows fewer fields
+than the writer simply ignores the tail.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import struct
+from typing import Any, Sequence
+
+from ._timestamps import raw
+
+FORMAT_VERSION = 1
+
+FLAG_REDACTED = 0x01
+
+STR = "str"
+TIME = "time"
+JSON = "json"
+FLOAT = "float"
+BOOL = "bool"
+
+_HEADER = struct.Struct("<BBBBII")
+_LENGTH = struct.Struct("<I")
+_DOUBLE = struct.Struct("<d")
+
+_dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+_loads = json.loads
+
+
+class Schema:
+    """Field layout for one model class.
+
+    Args:
+        tag: Type tag written into the header.
+        cls: The dataclass being encoded.
+        kinds: ``(field name, kind)`` pairs in declaration order.
+        sensitive: Fields omitted when encoding with ``redact=True``.
+    """
+
+    def __init__(self, tag: int, cls: type, kinds: Sequence[tuple[str, str]], sensitive: Sequence[str] = ()):
+        names = [field.name for field in dataclasses.fields(cls)]
+        if [name for name, _ in kinds] != names:
+            raise TypeError(f"{cls.__name__} codec fields are out of date")
+        if len(kinds) > 32:
+            raise TypeError("At most 32 fields are supported")
+        self.tag = tag
+        self.cls = cls
+        self.kinds = tuple(kinds)
+        self.names = tuple(names)
+        self.sensitive = frozenset(sensitive)
+        self._plan = tuple((1 << i, name, kind) for i, (name, kind) in enumerate(kinds))
+        # Constructor values for fields that are absent (None or redacted) but have no default.
+        self._required = {
+            field.name: "" if kind in (STR, TIME) else None
+            for field, (_, kind) in zip(dataclasses.fields(cls), kinds)
+            if field.default is dataclasses.MISSING and field.default_factory is dataclasses.MISSING
+        }
+
+    def encode(self, obj: Any, redact: bool = False) -> bytes:
+        present = 0
+        bools = 0
+        parts = [b""]
+        for i, (name, kind) in enumerate(self.kinds):
+            # Timestamps are stored as given, so encoding never forces a parse.
+            value = raw(obj, name) if kind == TIME else getattr(obj, name)
+            if value is None or (redact and name in self.sensitive):
+                continue
+            present |= 1 << i
+            if kind == BOOL:
+                if value:
+                    bools |= 1 << i
+                continue
+            if kind == FLOAT:
+                if not isinstance(value, (int, float)):
+                    raise TypeError(f"{name} must be a number or None")
+                parts.append(_DOUBLE.pack(value))
+                continue
+            if kind == STR:
+                if not isinstance(value, str):
+                    raise TypeError(f"{name} must be a string or None")
+                data = value.encode()
+            elif kind == TIME:
+                data = (value if isinstance(value, str) else value.isoformat()).encode()
+            else:
+                data = _dumps(value).encode()
+            parts.append(_LENGTH.pack(len(data)))
+            parts.append(data)
+        flags = FLAG_REDACTED if redact and self.sensitive else 0
+        parts[0] = _HEADER.pack(FORMAT_VERSION, self.tag, flags, len(self.kinds), present, bools)
+        return b"".join(parts)
+
+    def decode(self, data: bytes) -> Any:
+        try:
+            version, tag, _flags, count, present, bools = _HEADER.unpack_from(data)
+        except struct.error:
+            raise ValueError("Truncated FaceVault model encoding") from None
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported FaceVault model encoding version {version}")
+        if tag != self.tag:
+            raise ValueError(f"Encoded data is not a {self.cls.__name__} (type tag {tag})")
+
+        values = dict(self._required)
+        offset = _HEADER.size
+        size = len(data)
+        unpack_length = _LENGTH.unpack_from
+        try:
+            for bit, name, kind in self._plan[:count]:
+                if not present & bit:
+                    continue
+                if kind == BOOL:
+                    values[name] = not not bools & bit
+                elif kind == FLOAT:
+                    values[name] = _DOUBLE.unpack_from(data, offset)[0]
+                    offset += 8
+                else:
+                    end = offset + 4 + unpack_length(data, offset)[0]
+                    if end > size:
+                        raise ValueError("Truncated FaceVault model encoding")
+                    text = data[offset + 4:end].decode()
+                    values[name] = _loads(text) if kind == JSON else text
+                    offset = end
+        except (struct.error, UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise ValueError("Corrupt FaceVault model encoding") from exc
+        return self.cls(**values)
+
+    def reduce(self, obj: Any) -> tuple:
+        """``__reduce__`` result: rebuild from positional values, without per-instance field names."""
+        return self.cls, tuple(
+            raw(obj, name) if kind == TIME else getattr(obj, name) for name, kind in self.kinds
+        )
+
@@ -0,0 +1,79 @@
+"""Per-call time budgets shared across every phase of a request."""
+
+from __future__ import annotations
+
+import time
+from typing import Iterator
+
+import httpx
+
+from .exceptions import DeadlineExceededError
+
+
+class _Deadline:
+    """A point in time (on the monotonic clock) by which a call must finish."""
+
+    __slots__ = ("expires",)
+
+    def __init__(self, expires: float):
+        self.expires = expires
+
+    @classmethod
+    def from_args(cls, timeout: float | None, deadline: float | None) -> _Deadline | None:
+        """Build from a relative ``timeout`` and/or an absolute Unix ``deadline``.
+
+        The earlier of the two wins. Returns None if neither is given.
+        """
+        if timeout is None and deadline is None:
+            return None
+        budgets = []
+        if timeout is not None:
+            budgets.append(timeout)
+        if deadline is not None:
+            budgets.append(deadline - time.time())
+        return cls(time.monotonic() + min(budgets))
+
+    def remaining(self) -> float:
+        return self.expires - time.monotonic()
+
+    def check(self, phase: str) -> float:
+        """Return the remaining budget, raising if it is already spent."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError(f"Deadline exceeded {phase}")
+        return remaining
+
+    def limit(self, timeout: httpx.Timeout) -> httpx.Timeout:
+        """Cap each phase of ``timeout`` at the remaining budget.
+
+        The phases are still timed separately, so this alone does not bound
+        the whole request; callers also check the budget as the response
+        arrives.
+        """
+        remaining = self.check("before sending the request")
+
+        def cap(value: float | None) -> float:
+            return remaining if value is None else min(value, remaining)
+
+        return httpx.Timeout(
+            connect=cap(timeout.connect),
+            read=cap(timeout.read),
+            write=cap(timeout.write),
+            pool=cap(timeout.pool),
+        )
+
+
+class _DeadlineStream(httpx.SyncByteStream):
+    """Wraps a response body, failing once the deadline passes between chunks."""
+
+    def __init__(self, stream: httpx.SyncByteStream, deadline: _Deadline):
+        self._stream = stream
+        self._deadline = deadline
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._stream:
+            self._deadline.check("while reading the response")
+            yield chunk
+
+    def close(self) -> None:
+        self._stream.close()
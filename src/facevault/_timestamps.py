@@ -0,0 +1,109 @@
+"""Lazily parsed ISO-8601 timestamp fields for the SDK models."""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
+
+_ISO = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2})(?::(\d{2})(?:[.,](\d+))?)?"
+    r"\s*(?:(Z)|([+-])(\d{2}):?(\d{2}))?",
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=1024)
+def parse_iso(text: str) -> datetime:
+    """Parse an ISO-8601 timestamp. Naive timestamps are taken to be UTC.
+
+    Results are memoized: the API reports many timestamps more than once
+    (e.g. polls of the same session), and ``datetime`` is immutable.
+
+    Raises:
+        ValueError: If ``text`` is not an ISO-8601 timestamp.
+    """
+    if text[-1:] in ("Z", "z"):
+        text = text[:-1] + "+00:00"
+    try:
+        value = datetime.fromisoformat(text)
+    except ValueError:
+        # Older Pythons reject fractions that aren't 3 or 6 digits long.
+        value = _parse_slow(text)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _parse_slow(text: str) -> datetime:
+    match = _ISO.fullmatch(text.strip())
+    if match is None:
+        raise ValueError(f"Invalid ISO-8601 timestamp: {text!r}")
+    year, month, day, hour, minute, second, fraction, zulu, sign, tz_hours, tz_minutes = match.groups()
+    tz = None
+    if zulu:
+        tz = timezone.utc
+    elif sign:
+        offset = timedelta(hours=int(tz_hours), minutes=int(tz_minutes))
+        tz = timezone(-offset if sign == "-" else offset)
+    microsecond = int((fraction or "0")[:6].ljust(6, "0"))
+    return datetime(
+        int(year), int(month), int(day), int(hour), int(minute), int(second or 0), microsecond, tz
+    )
+
+
+class Timestamp:
+    """Dataclass field holding an API timestamp.
+
+    Accepts an ISO-8601 string, a ``datetime``, a Unix epoch in seconds or
+    ``None``. Strings are kept as given and only parsed (once per instance)
+    when the attribute is read; one that is not ISO-8601 is returned as is,
+    so a malformed value from the API never makes reading the model fail.
+    Epochs and naive datetimes are taken to be UTC.
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._name = name
+        self._parsed = f"_{name}_parsed"
+
+    def __get__(self, obj: Any, owner: type | None = None) -> datetime | str | None:
+        if obj is None:
+            return None  # the dataclass field default
+        state = obj.__dict__
+        parsed = state.get(self._parsed)
+        if parsed is None:
+            raw = state.get(self._name)
+            if raw is None or raw == "":
+                return None
+            if isinstance(raw, datetime):
+                parsed = raw
+            else:
+                try:
+                    parsed = parse_iso(raw)
+                except ValueError:
+                    parsed = raw
+            state[self._parsed] = parsed
+        return parsed
+
+    def __set__(self, obj: Any, value: datetime | str | float | None) -> None:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = datetime.fromtimestamp(value, timezone.utc)
+        elif isinstance(value, datetime):
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+        elif value is not None and not isinstance(value, str):
+            raise TypeError(f"{self._name} must be an ISO-8601 string, datetime, epoch or None")
+        state = obj.__dict__
+        state[self._name] = value
+        state.pop(self._parsed, None)
+
+
+def raw(obj: Any, name: str) -> datetime | str | None:
+    """The value a :class:`Timestamp` field was set to, without parsing it."""
+    return obj.__dict__.get(name)
+
+
+def epoch(value: datetime | str | None) -> int | None:
+    """Whole seconds since the Unix epoch, or None (also for an unparseable string)."""
+    return int(value.timestamp() // 1) if isinstance(value, datetime) else None
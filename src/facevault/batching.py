@@ -0,0 +1,241 @@
+"""Micro-batching of webhook events for bulk writes.
+
+An :class:`EventBatcher` collects :class:`~facevault.WebhookEvent` objects
+and hands them to a sink in batches: when ``max_size`` events are waiting,
+when the oldest has waited ``max_age`` seconds, on :meth:`~EventBatcher.flush`,
+and on shutdown. One ``INSERT`` of 500 rows replaces 500 round-trips::
+
+    async def write_rows(events):
+        await db.executemany("INSERT INTO verifications VALUES ($1, $2, $3)",
+                             [(e.session_id, e.status, e.trust_score) for e in events])
+
+    async with EventBatcher(write_rows, max_size=500, max_age=1.0) as batcher:
+        await batcher.consume(bus.subscribe("postgres"))   # or: await batcher.add(event)
+
+Sinks may be ``async def`` functions or plain functions; plain ones run in a
+worker thread. A sink that raises has its whole batch retried with
+exponential backoff. To retry only some events, raise
+:class:`~facevault.PartialBatchError` with the ones that failed. Events that
+still fail after ``max_retries`` are passed to ``on_failure`` (or logged).
+Batches are delivered one at a time, in order. Delivery is at least once:
+if a batch is interrupted by cancellation, the events the sink has not yet
+accepted are sent again on close. The flush on close is bounded by
+``shutdown_timeout``; events it could not deliver in time go to
+``on_failure`` too.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+from collections import deque
+from typing import AsyncIterable, Awaitable, Callable, Union
+
+import anyio
+import anyio.to_thread
+
+from .exceptions import PartialBatchError
+from .models import WebhookEvent
+
+logger = logging.getLogger("facevault")
+
+BatchSink = Callable[[list[WebhookEvent]], Union[Awaitable[None], None]]
+"""Writes a batch of events; see :class:`EventBatcher`."""
+
+FailureCallback = Callable[[list[WebhookEvent], BaseException], None]
+"""Receives events that could not be delivered, and the last error."""
+
+
+class EventBatcher:
+    """Deliver webhook events to a sink in batches.
+
+    Use as an async context manager: it runs the ``max_age`` timer while
+    open and flushes whatever is left when it closes, even if the block
+    raised or was cancelled, for at most ``shutdown_timeout`` seconds.
+
+    Args:
+        sink: Called with each batch, oldest event first. ``async def``
+            sinks are awaited; others run in a worker thread.
+        max_size: Most events per batch. Adding the ``max_size``-th
+            pending event flushes immediately.
+        max_age: Most seconds an event waits before its batch is flushed.
+        max_retries: Retries per batch after the first attempt fails.
+        retry_backoff: Delay before the first retry, doubled for each
+            further retry.
+        max_backoff: Longest delay between retries.
+        on_failure: Called with the events that failed every attempt and
+            the last error. Defaults to logging them.
+        shutdown_timeout: Most seconds the flush on close may take, retries
+            included; events still undelivered then are passed to
+            ``on_failure`` with a :class:`TimeoutError`. ``None`` waits for
+            as long as the sink takes.
+    """
+
+    def __init__(
+        self,
+        sink: BatchSink,
+        *,
+        max_size: int = 500,
+        max_age: float = 1.0,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        on_failure: FailureCallback | None = None,
+        shutdown_timeout: float | None = 30.0,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if max_age <= 0:
+            raise ValueError("max_age must be positive")
+        if max_retries < 0:
+            raise ValueError("max_retries must not be negative")
+        if shutdown_timeout is not None and shutdown_timeout < 0:
+            raise ValueError("shutdown_timeout must not be negative")
+        self.sink = sink
+        self.max_size = max_size
+        self.max_age = max_age
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.on_failure = on_failure
+        self.shutdown_timeout = shutdown_timeout
+        self._is_async = inspect.iscoroutinefunction(sink) or inspect.iscoroutinefunction(
+            getattr(sink, "__call__", None)
+        )
+        self._pending: deque[tuple[float, WebhookEvent]] = deque()
+        self._lock: anyio.Lock | None = None
+        self._arrived: anyio.Event | None = None
+        self._task_group: anyio.abc.TaskGroup | None = None
+        # Events of the batch being delivered that the sink has not accepted yet.
+        self._undelivered: list[WebhookEvent] = []
+        self._stats = {"events": 0, "batches": 0, "delivered": 0, "retries": 0, "failed": 0}
+
+    @property
+    def pending(self) -> int:
+        """Events added but not yet handed to the sink."""
+        return len(self._pending)
+
+    def stats(self) -> dict[str, int]:
+        """Counts of events added, batches sent, events delivered, retries and failed events."""
+        return {**self._stats, "pending": self.pending}
+
+    async def add(self, event: WebhookEvent) -> None:
+        """Queue ``event``, flushing first if a full batch is waiting.
+
+        Waits while a batch is being delivered, so a slow sink slows down
+        the caller instead of letting events pile up in memory.
+        """
+        self._pending.append((anyio.current_time(), event))
+        self._stats["events"] += 1
+        if self._arrived is not None:
+            self._arrived.set()
+        if len(self._pending) >= self.max_size:
+            async with self._get_lock():
+                while len(self._pending) >= self.max_size:
+                    await self._deliver(self._take())
+
+    async def consume(self, events: AsyncIterable[WebhookEvent]) -> None:
+        """:meth:`add` every event from ``events``, such as an :class:`~facevault.events.Subscription`."""
+        async for event in events:
+            await self.add(event)
+
+    async def flush(self) -> None:
+        """Deliver every pending event now."""
+        async with self._get_lock():
+            while self._pending:
+                await self._deliver(self._take())
+
+    async def _run_timer(self) -> None:
+        while True:
+            if not self._pending:
+                self._arrived = anyio.Event()
+                await self._arrived.wait()
+                continue
+            wait = self._pending[0][0] + self.max_age - anyio.current_time()
+            if wait > 0:
+                await anyio.sleep(wait)
+            else:
+                # Not shielded: if the batcher closes mid-delivery, _deliver puts
+                # the rest back and the bounded flush on close sends it.
+                await self.flush()
+
+    def _get_lock(self) -> anyio.Lock:
+        # Created lazily: anyio primitives need a running event loop.
+        if self._lock is None:
+            self._lock = anyio.Lock()
+        return self._lock
+
+    def _take(self) -> list[WebhookEvent]:
+        count = min(self.max_size, len(self._pending))
+        return [self._pending.popleft()[1] for _ in range(count)]
+
+    async def _deliver(self, events: list[WebhookEvent]) -> None:
+        self._stats["batches"] += 1
+        self._undelivered = events
+        try:
+            await self._send(events)
+        except anyio.get_cancelled_exc_class():
+            # Put back what is still undelivered so the flush on close sends it.
+            now = anyio.current_time()
+            self._pending.extendleft((now, event) for event in reversed(self._undelivered))
+            raise
+        finally:
+            self._undelivered = []
+
+    async def _send(self, events: list[WebhookEvent]) -> None:
+        error: BaseException | None = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._stats["retries"] += 1
+                await anyio.sleep(min(self.max_backoff, self.retry_backoff * 2 ** (attempt - 1)))
+            try:
+                if self._is_async:
+                    await self.sink(events)
+                else:
+                    await anyio.to_thread.run_sync(functools.partial(self.sink, events))
+            except PartialBatchError as exc:
+                self._stats["delivered"] += len(events) - len(exc.failed)
+                events, error = exc.failed, exc
+                self._undelivered = events
+                if not events:
+                    return
+            except Exception as exc:
+                error = exc
+            else:
+                self._stats["delivered"] += len(events)
+                return
+        self._fail(events, error, f"after {attempt + 1} attempts")
+
+    def _fail(self, events: list[WebhookEvent], error: BaseException, reason: str) -> None:
+        self._stats["failed"] += len(events)
+        if self.on_failure is None:
+            logger.error("Dropping %d webhook event(s) %s: %r", len(events), reason, error)
+            return
+        try:
+            self.on_failure(events, error)
+        except Exception:
+            logger.exception("Batch failure callback %r failed", self.on_failure)
+
+    async def __aenter__(self) -> EventBatcher:
+        tasks = anyio.create_task_group()
+        await tasks.__aenter__()
+        tasks.start_soon(self._run_timer)
+        self._task_group = tasks
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        tasks, self._task_group = self._task_group, None
+        tasks.cancel_scope.cancel()
+        try:
+            # The timer task never raises, so an error from the body propagates unwrapped.
+            await tasks.__aexit__(None, None, None)
+        finally:
+            self._arrived = None
+            with anyio.move_on_after(self.shutdown_timeout, shield=True):
+                await self.flush()
+            if self._pending:
+                events = [event for _, event in self._pending]
+                self._pending.clear()
+                error = TimeoutError(f"EventBatcher did not flush within shutdown_timeout={self.shutdown_timeout}s")
+                self._fail(events, error, "at shutdown")
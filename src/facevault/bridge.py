@@ -0,0 +1,259 @@
+"""Call FaceVault from mixed sync/async applications without blocking a loop.
+
+:class:`FaceVaultBridge` exposes ``create_session`` and ``get_session`` and
+picks the right client for wherever it is called from:
+
+- **On a running event loop** (an ``async def`` handler, under asyncio or
+  trio): the call goes to an :class:`~facevault.AsyncFaceVaultClient` for
+  that loop and returns an awaitable, so other handlers keep running during
+  the round-trip.
+- **From another thread while the bridge's loop runs** (e.g. a sync handler
+  in a worker thread): the call is scheduled onto that loop and the thread
+  waits for the result.
+- **With no loop at all**: the call runs on a :class:`FaceVaultClient` in a
+  bounded thread pool, and the caller waits for the result.
+
+::
+
+    fv = FaceVaultBridge("fv_live_...")
+
+    async def verify(update, context):
+        session = await fv.create_session(str(update.effective_user.id))
+
+    def nightly_report():  # plain thread, no loop
+        status = fv.get_session(session_id)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import sys
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, TypeVar, Union
+
+import httpx
+
+from ._async_client import AsyncFaceVaultClient
+from ._client import FaceVaultClient, _current_loop
+from .metrics import LatencyHistogram
+from .models import Session, SessionStatus
+
+T = TypeVar("T")
+
+# AsyncFaceVaultClient options that FaceVaultClient does not accept.
+_ASYNC_ONLY_OPTIONS = frozenset({"hedge", "prefetch", "body_offload_threshold"})
+
+
+class _PoolStats:
+    """Counters for the bridge's worker pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.active = 0
+        self.peak_active = 0
+        self.queue_wait = LatencyHistogram()
+
+    def submitted_one(self) -> None:
+        with self._lock:
+            self.submitted += 1
+
+    def started(self, queued_at: float) -> None:
+        with self._lock:
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            self.queue_wait.record(time.perf_counter() - queued_at)
+
+    def finished(self) -> None:
+        with self._lock:
+            self.active -= 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "active": self.active,
+                "peak_active": self.peak_active,
+                "queue_wait": self.queue_wait.snapshot(),
+            }
+
+
+class FaceVaultBridge:
+    """Event-loop-aware facade over the sync and async clients.
+
+    Args:
+        api_key: Your FaceVault API key.
+        max_workers: Threads used for calls made without an event loop.
+        max_pending: Calls allowed to wait for a worker before further
+            callers block. Defaults to ``4 * max_workers``.
+        transport: Optional httpx transport for the sync client.
+        async_transport: Optional httpx transport for the async clients.
+        **options: Other :class:`FaceVaultClient` options (``base_url``,
+            ``timeout``, ``hooks``, ``circuit_breaker``, ``registry``, ...),
+            applied to both clients. Async-only options (``hedge``,
+            ``prefetch``, ``body_offload_threshold``) apply to the async
+            clients only.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        max_workers: int = 8,
+        max_pending: int | None = None,
+        transport: httpx.BaseTransport | None = None,
+        async_transport: httpx.AsyncBaseTransport | None = None,
+        **options: Any,
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self._api_key = api_key
+        self._async_options = {**options, "transport": async_transport}
+        sync_options = {key: value for key, value in options.items() if key not in _ASYNC_ONLY_OPTIONS}
+        self._sync = FaceVaultClient(api_key, transport=transport, **sync_options)
+        # Keyed by asyncio loop, or by trio token for trio runs.
+        self._async_clients: weakref.WeakKeyDictionary[object, AsyncFaceVaultClient] = weakref.WeakKeyDictionary()
+        self._home_loop: object | None = None
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="facevault-bridge")
+        self._slots = threading.BoundedSemaphore(max_workers + (4 * max_workers if max_pending is None else max_pending))
+        self._pool_stats = _PoolStats()
+        self._lock = threading.Lock()
+
+    # ── Public API ──────────────────────────────────────────
+
+    def create_session(self, external_user_id: str, **kwargs: Any) -> Union[Session, Awaitable[Session]]:
+        """Create a session. Awaitable on an event loop, blocking elsewhere.
+
+        Takes the same arguments as :meth:`FaceVaultClient.create_session`.
+        """
+        return self._dispatch("create_session", external_user_id, **kwargs)
+
+    def get_session(self, session_id: str, **kwargs: Any) -> Union[SessionStatus, Awaitable[SessionStatus]]:
+        """Get a session's status. Awaitable on an event loop, blocking elsewhere.
+
+        Takes the same arguments as :meth:`FaceVaultClient.get_session`.
+        """
+        return self._dispatch("get_session", session_id, **kwargs)
+
+    def attach(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        """Route calls from other threads to ``loop`` (default: the running loop).
+
+        Called automatically the first time the bridge is used on a loop.
+        Under trio, call it without arguments from inside the trio run.
+
+        Raises:
+            RuntimeError: If no loop is given and none is running.
+        """
+        loop = loop or _current_loop()
+        if loop is None:
+            raise RuntimeError("No running event loop to attach to")
+        self._home_loop = loop
+
+    @property
+    def sync_client(self) -> FaceVaultClient:
+        """The client used for calls made without an event loop."""
+        return self._sync
+
+    def async_client(self) -> AsyncFaceVaultClient:
+        """The async client for the running event loop, created on first use."""
+        loop = _current_loop()
+        if loop is None:
+            raise RuntimeError("async_client() must be called from a running event loop")
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = self._async_clients[loop] = AsyncFaceVaultClient(self._api_key, **self._async_options)
+                home = self._home_loop
+                if home is None or (isinstance(home, asyncio.AbstractEventLoop) and home.is_closed()):
+                    self._home_loop = loop
+        return client
+
+    def pool_stats(self) -> dict:
+        """Worker pool counters: calls submitted, active and peak workers, queue wait."""
+        return self._pool_stats.snapshot()
+
+    def close(self) -> None:
+        """Shut down the worker pool and close every client.
+
+        Async clients are closed on their own loops. Those whose loop has
+        already finished are dropped, and a client for the loop ``close()``
+        is called from must be closed first with :meth:`aclose`.
+
+        Raises:
+            RuntimeError: If the running loop's async client is still open.
+        """
+        current = _current_loop()
+        with self._lock:
+            if current is not None and current in self._async_clients:
+                raise RuntimeError("Await aclose() before calling close() on an event loop")
+            clients = list(self._async_clients.items())
+            self._async_clients.clear()
+        self._pool.shutdown(wait=True)
+        self._sync.close()
+        for loop, client in clients:
+            self._close_on(loop, client)
+
+    async def aclose(self) -> None:
+        """Close the async client for the running loop."""
+        loop = _current_loop()
+        with self._lock:
+            client = self._async_clients.pop(loop, None) if loop is not None else None
+        if client is not None:
+            await client.close()
+
+    @staticmethod
+    def _close_on(loop: object, client: AsyncFaceVaultClient) -> None:
+        if isinstance(loop, asyncio.AbstractEventLoop):
+            if loop.is_running() and not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(client.close(), loop).result()
+            return
+        trio = sys.modules["trio"]
+        try:
+            trio.from_thread.run(client.close, trio_token=loop)
+        except trio.RunFinishedError:
+            pass
+
+    # ── Dispatch ────────────────────────────────────────────
+
+    def _dispatch(self, operation: str, *args: Any, **kwargs: Any) -> Any:
+        if _current_loop() is not None:
+            return getattr(self.async_client(), operation)(*args, **kwargs)
+
+        home = self._home_loop
+        if isinstance(home, asyncio.AbstractEventLoop):
+            if home.is_running() and not home.is_closed():
+                return asyncio.run_coroutine_threadsafe(self._on_loop(operation, *args, **kwargs), home).result()
+        elif home is not None:
+            trio = sys.modules["trio"]
+            try:
+                return trio.from_thread.run(
+                    functools.partial(self._on_loop, operation, *args, **kwargs), trio_token=home
+                )
+            except trio.RunFinishedError:
+                pass
+        return self._in_pool(getattr(self._sync, operation), *args, **kwargs)
+
+    async def _on_loop(self, operation: str, *args: Any, **kwargs: Any) -> Any:
+        return await getattr(self.async_client(), operation)(*args, **kwargs)
+
+    def _in_pool(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        stats = self._pool_stats
+        self._slots.acquire()
+        queued_at = time.perf_counter()
+
+        def run() -> T:
+            stats.started(queued_at)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.finished()
+
+        try:
+            stats.submitted_one()
+            return self._pool.submit(run).result()
+        finally:
+            self._slots.release()
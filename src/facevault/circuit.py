@@ -0,0 +1,176 @@
+"""Circuit breaker for the FaceVault clients.
+
+After ``failure_threshold`` consecutive failures (server errors, transport
+errors, or calls slower than ``slow_call_threshold``) the breaker opens and
+calls fail immediately with :class:`~facevault.exceptions.CircuitOpenError`
+instead of waiting on a struggling API. After ``reset_timeout`` seconds it
+lets a limited number of probe calls through (half-open); a successful probe
+closes it again, a failed one reopens it.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+from .exceptions import CircuitOpenError
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+StateListener = Callable[[str, str, str], None]
+"""Called with ``(endpoint, old_state, new_state)`` on every transition."""
+
+
+class _Circuit:
+    __slots__ = ("state", "failures", "opened_at", "probes")
+
+    def __init__(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+
+
+class CircuitBreaker:
+    """Fail fast while the FaceVault API is unhealthy.
+
+    Pass an instance to a client with ``circuit_breaker=...``. Transitions
+    are reported to the client's metrics hooks via
+    :meth:`~facevault.metrics.MetricsHook.on_circuit_state`.
+
+    Args:
+        failure_threshold: Consecutive failed calls that open the circuit.
+        slow_call_threshold: Calls slower than this many seconds count as
+            failures even if they succeed. Only the HTTP attempt is timed,
+            not lane or rate-limit queueing. Disabled if ``None``.
+        reset_timeout: Seconds to stay open before probing recovery.
+        half_open_max_calls: Probe calls allowed at once while half-open.
+        per_endpoint: Track a separate circuit for each endpoint instead of
+            one for the whole client.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        slow_call_threshold: float | None = None,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        per_endpoint: bool = False,
+    ):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        if half_open_max_calls < 1:
+            raise ValueError("half_open_max_calls must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.per_endpoint = per_endpoint
+        self._circuits: dict[str, _Circuit] = {}
+        self._listeners: list[StateListener] = []
+        self._lock = threading.Lock()
+
+    def state(self, endpoint: str = "*") -> str:
+        """Return the current state for ``endpoint`` (or the whole client)."""
+        with self._lock:
+            circuit = self._circuits.get(self._key(endpoint))
+            if circuit is None:
+                return CLOSED
+            if circuit.state == OPEN and time.monotonic() - circuit.opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return circuit.state
+
+    def reset(self) -> None:
+        """Close all circuits."""
+        with self._lock:
+            transitions = [(key, c.state) for key, c in self._circuits.items() if c.state != CLOSED]
+            self._circuits.clear()
+        for key, old in transitions:
+            self._notify(key, old, CLOSED)
+
+    def _after_fork(self) -> None:
+        # Keep what the parent learned about API health, but not its lock or
+        # the probe slots held by its in-flight calls.
+        self._lock = threading.Lock()
+        for circuit in self._circuits.values():
+            circuit.probes = 0
+
+    def _key(self, endpoint: str) -> str:
+        return endpoint if self.per_endpoint else "*"
+
+    def _subscribe(self, listener: StateListener) -> None:
+        # Copy on write so _notify can iterate without holding the lock.
+        with self._lock:
+            self._listeners = [*self._listeners, listener]
+
+    def _unsubscribe(self, listener: StateListener) -> None:
+        with self._lock:
+            self._listeners = [entry for entry in self._listeners if entry != listener]
+
+    def _notify(self, key: str, old: str, new: str) -> None:
+        for listener in self._listeners:
+            listener(key, old, new)
+
+    def _before(self, endpoint: str) -> bool:
+        """Admit a call or raise :class:`CircuitOpenError`. Returns True for probes."""
+        key = self._key(endpoint)
+        transition = None
+        error = None
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None:
+                circuit = self._circuits[key] = _Circuit()
+            if circuit.state == CLOSED:
+                return False
+            if circuit.state == OPEN:
+                remaining = self.reset_timeout - (time.monotonic() - circuit.opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(key, retry_after=remaining)
+                circuit.state = HALF_OPEN
+                circuit.probes = 0
+                transition = (key, OPEN, HALF_OPEN)
+            if circuit.probes >= self.half_open_max_calls:
+                error = CircuitOpenError(key, retry_after=0.0)
+            else:
+                circuit.probes += 1
+        if transition is not None:
+            self._notify(*transition)
+        if error is not None:
+            raise error
+        return True
+
+    def _is_success(self, status_code: int, latency: float) -> bool:
+        if status_code >= 500:
+            return False
+        return self.slow_call_threshold is None or latency <= self.slow_call_threshold
+
+    def _after(self, endpoint: str, success: bool | None, probe: bool) -> None:
+        """Record the outcome of an admitted call. ``None`` means no verdict (e.g. cancelled)."""
+        key = self._key(endpoint)
+        transition = None
+        with self._lock:
+            circuit = self._circuits.setdefault(key, _Circuit())
+            if probe and circuit.state == HALF_OPEN:
+                circuit.probes = max(0, circuit.probes - 1)
+            if success is None:
+                return
+            if success:
+                circuit.failures = 0
+                if circuit.state == HALF_OPEN:
+                    circuit.state = CLOSED
+                    transition = (key, HALF_OPEN, CLOSED)
+            else:
+                circuit.failures += 1
+                if circuit.state == HALF_OPEN or (
+                    circuit.state == CLOSED and circuit.failures >= self.failure_threshold
+                ):
+                    transition = (key, circuit.state, OPEN)
+                    circuit.state = OPEN
+                    circuit.opened_at = time.monotonic()
+        if transition is not None:
+            self._notify(*transition)
@@ -0,0 +1,263 @@
+"""Column-oriented batches of verification results for analytics.
+
+A :class:`SessionStatusBatch` stores many :class:`~facevault.SessionStatus`
+or :class:`~facevault.WebhookEvent` records as NumPy arrays, one per field,
+so filters and aggregates over millions of results run as vectorized array
+operations instead of Python loops over dataclasses::
+
+    batch = SessionStatusBatch.from_records(events)
+    accepted = batch[batch.decision_is("accept")]
+    counts, edges = accepted.histogram("trust_score", bins=20, range=(0, 100))
+    print(batch.pass_rate(), batch.decision_counts())
+
+Requires NumPy: ``pip install 'facevault[analytics]'``.
+"""
+
+from __future__ import annotations
+
+from array import array
+from datetime import datetime
+from typing import Any, Iterable, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError as exc:  # pragma: no cover - exercised only without numpy
+    raise ImportError("facevault.columnar requires numpy: pip install 'facevault[analytics]'") from exc
+
+from .models import SessionStatus, WebhookEvent
+
+
+Record = Union[SessionStatus, WebhookEvent]
+
+SCORE_COLUMNS = ("trust_score", "face_match_score", "anti_spoofing_score")
+FLAG_COLUMNS = ("face_match_passed", "sanctions_hit")
+CATEGORY_COLUMNS = ("status", "trust_decision")
+
+_MISSING = -1
+_UNKNOWN = 2  # flag value for None; True/False are stored as 1/0
+
+
+def _completed_epoch(value: datetime | str | None) -> float:
+    if not value:
+        return np.nan
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value.timestamp()
+
+
+class _Categories:
+    """Assigns small integer codes to category labels as they are first seen."""
+
+    def __init__(self, labels: Sequence[str] = ()):
+        self.labels = list(labels)
+        self._codes = {label: i for i, label in enumerate(self.labels)}
+
+    def code(self, label: str | None) -> int:
+        if label is None:
+            return _MISSING
+        code = self._codes.get(label)
+        if code is None:
+            code = self._codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+
+class SessionStatusBatch:
+    """Many verification results stored as parallel NumPy columns.
+
+    Columns:
+
+    - ``session_id``: object array of session IDs.
+    - ``trust_score``, ``face_match_score``, ``anti_spoofing_score``,
+      ``completed_at`` (Unix timestamp): ``float64``, ``NaN`` where unknown.
+    - ``face_match_passed``, ``sanctions_hit``: ``bool``, with
+      ``<name>_known`` masks marking which rows carry a value.
+    - ``status``, ``trust_decision``: ``int16`` codes into
+      :attr:`categories`, ``-1`` where unknown.
+
+    Build one with :meth:`from_records` and narrow it with boolean masks,
+    e.g. ``batch[batch.trust_score > 80]``.
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray], categories: dict[str, list[str]]):
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length")
+        self.columns = columns
+        self.categories = categories
+
+    @classmethod
+    def from_records(cls, records: Iterable[Record]) -> SessionStatusBatch:
+        """Build a batch from ``SessionStatus`` and/or ``WebhookEvent`` objects.
+
+        Records are consumed in a single pass into compact buffers, so a
+        generator over a large stream never materializes as Python objects.
+        """
+        session_ids: list[str] = []
+        scores = {name: array("d") for name in (*SCORE_COLUMNS, "completed_at")}
+        flags = {name: bytearray() for name in FLAG_COLUMNS}
+        categories = {name: _Categories() for name in CATEGORY_COLUMNS}
+        codes = {name: array("h") for name in CATEGORY_COLUMNS}
+        nan = float("nan")
+
+        for record in records:
+            session_ids.append(record.session_id)
+            if isinstance(record, WebhookEvent):
+                face_match = record.face_match_score
+                anti_spoofing = record.anti_spoofing_score
+                sanctions = record.sanctions_hit
+            else:
+                face_match = None
+                anti_spoofing = (record.anti_spoofing or {}).get("score")
+                sanctions = None
+            trust = record.trust_score
+            scores["trust_score"].append(nan if trust is None else trust)
+            scores["face_match_score"].append(nan if face_match is None else face_match)
+            scores["anti_spoofing_score"].append(nan if anti_spoofing is None else anti_spoofing)
+            scores["completed_at"].append(_completed_epoch(record.completed_at))
+            for name, value in (("face_match_passed", record.face_match_passed), ("sanctions_hit", sanctions)):
+                flags[name].append(_UNKNOWN if value is None else int(value))
+            for name, value in (("status", record.status), ("trust_decision", record.trust_decision)):
+                codes[name].append(categories[name].code(value))
+
+        columns: dict[str, np.ndarray] = {"session_id": np.array(session_ids, dtype=object)}
+        for name, values in scores.items():
+            columns[name] = np.frombuffer(values, dtype=np.float64) if values else np.empty(0)
+        for name, values in flags.items():
+            raw = np.frombuffer(bytes(values), dtype=np.uint8)
+            columns[name] = raw == 1
+            columns[f"{name}_known"] = raw != _UNKNOWN
+        for name, values in codes.items():
+            columns[name] = np.frombuffer(values, dtype=np.int16) if values else np.empty(0, dtype=np.int16)
+        return cls(columns, {name: c.labels for name, c in categories.items()})
+
+    @classmethod
+    def concat(cls, batches: Sequence[SessionStatusBatch]) -> SessionStatusBatch:
+        """Join batches end to end, reconciling their category codes."""
+        if not batches:
+            return cls.from_records(())
+        merged = {name: _Categories() for name in CATEGORY_COLUMNS}
+        parts: dict[str, list[np.ndarray]] = {name: [] for name in batches[0].columns}
+        for batch in batches:
+            for name, column in batch.columns.items():
+                if name in merged:
+                    # Remap this batch's codes onto the merged label list; -1 stays -1.
+                    lookup = np.array(
+                        [merged[name].code(label) for label in batch.categories[name]] + [_MISSING],
+                        dtype=np.int16,
+                    )
+                    column = lookup[column]
+                parts[name].append(column)
+        columns = {name: np.concatenate(chunks) for name, chunks in parts.items()}
+        return cls(columns, {name: c.labels for name, c in merged.items()})
+
+    def __len__(self) -> int:
+        return len(self.columns["session_id"])
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, selector: Any) -> SessionStatusBatch:
+        """Select rows with a boolean mask, an index array or a slice."""
+        if isinstance(selector, int):
+            raise TypeError("Index with a mask, index array or slice; use row() for a single record")
+        return SessionStatusBatch(
+            {name: column[selector] for name, column in self.columns.items()}, self.categories
+        )
+
+    def row(self, index: int) -> dict[str, Any]:
+        """Return one row as a dict of Python values."""
+        result: dict[str, Any] = {}
+        for name, column in self.columns.items():
+            if name.endswith("_known"):
+                continue
+            value = column[index]
+            if name in CATEGORY_COLUMNS:
+                result[name] = None if value == _MISSING else self.categories[name][value]
+            elif name in FLAG_COLUMNS:
+                result[name] = bool(value) if self.columns[f"{name}_known"][index] else None
+            elif name == "session_id":
+                result[name] = value
+            else:
+                result[name] = None if np.isnan(value) else float(value)
+        return result
+
+    # ── Masks ───────────────────────────────────────────────
+
+    def _is(self, column: str, labels: tuple[str, ...]) -> np.ndarray:
+        known = [self.categories[column].index(label) for label in labels if label in self.categories[column]]
+        return np.isin(self.columns[column], np.array(known, dtype=np.int16))
+
+    def status_is(self, *statuses: str) -> np.ndarray:
+        """Mask of rows whose status is any of ``statuses``."""
+        return self._is("status", statuses)
+
+    def decision_is(self, *decisions: str) -> np.ndarray:
+        """Mask of rows whose trust decision is any of ``decisions``."""
+        return self._is("trust_decision", decisions)
+
+    def completed_between(self, start: float, end: float) -> np.ndarray:
+        """Mask of rows completed in ``[start, end)`` (Unix timestamps)."""
+        completed = self.columns["completed_at"]
+        return (completed >= start) & (completed < end)
+
+    # ── Aggregates ──────────────────────────────────────────
+
+    def pass_rate(self) -> float:
+        """Fraction of rows with a known face match result that passed (``NaN`` if none)."""
+        known = self.columns["face_match_passed_known"]
+        total = int(known.sum())
+        if not total:
+            return float("nan")
+        return int((self.columns["face_match_passed"] & known).sum()) / total
+
+    def _counts(self, column: str) -> dict[str | None, int]:
+        counts = np.bincount(self.columns[column] + 1, minlength=len(self.categories[column]) + 1)
+        result: dict[str | None, int] = {
+            label: int(count) for label, count in zip(self.categories[column], counts[1:]) if count
+        }
+        if counts[0]:
+            result[None] = int(counts[0])
+        return result
+
+    def status_counts(self) -> dict[str | None, int]:
+        """Number of rows per status."""
+        return self._counts("status")
+
+    def decision_counts(self) -> dict[str | None, int]:
+        """Number of rows per trust decision (``None`` for rows without one)."""
+        return self._counts("trust_decision")
+
+    def _scores(self, column: str) -> np.ndarray:
+        if column not in SCORE_COLUMNS:
+            raise ValueError(f"column must be one of {SCORE_COLUMNS!r} (got {column!r})")
+        values = self.columns[column]
+        return values[~np.isnan(values)]
+
+    def histogram(
+        self, column: str = "trust_score", bins: int | Sequence[float] = 10, range: tuple[float, float] | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Histogram of a score column, ignoring missing values.
+
+        Returns:
+            ``(counts, bin_edges)`` as from :func:`numpy.histogram`.
+        """
+        return np.histogram(self._scores(column), bins=bins, range=range)
+
+    def mean(self, column: str = "trust_score") -> float:
+        """Mean of a score column, ignoring missing values (``NaN`` if none)."""
+        values = self._scores(column)
+        return float(values.mean()) if len(values) else float("nan")
+
+    def quantiles(self, column: str = "trust_score", q: Sequence[float] = (0.5, 0.9, 0.99)) -> dict[float, float]:
+        """Quantiles (0-1) of a score column, ignoring missing values."""
+        values = self._scores(column)
+        if not len(values):
+            return {p: float("nan") for p in q}
+        return dict(zip(q, (float(v) for v in np.quantile(values, q))))
+
+    def __repr__(self) -> str:
+        return f"SessionStatusBatch(rows={len(self)})"
@@ -0,0 +1,326 @@
+"""In-process fan-out of webhook events to independent subscribers.
+
+An :class:`EventBus` hands each published :class:`~facevault.WebhookEvent`
+to every subscriber's own bounded buffer, so a slow consumer (an audit
+database, say) never holds up the others. Each subscriber is an async
+iterator and chooses what happens when its buffer is full:
+
+- ``"drop_oldest"`` (default): discard the oldest buffered event.
+- ``"block"``: make :meth:`EventBus.publish` wait for room. Other
+  subscribers still receive the event straight away.
+- ``"spill"``: write further events to a temporary file and read them back,
+  in order, once the subscriber catches up.
+
+::
+
+    bus = EventBus()
+    audit = bus.subscribe("audit", overflow="spill")
+    notify = bus.subscribe("telegram", max_buffer=100)
+
+    async with anyio.create_task_group() as tasks:
+        tasks.start_soon(write_audit_log, audit)   # async for event in audit: ...
+        tasks.start_soon(notify_users, notify)
+        ...
+        await bus.publish(parse_event(body))        # in the webhook handler
+
+A bus belongs to the event loop it is first used on. To publish from
+another thread, such as a :class:`~facevault.server.WebhookServer` handler,
+use :meth:`EventBus.publish_from_thread`.
+"""
+
+from __future__ import annotations
+
+import logging
+import struct
+import tempfile
+from collections import deque
+from typing import IO
+
+import anyio
+import anyio.from_thread
+import anyio.lowlevel
+
+from .models import WebhookEvent
+
+logger = logging.getLogger("facevault")
+
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+SPILL = "spill"
+OVERFLOW_POLICIES = (DROP_OLDEST, BLOCK, SPILL)
+
+_LENGTH = struct.Struct(">I")
+
+
+class _SpillFile:
+    """Length-prefixed :meth:`WebhookEvent.to_bytes` records in an anonymous temporary file."""
+
+    def __init__(self, directory: str | None):
+        self._file: IO[bytes] = tempfile.TemporaryFile(prefix="facevault-spill-", dir=directory)
+        self._read_at = 0
+        self._write_at = 0
+        self.pending = 0
+
+    def write(self, event: WebhookEvent) -> None:
+        data = event.to_bytes()
+        self._file.seek(self._write_at)
+        self._file.write(_LENGTH.pack(len(data)) + data)
+        self._write_at = self._file.tell()
+        self.pending += 1
+
+    def read(self) -> WebhookEvent:
+        self._file.seek(self._read_at)
+        (length,) = _LENGTH.unpack(self._file.read(_LENGTH.size))
+        event = WebhookEvent.from_bytes(self._file.read(length))
+        self._read_at = self._file.tell()
+        self.pending -= 1
+        if not self.pending:
+            # Caught up: reuse the file from the start instead of growing it.
+            self._file.seek(0)
+            self._file.truncate()
+            self._read_at = self._write_at = 0
+        return event
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class Subscription:
+    """One subscriber's buffer of events. Created by :meth:`EventBus.subscribe`.
+
+    Iterate with ``async for``; iteration ends once the bus is closed and
+    every buffered event has been consumed.
+
+    Attributes:
+        name: The name given to :meth:`EventBus.subscribe`.
+        max_buffer: Most events held in memory.
+        overflow: What happens when the buffer is full; see the module docs.
+        delivered: Events handed to the consumer so far.
+        dropped: Events discarded by the ``"drop_oldest"`` policy.
+        spilled: Events written to disk by the ``"spill"`` policy.
+    """
+
+    def __init__(self, bus: EventBus, name: str, max_buffer: int, overflow: str, spill_dir: str | None):
+        self.name = name
+        self.max_buffer = max_buffer
+        self.overflow = overflow
+        self.delivered = 0
+        self.dropped = 0
+        self.spilled = 0
+        self._bus = bus
+        self._spill_dir = spill_dir
+        self._buffer: deque[WebhookEvent] = deque()
+        self._spill: _SpillFile | None = None
+        self._ended = False
+        self._readable = anyio.Event()
+        self._writable = anyio.Event()
+
+    @property
+    def pending(self) -> int:
+        """Events published but not yet consumed, in memory or on disk."""
+        return len(self._buffer) + (self._spill.pending if self._spill else 0)
+
+    def _full(self) -> bool:
+        return len(self._buffer) >= self.max_buffer
+
+    def _offer(self, event: WebhookEvent) -> bool:
+        """Buffer ``event`` per the overflow policy. False means a ``"block"`` subscriber is full."""
+        if self._ended:
+            return True
+        if self._spill is not None and self._spill.pending:
+            # Keep order: once spilling, everything goes to disk until the reader catches up.
+            self._spill.write(event)
+            self.spilled += 1
+        elif not self._full():
+            self._buffer.append(event)
+        elif self.overflow == DROP_OLDEST:
+            self._buffer.popleft()
+            self._buffer.append(event)
+            if not self.dropped:
+                logger.warning("Subscriber %r is falling behind; dropping its oldest events", self.name)
+            self.dropped += 1
+        elif self.overflow == SPILL:
+            if self._spill is None:
+                self._spill = _SpillFile(self._spill_dir)
+            self._spill.write(event)
+            self.spilled += 1
+        else:
+            return False
+        self._readable.set()
+        return True
+
+    async def _put(self, event: WebhookEvent) -> None:
+        while not self._offer(event):
+            if self._writable.is_set():
+                self._writable = anyio.Event()
+            await self._writable.wait()
+
+    def _take(self) -> WebhookEvent | None:
+        if self._buffer:
+            event = self._buffer.popleft()
+        elif self._spill is not None and self._spill.pending:
+            event = self._spill.read()
+        else:
+            return None
+        self.delivered += 1
+        self._writable.set()
+        return event
+
+    def __aiter__(self) -> Subscription:
+        return self
+
+    async def __anext__(self) -> WebhookEvent:
+        while True:
+            event = self._take()
+            if event is not None:
+                return event
+            if self._ended:
+                self._close_spill()
+                raise StopAsyncIteration
+            if self._readable.is_set():
+                self._readable = anyio.Event()
+            await self._readable.wait()
+
+    def close(self) -> None:
+        """Unsubscribe, discarding anything still buffered."""
+        self._bus._subscriptions.pop(self.name, None)
+        self._buffer.clear()
+        self._finish()
+        self._close_spill()
+
+    def _finish(self) -> None:
+        """Accept no more events; iteration ends once the buffer drains."""
+        self._ended = True
+        self._readable.set()
+        self._writable.set()
+
+    def _close_spill(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+        }
+
+
+class EventBus:
+    """Broadcast webhook events to independent, buffered subscribers.
+
+    Args:
+        spill_dir: Directory for the temporary files of ``"spill"``
+            subscribers. Defaults to the system temporary directory.
+    """
+
+    def __init__(self, *, spill_dir: str | None = None):
+        self.spill_dir = spill_dir
+        self._subscriptions: dict[str, Subscription] = {}
+        self._token: anyio.lowlevel.EventLoopToken | None = None
+        self._closed = False
+
+    def subscribe(
+        self,
+        name: str,
+        *,
+        max_buffer: int = 1000,
+        overflow: str = DROP_OLDEST,
+        spill_dir: str | None = None,
+    ) -> Subscription:
+        """Add a subscriber that receives every event published from now on.
+
+        Must be called from the event loop the bus is used on.
+
+        Args:
+            name: Unique name, used in logs and :meth:`stats`.
+            max_buffer: Most events held in memory for this subscriber.
+            overflow: ``"drop_oldest"``, ``"block"`` or ``"spill"``.
+            spill_dir: Overrides the bus's ``spill_dir`` for this subscriber.
+
+        Raises:
+            ValueError: If ``name`` is taken, or ``max_buffer`` or
+                ``overflow`` is invalid.
+            RuntimeError: If the bus is closed.
+        """
+        if self._closed:
+            raise RuntimeError("EventBus is closed")
+        if name in self._subscriptions:
+            raise ValueError(f"A subscriber named {name!r} already exists")
+        if max_buffer < 1:
+            raise ValueError("max_buffer must be at least 1")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {', '.join(OVERFLOW_POLICIES)}")
+        self._bind()
+        subscription = Subscription(self, name, max_buffer, overflow, spill_dir or self.spill_dir)
+        self._subscriptions[name] = subscription
+        return subscription
+
+    async def publish(self, event: WebhookEvent) -> None:
+        """Deliver ``event`` to every subscriber.
+
+        Returns once each subscriber has buffered it. Only full ``"block"``
+        subscribers make this wait, and only after everyone else has the
+        event.
+
+        Raises:
+            RuntimeError: If the bus is closed.
+        """
+        if self._closed:
+            raise RuntimeError("EventBus is closed")
+        self._bind()
+        blocked = [s for s in list(self._subscriptions.values()) if not s._offer(event)]
+        for subscription in blocked:
+            await subscription._put(event)
+
+    def publish_nowait(self, event: WebhookEvent) -> None:
+        """Deliver ``event`` without waiting, from code running on the bus's event loop.
+
+        Raises:
+            anyio.WouldBlock: If a ``"block"`` subscriber is full. Nobody
+                receives the event in that case.
+            RuntimeError: If the bus is closed.
+        """
+        if self._closed:
+            raise RuntimeError("EventBus is closed")
+        subscriptions = list(self._subscriptions.values())
+        if any(s.overflow == BLOCK and s._full() and not s._ended for s in subscriptions):
+            raise anyio.WouldBlock
+        for subscription in subscriptions:
+            subscription._offer(event)
+
+    def publish_from_thread(self, event: WebhookEvent) -> None:
+        """Like :meth:`publish`, from a thread outside the bus's event loop.
+
+        Blocks the calling thread while a ``"block"`` subscriber is full.
+
+        Raises:
+            RuntimeError: If the bus has not been used on an event loop yet,
+                or is closed.
+        """
+        if self._token is None:
+            raise RuntimeError("EventBus has no event loop yet; subscribe from the loop first")
+        anyio.from_thread.run(self.publish, event, token=self._token)
+
+    def close(self) -> None:
+        """Stop accepting events. Subscribers finish iterating once their buffers are empty."""
+        self._closed = True
+        for subscription in self._subscriptions.values():
+            subscription._finish()
+
+    async def __aenter__(self) -> EventBus:
+        self._bind()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def stats(self) -> dict[str, dict]:
+        """Per-subscriber ``pending``, ``delivered``, ``dropped`` and ``spilled`` counts."""
+        return {name: s.stats() for name, s in self._subscriptions.items()}
+
+    def _bind(self) -> None:
+        if self._token is None:
+            self._token = anyio.lowlevel.current_token()
@@ -2,6 +2,11 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING, Sequence
+
+if TYPE_CHECKING:
+    from .models import WebhookEvent
+
 
 class FaceVaultError(Exception):
     """Base exception for FaceVault API errors."""
@@ -30,3 +35,46 @@ class RateLimitError(FaceVaultError):
 
     def __init__(self, message: str = "Rate limit exceeded"):
         super().__init__(message, status_code=429)
+
+
+class CircuitOpenError(FaceVaultError):
+    """Raised without calling the API while the circuit breaker is open."""
+
+    def __init__(self, endpoint: str = "*", retry_after: float = 0.0):
+        super().__init__(
+            f"Circuit breaker open for {endpoint!r}; FaceVault API calls are failing fast "
+            f"(next probe in {retry_after:.1f}s)"
+        )
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class DeadlineExceededError(FaceVaultError):
+    """Raised when a call's ``timeout``/``deadline`` budget runs out or cannot be met."""
+
+    def __init__(self, message: str = "Deadline exceeded"):
+        super().__init__(message)
+
+
+class LoopBlockingWarning(RuntimeWarning):
+    """Warned when the blocking :class:`FaceVaultClient` is called on a running event loop."""
+
+
+class PayloadTooLargeError(ValueError):
+    """Raised when a webhook body exceeds the verifier's ``max_body_size``."""
+
+    def __init__(self, size: int, max_body_size: int):
+        super().__init__(f"Webhook body of at least {size} bytes exceeds the {max_body_size}-byte limit")
+        self.size = size
+        self.max_body_size = max_body_size
+
+
+class PartialBatchError(Exception):
+    """Raised by an :class:`~facevault.batching.EventBatcher` sink when only part of a batch failed.
+
+    Only the events in ``failed`` are retried; the rest count as delivered.
+    """
+
+    def __init__(self, failed: Sequence[WebhookEvent], message: str | None = None):
+        super().__init__(message or f"{len(failed)} event(s) in the batch failed")
+        self.failed = list(failed)
@@ -0,0 +1,556 @@
+"""Bulk export of session statuses, for audits and reporting.
+
+Reads session IDs lazily, fetches them concurrently with
+:class:`~facevault.AsyncFaceVaultClient`, and streams the results to JSON
+Lines, CSV or Parquet in input order. Memory use is bounded by the
+concurrency window, not the number of sessions. Progress is checkpointed
+periodically so an interrupted export resumes where it left off::
+
+    python -m facevault export -i session_ids.txt -o statuses.jsonl
+    python -m facevault export -i session_ids.txt -o statuses.jsonl --resume
+
+Parquet output (``pip install 'facevault[parquet]'``) is written as a
+directory of part files, one per checkpoint, readable as a single dataset by
+pyarrow, pandas, DuckDB and similar tools.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterable, Iterator
+
+import anyio
+import httpx
+
+from ._timestamps import raw
+from .exceptions import CircuitOpenError, FaceVaultError, NotFoundError, RateLimitError
+from .lanes import BATCH
+from .models import SessionStatus
+
+if TYPE_CHECKING:
+    from ._async_client import AsyncFaceVaultClient
+
+
+FORMATS = ("jsonl", "csv", "parquet")
+
+_PART = re.compile(r"part-\d{5,}\.parquet")
+
+_FIELDS = (
+    "session_id",
+    "status",
+    "steps",
+    "face_match_passed",
+    "error",
+    "created_at",
+    "completed_at",
+    "trust_score",
+    "trust_decision",
+    "require_poa",
+    "poa",
+    "anti_spoofing",
+    "credential",
+)
+_NESTED = frozenset({"steps", "poa", "anti_spoofing", "credential"})
+
+_CHECKPOINT_VERSION = 1
+
+
+@dataclass
+class ExportProgress:
+    """Counters reported while an export runs and returned when it finishes."""
+
+    exported: int = 0
+    not_found: int = 0
+    resumed_from: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Sessions exported per second during this run."""
+        return (self.exported - self.resumed_from) / self.elapsed if self.elapsed else 0.0
+
+
+ProgressCallback = Callable[[ExportProgress], None]
+
+
+# ── Records ─────────────────────────────────────────────────
+
+
+def _record(status: SessionStatus) -> dict[str, Any]:
+    record = {name: getattr(status, name) for name in _FIELDS}
+    for name in ("created_at", "completed_at"):
+        # Export timestamps exactly as the API reported them.
+        value = raw(status, name)
+        record[name] = value.isoformat() if isinstance(value, datetime) else value or None
+    return record
+
+
+def _not_found(session_id: str, message: str) -> dict[str, Any]:
+    record = dict.fromkeys(_FIELDS)
+    record.update(session_id=session_id, status="not_found", error=message)
+    return record
+
+
+def _flatten(record: dict[str, Any]) -> dict[str, Any]:
+    """Encode nested fields as JSON strings for tabular formats."""
+    return {
+        name: json.dumps(value, separators=(",", ":")) if name in _NESTED and value is not None else value
+        for name, value in record.items()
+    }
+
+
+# ── Writers ─────────────────────────────────────────────────
+#
+# A writer appends records and, on commit(), makes everything written so far
+# durable and returns an opaque position to store in the checkpoint. Opening a
+# writer with a saved position discards anything written after it.
+
+
+class _StreamWriter(ABC):
+    """Line-oriented output (JSONL, CSV) to a file or a binary stream."""
+
+    def __init__(self, target: str | IO[bytes], position: dict | None):
+        if isinstance(target, str):
+            self._file = open(target, "r+b" if position else "wb")
+            if position:
+                self._file.truncate(position["bytes"])
+                self._file.seek(position["bytes"])
+            self._owned = True
+        else:
+            self._file = target
+            self._owned = False
+        if not position:
+            self._header()
+
+    def _header(self) -> None:
+        pass
+
+    @abstractmethod
+    def _encode(self, record: dict[str, Any]) -> bytes:
+        """Serialise one record, line terminator included."""
+
+    def write(self, record: dict[str, Any]) -> None:
+        self._file.write(self._encode(record))
+
+    def commit(self) -> dict | None:
+        self._file.flush()
+        if not self._owned:
+            return None
+        os.fsync(self._file.fileno())
+        return {"bytes": self._file.tell()}
+
+    def close(self) -> None:
+        self._file.flush()
+        if self._owned:
+            self._file.close()
+
+
+class _JSONLWriter(_StreamWriter):
+    def _encode(self, record: dict[str, Any]) -> bytes:
+        return json.dumps(record, separators=(",", ":")).encode() + b"\n"
+
+
+class _CSVWriter(_StreamWriter):
+    def _header(self) -> None:
+        self._file.write(self._row(_FIELDS))
+
+    def _row(self, values: Iterable[Any]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(values)
+        return buffer.getvalue().encode()
+
+    def _encode(self, record: dict[str, Any]) -> bytes:
+        flat = _flatten(record)
+        return self._row("" if flat[name] is None else flat[name] for name in _FIELDS)
+
+
+def _pyarrow() -> tuple[Any, Any]:
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError("Parquet export requires pyarrow: pip install 'facevault[parquet]'") from exc
+    return pyarrow, pyarrow.parquet
+
+
+class _ParquetWriter:
+    """Writes ``part-NNNNN.parquet`` files into a directory, one per commit."""
+
+    def __init__(self, directory: str, position: dict | None):
+        pa, self._pq = _pyarrow()
+        self._pa = pa
+        self._schema = pa.schema([
+            ("session_id", pa.string()),
+            ("status", pa.string()),
+            ("steps", pa.string()),
+            ("face_match_passed", pa.bool_()),
+            ("error", pa.string()),
+            ("created_at", pa.string()),
+            ("completed_at", pa.string()),
+            ("trust_score", pa.float64()),
+            ("trust_decision", pa.string()),
+            ("require_poa", pa.bool_()),
+            ("poa", pa.string()),
+            ("anti_spoofing", pa.string()),
+            ("credential", pa.string()),
+        ])
+        self._directory = directory
+        self._part = position["parts"] if position else 0
+        self._rows: list[dict[str, Any]] = []
+        os.makedirs(directory, exist_ok=True)
+        if position:
+            # Each checkpoint is saved right after its part is written, so the
+            # only part an interrupted run can have left behind is the next one.
+            path = self._path(self._part)
+            for leftover in (path, path + ".tmp"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+        elif any(_PART.fullmatch(name) for name in os.listdir(directory)):
+            raise ValueError(f"{directory!r} already contains an export; choose an empty directory")
+
+    def _path(self, part: int) -> str:
+        return os.path.join(self._directory, f"part-{part:05d}.parquet")
+
+    def write(self, record: dict[str, Any]) -> None:
+        self._rows.append(_flatten(record))
+
+    def commit(self) -> dict | None:
+        if self._rows:
+            table = self._pa.Table.from_pylist(self._rows, schema=self._schema)
+            path = self._path(self._part)
+            self._pq.write_table(table, path + ".tmp")
+            os.replace(path + ".tmp", path)
+            self._part += 1
+            self._rows = []
+        return {"parts": self._part}
+
+    def close(self) -> None:
+        self.commit()
+
+
+def _open_writer(format: str, target: str | IO[bytes], position: dict | None):
+    if format == "jsonl":
+        return _JSONLWriter(target, position)
+    if format == "csv":
+        return _CSVWriter(target, position)
+    if format == "parquet":
+        if not isinstance(target, str):
+            raise ValueError("Parquet output must be a directory path")
+        return _ParquetWriter(target, position)
+    raise ValueError(f"format must be one of {FORMATS!r} (got {format!r})")
+
+
+# ── Checkpoints ─────────────────────────────────────────────
+
+
+def _load_checkpoint(path: str, format: str) -> dict | None:
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    if state.get("version") != _CHECKPOINT_VERSION or state.get("format") != format:
+        raise ValueError(f"Checkpoint {path!r} was written by a different export; delete it to start over")
+    return state
+
+
+def _save_checkpoint(path: str, state: dict) -> None:
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+
+# ── Export ──────────────────────────────────────────────────
+
+
+def read_ids(lines: Iterable[str]) -> Iterator[str]:
+    """Yield session IDs from lines of text, skipping blanks and ``#`` comments."""
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def _retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (RateLimitError, CircuitOpenError, httpx.TransportError)):
+        return True
+    return isinstance(exc, FaceVaultError) and (exc.status_code or 0) >= 500
+
+
+async def _fetch(
+    client: AsyncFaceVaultClient, session_id: str, limit: anyio.Semaphore, retries: int
+) -> dict[str, Any]:
+    async with limit:
+        for attempt in range(retries + 1):
+            try:
+                return _record(await client.get_session(session_id, priority=BATCH))
+            except NotFoundError as exc:
+                return _not_found(session_id, str(exc))
+            except Exception as exc:
+                if attempt == retries or not _retryable(exc):
+                    raise
+                delay = exc.retry_after if isinstance(exc, CircuitOpenError) else 0.5 * 2 ** attempt
+                await anyio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+class _Pending:
+    """A fetch in the export window: set ``done`` once ``record`` or ``error`` is filled in."""
+
+    __slots__ = ("done", "record", "error")
+
+    def __init__(self) -> None:
+        self.done = anyio.Event()
+        self.record: dict[str, Any] | None = None
+        self.error: Exception | None = None
+
+    async def run(self, client: AsyncFaceVaultClient, session_id: str, limit: anyio.Semaphore, retries: int) -> None:
+        try:
+            self.record = await _fetch(client, session_id, limit, retries)
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self.done.set()
+
+
+async def export_sessions(
+    client: AsyncFaceVaultClient,
+    session_ids: Iterable[str],
+    output: str | IO[bytes],
+    *,
+    format: str = "jsonl",
+    concurrency: int = 16,
+    retries: int = 3,
+    checkpoint: str | None = None,
+    checkpoint_every: int = 5000,
+    on_progress: ProgressCallback | None = None,
+    progress_interval: float = 5.0,
+) -> ExportProgress:
+    """Fetch ``session_ids`` and stream their statuses to ``output``.
+
+    Records are written in input order. Sessions that no longer exist are
+    written with status ``"not_found"``. Rate limits, server errors and
+    transport errors are retried with exponential backoff; any other error
+    stops the export, which can then be resumed from its checkpoint.
+
+    Args:
+        client: Client used for ``get_session`` calls (``"batch"`` priority).
+        session_ids: Session IDs, read lazily.
+        output: File path (a directory for Parquet) or a binary stream.
+            Resuming requires a path.
+        format: ``"jsonl"``, ``"csv"`` or ``"parquet"``.
+        concurrency: Maximum ``get_session`` calls in flight.
+        retries: Retries per session for transient failures.
+        checkpoint: Path of the checkpoint file. If it exists, the export
+            resumes from it; it is removed when the export completes.
+        checkpoint_every: Records between checkpoints.
+        on_progress: Called with an :class:`ExportProgress` every
+            ``progress_interval`` seconds and once at the end.
+        progress_interval: Seconds between progress reports.
+
+    Returns:
+        Final counters for the export.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    state = _load_checkpoint(checkpoint, format) if checkpoint else None
+    if state is not None and not isinstance(output, str):
+        raise ValueError("Resuming an export requires an output path")
+
+    progress = ExportProgress()
+    if state is not None:
+        progress.exported = progress.resumed_from = state["exported"]
+        progress.not_found = state["not_found"]
+    consumed = state["consumed"] if state else 0
+    ids = islice(session_ids, consumed, None)
+    writer = _open_writer(format, output, state["output"] if state else None)
+
+    limit = anyio.Semaphore(concurrency)
+    # Completed results wait here until everything before them is written,
+    # so the window bounds memory while slow sessions don't stall fetching.
+    window: deque[_Pending] = deque()
+    started = time.monotonic()
+    reported = started
+    since_checkpoint = 0
+
+    def save() -> None:
+        position = writer.commit()
+        if checkpoint and position is not None:
+            _save_checkpoint(checkpoint, {
+                "version": _CHECKPOINT_VERSION,
+                "format": format,
+                "consumed": consumed,
+                "exported": progress.exported,
+                "not_found": progress.not_found,
+                "output": position,
+            })
+
+    completed = False
+    error: Exception | None = None
+    broken: Exception | None = None
+    try:
+        async with anyio.create_task_group() as tasks:
+
+            def fill() -> None:
+                for session_id in islice(ids, concurrency * 4 - len(window)):
+                    pending = _Pending()
+                    window.append(pending)
+                    tasks.start_soon(pending.run, client, session_id, limit, retries)
+
+            fill()
+            try:
+                while window:
+                    pending = window[0]
+                    await pending.done.wait()
+                    window.popleft()
+                    if pending.error is not None:
+                        # Stop, cancelling the fetches still in flight, and raise once they have unwound.
+                        error = pending.error
+                        tasks.cancel_scope.cancel()
+                        break
+                    record = pending.record
+                    writer.write(record)
+                    consumed += 1
+                    progress.exported += 1
+                    progress.not_found += record["status"] == "not_found"
+                    since_checkpoint += 1
+                    fill()
+
+                    if since_checkpoint >= checkpoint_every:
+                        since_checkpoint = 0
+                        save()
+                    now = time.monotonic()
+                    if on_progress is not None and now - reported >= progress_interval:
+                        reported = now
+                        progress.elapsed = now - started
+                        on_progress(progress)
+            except Exception as exc:
+                # Writing or checkpointing failed, so the output past the last
+                # checkpoint can't be trusted. Stop the fetches and raise it unwrapped.
+                error = broken = exc
+                tasks.cancel_scope.cancel()
+        if error is not None:
+            raise error
+        completed = True
+    finally:
+        # Everything written so far is a complete, in-order prefix of the input,
+        # so a failed or interrupted export can resume right after it.
+        if not completed and broken is None:
+            save()
+        writer.close()
+
+    if checkpoint:
+        try:
+            os.remove(checkpoint)
+        except FileNotFoundError:
+            pass
+    progress.elapsed = time.monotonic() - started
+    if on_progress is not None:
+        on_progress(progress)
+    return progress
+
+
+# ── Command line ────────────────────────────────────────────
+
+
+def add_parser(subparsers: Any) -> None:
+    """Register the ``export`` subcommand."""
+    parser = subparsers.add_parser(
+        "export",
+        help="Export session statuses to JSONL, CSV or Parquet",
+        description="Fetch session statuses for a list of session IDs and stream them to a file.",
+    )
+    parser.add_argument("-i", "--input", default="-", help="File of session IDs, one per line (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Output path (default: stdout; a directory for parquet)")
+    parser.add_argument("-f", "--format", choices=FORMATS, help="Output format (default: from the output extension, else jsonl)")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="Requests in flight (default: 16)")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per session for transient errors (default: 3)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: OUTPUT.checkpoint)")
+    parser.add_argument("--checkpoint-every", type=int, default=5000, help="Records between checkpoints (default: 5000)")
+    parser.add_argument("--resume", action="store_true", help="Continue from an existing checkpoint")
+    parser.add_argument("--api-key", default=os.environ.get("FACEVAULT_API_KEY"), help="API key (default: $FACEVAULT_API_KEY)")
+    parser.add_argument("--base-url", default="https://api.facevault.id", help="API base URL")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't report progress")
+    parser.set_defaults(func=_main)
+
+
+def _format_for(output: str) -> str:
+    extension = os.path.splitext(output)[1].lstrip(".").lower()
+    return extension if extension in FORMATS else "jsonl"
+
+
+def _make_client(args: argparse.Namespace) -> AsyncFaceVaultClient:
+    from ._async_client import AsyncFaceVaultClient
+
+    return AsyncFaceVaultClient(args.api_key, base_url=args.base_url)
+
+
+def _report(progress: ExportProgress) -> None:
+    print(
+        f"exported {progress.exported:,} sessions ({progress.not_found:,} not found), "
+        f"{progress.rate:,.1f}/s over {progress.elapsed:,.1f}s",
+        file=sys.stderr,
+    )
+
+
+def _main(args: argparse.Namespace) -> int:
+    if not args.api_key:
+        print("error: pass --api-key or set FACEVAULT_API_KEY", file=sys.stderr)
+        return 2
+    to_stdout = args.output == "-"
+    format = args.format or ("jsonl" if to_stdout else _format_for(args.output))
+    checkpoint = None if to_stdout else args.checkpoint or args.output.rstrip("/") + ".checkpoint"
+    if checkpoint and os.path.exists(checkpoint) and not args.resume:
+        print(f"error: {checkpoint} exists; pass --resume to continue or delete it", file=sys.stderr)
+        return 2
+    if args.resume and not (checkpoint and os.path.exists(checkpoint)):
+        print("error: nothing to resume (no checkpoint found)", file=sys.stderr)
+        return 2
+
+    try:
+        source = sys.stdin if args.input == "-" else open(args.input)
+    except OSError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+
+    async def run() -> ExportProgress:
+        async with _make_client(args) as client:
+            return await export_sessions(
+                client,
+                read_ids(source),
+                sys.stdout.buffer if to_stdout else args.output,
+                format=format,
+                concurrency=args.concurrency,
+                retries=args.retries,
+                checkpoint=checkpoint,
+                checkpoint_every=args.checkpoint_every,
+                on_progress=None if args.quiet else _report,
+            )
+
+    try:
+        anyio.run(run)
+    except KeyboardInterrupt:
+        print("interrupted; rerun with --resume to continue", file=sys.stderr)
+        return 130
+    except (OSError, ValueError, ImportError, FaceVaultError, httpx.HTTPError) as exc:
+        resume = "; rerun with --resume to continue" if checkpoint and os.path.exists(checkpoint) else ""
+        print(f"error: {exc}{resume}", file=sys.stderr)
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    return 0
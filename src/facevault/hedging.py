@@ -0,0 +1,99 @@
+"""Hedged reads for :meth:`AsyncFaceVaultClient.get_session`.
+
+When a ``get_session`` response is slower than a recent latency percentile,
+the client sends a second identical request and uses whichever answer
+arrives first, cancelling the other. ``get_session`` is a safe, idempotent
+read, so the only cost is extra load, which the hedge budget caps.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+
+@dataclass
+class HedgePolicy:
+    """Configuration for hedged ``get_session`` calls.
+
+    Args:
+        percentile: Send the hedge once the primary request has been
+            outstanding longer than this percentile (0-100) of recent
+            ``get_session`` latencies.
+        window: Number of recent latencies the percentile is computed over.
+        min_samples: Until this many latencies have been observed,
+            ``initial_delay`` is used instead of the percentile.
+        initial_delay: Hedge delay in seconds while warming up.
+        min_delay: Lower bound on the hedge delay in seconds.
+        max_delay: Optional upper bound on the hedge delay in seconds.
+        budget: Maximum hedges as a fraction of ``get_session`` calls,
+            e.g. ``0.05`` allows at most one hedge per 20 calls on average.
+        burst: Maximum number of hedges that can be saved up while traffic
+            is fast, so a sudden slow spell cannot double the load.
+    """
+
+    percentile: float = 95.0
+    window: int = 200
+    min_samples: int = 20
+    initial_delay: float = 0.5
+    min_delay: float = 0.01
+    max_delay: float | None = None
+    budget: float = 0.05
+    burst: float = 10.0
+
+    def __post_init__(self) -> None:
+        if not 0 < self.percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if self.window < 1 or self.min_samples < 1:
+            raise ValueError("window and min_samples must be positive")
+        if not 0 <= self.budget <= 1:
+            raise ValueError("budget must be between 0 and 1")
+
+
+class _Hedger:
+    """Tracks recent latencies and the hedge budget for one client."""
+
+    def __init__(self, policy: HedgePolicy):
+        self.policy = policy
+        self._latencies: deque[float] = deque(maxlen=policy.window)
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        """Seconds to wait for the primary request before hedging."""
+        policy = self.policy
+        with self._lock:
+            if len(self._latencies) < policy.min_samples:
+                delay = policy.initial_delay
+            else:
+                ordered = sorted(self._latencies)
+                rank = math.ceil(len(ordered) * policy.percentile / 100) - 1
+                delay = ordered[max(0, rank)]
+        delay = max(delay, policy.min_delay)
+        if policy.max_delay is not None:
+            delay = min(delay, policy.max_delay)
+        return delay
+
+    def started(self) -> None:
+        """Credit the budget for a new ``get_session`` call."""
+        with self._lock:
+            self._tokens = min(self.policy.burst, self._tokens + self.policy.budget)
+
+    def try_acquire(self) -> bool:
+        """Spend budget for one hedge, returning False if none is left."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def observe(self, latency: float) -> None:
+        """Record how long an attempt took.
+
+        For an attempt cancelled after losing the race, this is a lower
+        bound on its latency.
+        """
+        with self._lock:
+            self._latencies.append(latency)
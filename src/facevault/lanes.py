@@ -0,0 +1,195 @@
+"""Priority lanes: keep batch traffic from starving interactive calls.
+
+With ``lanes=LanePolicy(...)`` a client admits at most ``max_concurrency``
+requests at once over its connection pool (and, optionally, at most
+``rate_limit`` requests per second). Each call is tagged with a priority:
+
+- ``"interactive"`` (default): user-facing calls. They may use every slot
+  and are always admitted ahead of waiting batch calls.
+- ``"batch"``: background work such as reconciliation sweeps. Limited to
+  ``batch_concurrency`` slots, and cannot use the share of the rate budget
+  reserved by ``interactive_reserve``.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+
+import anyio
+
+from ._deadline import _Deadline
+from .exceptions import DeadlineExceededError
+
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+
+
+@dataclass
+class LanePolicy:
+    """Concurrency and rate limits shared by all calls on one client.
+
+    Args:
+        max_concurrency: Maximum requests in flight. Also sizes the
+            connection pool.
+        batch_concurrency: Maximum batch requests in flight. Keep it below
+            ``max_concurrency`` so some slots always stay free for
+            interactive calls.
+        rate_limit: Optional requests per second across both lanes.
+        burst: Token bucket size for ``rate_limit``, at least 1. Defaults
+            to one second's worth of requests.
+        interactive_reserve: Fraction of the rate bucket that batch calls
+            may not consume.
+    """
+
+    max_concurrency: int = 10
+    batch_concurrency: int = 2
+    rate_limit: float | None = None
+    burst: float | None = None
+    interactive_reserve: float = 0.2
+
+    def __post_init__(self) -> None:
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if not 0 < self.batch_concurrency <= self.max_concurrency:
+            raise ValueError("batch_concurrency must be between 1 and max_concurrency")
+        if self.rate_limit is not None and self.rate_limit <= 0:
+            raise ValueError("rate_limit must be positive")
+        if self.burst is not None and self.burst < 1:
+            # A bucket smaller than one token could never admit a call.
+            raise ValueError("burst must be at least 1")
+        if not 0 <= self.interactive_reserve < 1:
+            raise ValueError("interactive_reserve must be between 0 and 1")
+
+
+def _check_priority(priority: str) -> None:
+    if priority not in PRIORITIES:
+        raise ValueError(f"priority must be one of {PRIORITIES!r} (got {priority!r})")
+
+
+class _Scheduler:
+    """Admission bookkeeping shared by the sync and async lane runtimes.
+
+    Not thread-safe; the sync runtime holds its condition's lock around
+    every call and the async runtime runs on a single event loop.
+    """
+
+    def __init__(self, policy: LanePolicy):
+        self.policy = policy
+        self.active = {INTERACTIVE: 0, BATCH: 0}
+        self.waiting_interactive = 0
+        self.capacity = policy.burst or max(1.0, policy.rate_limit or 0.0)
+        # Tokens batch calls must leave in the bucket. Capped so a batch call can
+        # still fit when the bucket is too small to hold the full reserve plus one.
+        self.batch_floor = min(self.capacity * policy.interactive_reserve, self.capacity - 1)
+        self.tokens = self.capacity
+        self.refilled = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        rate = self.policy.rate_limit
+        self.tokens = min(self.capacity, self.tokens + (now - self.refilled) * rate)
+        self.refilled = now
+
+    def try_admit(self, priority: str) -> float:
+        """Admit a call if possible. Returns 0 on success, otherwise how
+        long to wait before trying again (``inf`` if a slot must free up)."""
+        policy = self.policy
+        if sum(self.active.values()) >= policy.max_concurrency:
+            return float("inf")
+        if priority == BATCH:
+            if self.waiting_interactive or self.active[BATCH] >= policy.batch_concurrency:
+                return float("inf")
+        if policy.rate_limit is not None:
+            self._refill(time.monotonic())
+            floor = self.batch_floor if priority == BATCH else 0.0
+            if self.tokens - 1 < floor:
+                return (floor + 1 - self.tokens) / policy.rate_limit
+            self.tokens -= 1
+        self.active[priority] += 1
+        return 0.0
+
+    def release(self, priority: str) -> None:
+        self.active[priority] -= 1
+
+
+def _bounded_wait(wait: float, deadline: _Deadline | None) -> float:
+    """Clamp a scheduler wait to the caller's deadline, failing fast if it can't be met."""
+    if deadline is None:
+        return wait
+    remaining = deadline.check("while waiting for a request slot")
+    if wait != float("inf") and wait > remaining:
+        raise DeadlineExceededError("Deadline cannot be met: rate limit wait exceeds the remaining budget")
+    return min(wait, remaining)
+
+
+class _SyncLanes:
+    def __init__(self, policy: LanePolicy):
+        self._scheduler = _Scheduler(policy)
+        self._cond = threading.Condition()
+
+    def acquire(self, priority: str, deadline: _Deadline | None = None) -> float:
+        """Block until admitted. Returns the time spent waiting."""
+        start = time.perf_counter()
+        scheduler = self._scheduler
+        interactive = priority == INTERACTIVE
+        with self._cond:
+            if interactive:
+                scheduler.waiting_interactive += 1
+            try:
+                while True:
+                    wait = scheduler.try_admit(priority)
+                    if not wait:
+                        break
+                    wait = _bounded_wait(wait, deadline)
+                    self._cond.wait(None if wait == float("inf") else wait)
+            finally:
+                if interactive:
+                    scheduler.waiting_interactive -= 1
+                    self._cond.notify_all()
+        return time.perf_counter() - start
+
+    def release(self, priority: str) -> None:
+        with self._cond:
+            self._scheduler.release(priority)
+            self._cond.notify_all()
+
+
+class _AsyncLanes:
+    def __init__(self, policy: LanePolicy):
+        self._scheduler = _Scheduler(policy)
+        self._changed: anyio.Event | None = None
+
+    def _notify(self) -> None:
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = None
+
+    async def acquire(self, priority: str, deadline: _Deadline | None = None) -> float:
+        """Wait until admitted. Returns the time spent waiting."""
+        start = time.perf_counter()
+        scheduler = self._scheduler
+        interactive = priority == INTERACTIVE
+        if interactive:
+            scheduler.waiting_interactive += 1
+        try:
+            while True:
+                wait = scheduler.try_admit(priority)
+                if not wait:
+                    break
+                wait = _bounded_wait(wait, deadline)
+                if self._changed is None:
+                    self._changed = anyio.Event()
+                with anyio.move_on_after(wait):
+                    await self._changed.wait()
+        finally:
+            if interactive:
+                scheduler.waiting_interactive -= 1
+                self._notify()
+        return time.perf_counter() - start
+
+    def release(self, priority: str) -> None:
+        self._scheduler.release(priority)
+        self._notify()
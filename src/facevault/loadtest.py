@@ -0,0 +1,577 @@
+"""Load-test harness: drive a mix of SDK calls and report latency percentiles.
+
+Runs ``create_session``, ``get_session`` and webhook verification in a
+weighted mix, either against an in-process :class:`~facevault.testing.FakeFaceVault`
+(the default) or a real deployment, with either client::
+
+    python -m facevault.loadtest --rate 200 --duration 30
+    python -m facevault.loadtest --concurrency 32 --client sync --mix get_session=9,create_session=1
+    python -m facevault.loadtest --base-url https://staging.example.com --rate 500 -o results.json
+
+With ``--rate``, requests are sent on a fixed schedule (an open model) and
+each latency is measured from when the request was *due*, not when it was
+actually sent, so time spent queued behind a slow response is counted.
+Without it, ``--concurrency`` workers send back to back (a closed model).
+A closed model has no schedule to measure from, so its latencies are
+reported as measured, with a caveat, unless ``--expected-interval`` gives the
+gap each worker means to keep between requests. Then they are corrected for
+coordinated omission with :meth:`~facevault.metrics.LatencyHistogram.corrected`.
+Service times (from the moment each call actually started) are reported
+alongside.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Mapping
+
+import anyio
+
+from ._async_client import AsyncFaceVaultClient
+from ._client import FaceVaultClient
+from .exceptions import FaceVaultError
+from .lanes import LanePolicy
+from .metrics import LatencyHistogram
+from .testing import FakeFaceVault, lognormal
+from .webhook import parse_event, verify_signature
+
+OPERATIONS = ("create_session", "get_session", "verify_webhook")
+
+PERCENTILES = (50, 95, 99, 99.9)
+
+_ALIASES = {"create": "create_session", "get": "get_session", "verify": "verify_webhook", "webhook": "verify_webhook"}
+
+_WEBHOOK_SECRET = "whsec_loadtest"
+
+# Sessions created before the run starts, so get_session has IDs to read.
+_SEED_SESSIONS = 8
+
+# Most session IDs kept for get_session; newer ones replace the oldest.
+_MAX_SESSION_IDS = 10_000
+
+
+@dataclass
+class LoadProfile:
+    """What load to generate.
+
+    Args:
+        mix: Relative weight of each operation in :data:`OPERATIONS`.
+        rate: Target requests per second. ``None`` runs a closed model with
+            ``concurrency`` workers sending back to back.
+        concurrency: Most requests in flight at once (with ``rate``) or
+            number of workers (without).
+        duration: Seconds of measured load.
+        warmup: Seconds of load sent before measuring starts.
+        seed: Seed for operation choice, for reproducible runs.
+        expected_interval: Closed model only: seconds each worker means to
+            keep between requests. Latencies are corrected for coordinated
+            omission against it; without it they are reported uncorrected.
+    """
+
+    mix: Mapping[str, float] = field(
+        default_factory=lambda: {"create_session": 1.0, "get_session": 8.0, "verify_webhook": 1.0}
+    )
+    rate: float | None = None
+    concurrency: int = 16
+    duration: float = 10.0
+    warmup: float = 0.0
+    seed: int | None = None
+    expected_interval: float | None = None
+
+    def __post_init__(self) -> None:
+        unknown = set(self.mix) - set(OPERATIONS)
+        if unknown:
+            raise ValueError(f"Unknown operation(s) in mix: {', '.join(sorted(unknown))}")
+        if any(weight < 0 for weight in self.mix.values()) or not any(self.mix.values()):
+            raise ValueError("mix weights must be non-negative and not all zero")
+        if self.rate is not None and self.rate <= 0:
+            raise ValueError("rate must be positive")
+        if self.concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if self.duration <= 0:
+            raise ValueError("duration must be positive")
+        if self.warmup < 0:
+            raise ValueError("warmup must not be negative")
+        if self.expected_interval is not None:
+            if self.expected_interval <= 0:
+                raise ValueError("expected_interval must be positive")
+            if self.rate is not None:
+                raise ValueError("expected_interval applies to the closed model only (without rate)")
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """Parse ``"get_session=8,create_session=1"`` (or ``get=8,create=1``) into weights."""
+    mix: dict[str, float] = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, sep, weight = part.partition("=")
+        name = _ALIASES.get(name.strip(), name.strip())
+        if not sep:
+            raise ValueError(f"Expected operation=weight, got {part!r}")
+        mix[name] = float(weight)
+    return mix
+
+
+class _Recorder:
+    """Per-operation histograms and error counts, shared by all workers."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latency = {op: LatencyHistogram() for op in OPERATIONS}
+        self.service = {op: LatencyHistogram() for op in OPERATIONS}
+        self.errors: dict[str, Counter[str]] = {op: Counter() for op in OPERATIONS}
+        self.last_completion = 0.0
+
+    def record(self, op: str, due: float, started: float, finished: float, error: BaseException | None) -> None:
+        with self._lock:
+            self.latency[op].record(finished - due)
+            self.service[op].record(finished - started)
+            if error is not None:
+                self.errors[op][type(error).__name__] += 1
+            self.last_completion = max(self.last_completion, finished)
+
+
+class _Workload:
+    """Operation choice and the state operations share (session IDs, a signed webhook)."""
+
+    def __init__(self, profile: LoadProfile):
+        self.operations = [op for op in OPERATIONS if profile.mix.get(op, 0) > 0]
+        self.weights = [profile.mix[op] for op in self.operations]
+        self.session_ids: list[str] = []
+        self._lock = threading.Lock()
+        self._users = iter(range(sys.maxsize))
+        self._replaced = 0
+        payload = {
+            "event": "verification.completed",
+            "session_id": "sess_loadtest",
+            "status": "completed",
+            "external_user_id": "loadtest-user",
+            "face_match_passed": True,
+            "face_match_score": 0.95,
+            "trust_score": 92.5,
+            "trust_decision": "accept",
+        }
+        self.webhook_body = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode()
+        self.webhook_signature = hmac.new(_WEBHOOK_SECRET.encode(), self.webhook_body, hashlib.sha256).hexdigest()
+
+    def choose(self, rng: random.Random) -> str:
+        return rng.choices(self.operations, self.weights)[0]
+
+    def next_user(self) -> str:
+        with self._lock:
+            return f"loadtest-{next(self._users)}"
+
+    def created(self, session_id: str) -> None:
+        # Sync workers call this from many threads. Overwrite in place rather
+        # than trimming, so readers (who don't lock) never see a shrinking list.
+        with self._lock:
+            if len(self.session_ids) < _MAX_SESSION_IDS:
+                self.session_ids.append(session_id)
+            else:
+                self.session_ids[self._replaced % _MAX_SESSION_IDS] = session_id
+                self._replaced += 1
+
+    def seeded(self, attempt: int) -> bool:
+        """Whether enough sessions exist to start, raising if seeding keeps failing."""
+        if len(self.session_ids) >= _SEED_SESSIONS:
+            return True
+        if attempt >= _SEED_SESSIONS * 4:
+            raise FaceVaultError("Could not create sessions to start the load test; is the target up?")
+        return False
+
+    def verify_webhook(self) -> None:
+        if not verify_signature(self.webhook_body, self.webhook_signature, _WEBHOOK_SECRET):
+            raise ValueError("webhook signature did not verify")
+        parse_event(self.webhook_body)
+
+
+def run_load_test(
+    profile: LoadProfile,
+    *,
+    client: str = "async",
+    base_url: str | None = None,
+    api_key: str | None = None,
+    simulator: FakeFaceVault | None = None,
+    timeout: float = 15,
+) -> dict[str, Any]:
+    """Run a load test and return its results as a JSON-serializable dict.
+
+    Args:
+        profile: The load to generate.
+        client: ``"async"`` for :class:`AsyncFaceVaultClient` or ``"sync"``
+            for :class:`FaceVaultClient` on a thread pool.
+        base_url: Send requests to this deployment. Defaults to an
+            in-process simulator.
+        api_key: API key for ``base_url``.
+        simulator: The simulator to use when ``base_url`` is not given.
+            Defaults to ``FakeFaceVault(latency=lognormal(0.02, 0.5))``.
+        timeout: Per-request timeout in seconds.
+
+    Returns:
+        Throughput, error counts and latency percentiles, overall and per
+        operation. See :func:`format_report` for a readable summary.
+
+    Raises:
+        ValueError: ``client`` is not ``"async"`` or ``"sync"``, or
+            ``base_url`` was given without ``api_key``.
+        FaceVaultError: No sessions could be created before the run.
+    """
+    if client not in ("async", "sync"):
+        raise ValueError("client must be 'async' or 'sync'")
+    options: dict[str, Any] = {
+        "timeout": timeout,
+        "lanes": LanePolicy(max_concurrency=profile.concurrency, batch_concurrency=1),
+    }
+    if base_url is not None:
+        if not api_key:
+            raise ValueError("api_key is required with base_url")
+        options["base_url"] = base_url
+    else:
+        api_key = "fv_test_loadtest"
+        if simulator is None:
+            simulator = FakeFaceVault(latency=lognormal(0.02, 0.5), seed=profile.seed)
+        if client == "async":
+            options["transport"] = simulator.async_transport()
+        else:
+            options["transport"] = simulator.transport()
+
+    recorder = _Recorder()
+    workload = _Workload(profile)
+    if client == "async":
+        measure_start = anyio.run(_run_async, profile, workload, recorder, api_key, options)
+    else:
+        measure_start = _run_sync(profile, workload, recorder, api_key, options)
+    return _results(profile, client, base_url, recorder, measure_start)
+
+
+# ── Async client ───────────────────────────────────────────
+
+
+async def _run_async(
+    profile: LoadProfile, workload: _Workload, recorder: _Recorder, api_key: str, options: dict
+) -> float:
+    async with AsyncFaceVaultClient(api_key, **options) as client:
+
+        async def call(op: str, due: float, measure_from: float, rng: random.Random) -> None:
+            started = anyio.current_time()
+            error = None
+            try:
+                if op == "create_session":
+                    workload.created((await client.create_session(workload.next_user())).session_id)
+                elif op == "get_session":
+                    await client.get_session(rng.choice(workload.session_ids))
+                else:
+                    workload.verify_webhook()
+            except Exception as exc:
+                error = exc
+            if due >= measure_from:
+                recorder.record(op, due, started, anyio.current_time(), error)
+
+        attempt = 0
+        while not workload.seeded(attempt):
+            attempt += 1
+            with contextlib.suppress(FaceVaultError):
+                workload.created((await client.create_session(workload.next_user())).session_id)
+
+        rng = random.Random(profile.seed)
+        start = anyio.current_time()
+        measure_from = start + profile.warmup
+        end = measure_from + profile.duration
+        async with anyio.create_task_group() as tasks:
+            if profile.rate is not None:
+                limit = anyio.Semaphore(profile.concurrency)
+
+                async def scheduled(op: str, due: float, call_rng: random.Random) -> None:
+                    async with limit:
+                        await call(op, due, measure_from, call_rng)
+
+                for number in range(int((end - start) * profile.rate)):
+                    due = start + number / profile.rate
+                    await anyio.sleep_until(due)
+                    tasks.start_soon(scheduled, workload.choose(rng), due, random.Random(rng.getrandbits(64)))
+            else:
+
+                async def worker(seed: int) -> None:
+                    worker_rng = random.Random(seed)
+                    while (now := anyio.current_time()) < end:
+                        await call(workload.choose(worker_rng), now, measure_from, worker_rng)
+
+                for _ in range(profile.concurrency):
+                    tasks.start_soon(worker, rng.getrandbits(64))
+        return measure_from
+
+
+# ── Sync client ────────────────────────────────────────────
+
+
+def _run_sync(profile: LoadProfile, workload: _Workload, recorder: _Recorder, api_key: str, options: dict) -> float:
+    with FaceVaultClient(api_key, **options) as client:
+
+        def call(op: str, due: float, measure_from: float, rng: random.Random) -> None:
+            started = time.monotonic()
+            error = None
+            try:
+                if op == "create_session":
+                    workload.created(client.create_session(workload.next_user()).session_id)
+                elif op == "get_session":
+                    client.get_session(rng.choice(workload.session_ids))
+                else:
+                    workload.verify_webhook()
+            except Exception as exc:
+                error = exc
+            if due >= measure_from:
+                recorder.record(op, due, started, time.monotonic(), error)
+
+        attempt = 0
+        while not workload.seeded(attempt):
+            attempt += 1
+            with contextlib.suppress(FaceVaultError):
+                workload.created(client.create_session(workload.next_user()).session_id)
+
+        rng = random.Random(profile.seed)
+        start = time.monotonic()
+        measure_from = start + profile.warmup
+        end = measure_from + profile.duration
+        with ThreadPoolExecutor(profile.concurrency, thread_name_prefix="facevault-loadtest") as pool:
+            if profile.rate is not None:
+                # Requests due while every thread is busy wait in the pool's
+                # queue; their latency still counts from when they were due.
+                for number in range(int((end - start) * profile.rate)):
+                    due = start + number / profile.rate
+                    delay = due - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    # Each call gets its own generator: pool threads drawing from
+                    # ``rng`` would race this loop and make --seed runs differ.
+                    pool.submit(call, workload.choose(rng), due, measure_from, random.Random(rng.getrandbits(64)))
+            else:
+
+                def worker(seed: int) -> None:
+                    worker_rng = random.Random(seed)
+                    while (now := time.monotonic()) < end:
+                        call(workload.choose(worker_rng), now, measure_from, worker_rng)
+
+                for number in range(profile.concurrency):
+                    pool.submit(worker, rng.getrandbits(64) + number)
+        return measure_from
+
+
+# ── Results ────────────────────────────────────────────────
+
+
+def _results(
+    profile: LoadProfile, client: str, base_url: str | None, recorder: _Recorder, measure_start: float
+) -> dict[str, Any]:
+    elapsed = max(profile.duration, recorder.last_completion - measure_start)
+    closed = profile.rate is None
+    service_total = LatencyHistogram()
+    for histogram in recorder.service.values():
+        service_total.merge(histogram)
+    # Only the caller knows the interval a closed-model worker was meant to
+    # keep; one inferred from the measured service times would shrink with
+    # the very stalls it is supposed to expose.
+    expected_interval = profile.expected_interval
+    caveat = None
+    if not closed:
+        method = "scheduled_start"
+    elif expected_interval is not None:
+        method = "expected_interval"
+    else:
+        method = "none"
+        caveat = (
+            "closed-model latencies are not corrected for coordinated omission and understate "
+            "stalls; set a rate or an expected_interval"
+        )
+
+    operations = {}
+    latency_total = LatencyHistogram()
+    for op in OPERATIONS:
+        latency = recorder.latency[op]
+        if expected_interval is not None:
+            latency = latency.corrected(expected_interval)
+        latency_total.merge(latency)
+        service = recorder.service[op]
+        if not service.count:
+            continue
+        operations[op] = {
+            "requests": service.count,
+            "errors": dict(recorder.errors[op]),
+            "throughput": service.count / elapsed,
+            "latency": latency.snapshot(PERCENTILES),
+            "service_time": service.snapshot(PERCENTILES),
+        }
+    return {
+        "profile": {**asdict(profile), "mix": dict(profile.mix)},
+        "client": client,
+        "target": base_url or "simulator",
+        "model": "closed" if closed else "open",
+        "coordinated_omission": {
+            "method": method,
+            "expected_interval": expected_interval,
+            "caveat": caveat,
+        },
+        "elapsed": elapsed,
+        "requests": service_total.count,
+        "errors": sum(sum(op["errors"].values()) for op in operations.values()),
+        "throughput": service_total.count / elapsed,
+        "latency": latency_total.snapshot(PERCENTILES),
+        "service_time": service_total.snapshot(PERCENTILES),
+        "operations": operations,
+    }
+
+
+def format_report(results: Mapping[str, Any]) -> str:
+    """Format :func:`run_load_test` results as a plain-text table."""
+    profile = results["profile"]
+    load = f"{profile['rate']:g} req/s" if profile["rate"] else f"{profile['concurrency']} workers"
+    lines = [
+        f"{results['requests']} requests in {results['elapsed']:.1f}s against {results['target']} "
+        f"({results['client']} client, {results['model']} model, {load})",
+        f"throughput {results['throughput']:.1f} req/s, {results['errors']} errors",
+        "",
+        f"{'operation':<16}{'requests':>10}{'errors':>8}{'req/s':>10}"
+        + "".join(f"{_label(q):>10}" for q in PERCENTILES),
+    ]
+    rows = [(op, stats) for op, stats in results["operations"].items()]
+    rows.append(("total", {**results, "errors": {"": results["errors"]}}))
+    for op, stats in rows:
+        percentiles = stats["latency"]["percentiles"]
+        lines.append(
+            f"{op:<16}{stats['requests']:>10}{sum(stats['errors'].values()):>8}{stats['throughput']:>10.1f}"
+            + "".join(f"{value * 1000:>8.1f}ms" for value in percentiles.values())
+        )
+    correction = results["coordinated_omission"]
+    if correction["method"] == "scheduled_start":
+        lines.append("\nLatencies measured from each request's scheduled start.")
+    elif correction["method"] == "expected_interval":
+        interval = correction["expected_interval"] * 1000
+        lines.append(f"\nLatencies corrected for coordinated omission (expected interval: {interval:.1f}ms).")
+    else:
+        lines.append(
+            "\nLatencies are NOT corrected for coordinated omission and understate stalls; "
+            "use --rate or --expected-interval."
+        )
+    return "\n".join(lines)
+
+
+def _label(q: float) -> str:
+    return f"p{q:g}"
+
+
+# ── Command line ───────────────────────────────────────────
+
+
+def add_parser(subparsers: Any) -> None:
+    """Register the ``loadtest`` subcommand."""
+    parser = subparsers.add_parser(
+        "loadtest",
+        help="Generate load and report latency percentiles",
+        description="Drive a mix of FaceVault calls at a target rate or concurrency and report latency percentiles.",
+    )
+    _add_arguments(parser)
+
+
+def _add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--mix", type=parse_mix, default=LoadProfile().mix,
+        help="Operation weights, e.g. get_session=8,create_session=1,verify_webhook=1",
+    )
+    parser.add_argument("-r", "--rate", type=float, help="Target requests per second (default: closed model)")
+    parser.add_argument(
+        "-c", "--concurrency", type=int, default=16,
+        help="Most requests in flight, or workers without --rate (default: 16)",
+    )
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="Seconds to measure (default: 10)")
+    parser.add_argument("--warmup", type=float, default=0.0, help="Seconds of unmeasured load first (default: 0)")
+    parser.add_argument(
+        "--expected-interval", type=float,
+        help="Without --rate, seconds each worker means to keep between requests; "
+        "corrects latencies for coordinated omission (default: uncorrected)",
+    )
+    parser.add_argument("--client", choices=("async", "sync"), default="async", help="Client to use (default: async)")
+    parser.add_argument("--base-url", help="Deployment to load (default: in-process simulator)")
+    parser.add_argument(
+        "--api-key", default=os.environ.get("FACEVAULT_API_KEY"),
+        help="API key for --base-url (default: $FACEVAULT_API_KEY)",
+    )
+    parser.add_argument("--timeout", type=float, default=15, help="Per-request timeout in seconds (default: 15)")
+    parser.add_argument(
+        "--sim-latency", type=float, default=0.02, help="Simulator median latency in seconds (default: 0.02)",
+    )
+    parser.add_argument("--sim-sigma", type=float, default=0.5, help="Simulator latency spread (default: 0.5)")
+    parser.add_argument("--sim-error-rate", type=float, default=0.0, help="Simulator 5xx fraction (default: 0)")
+    parser.add_argument("--sim-rate-limit-rate", type=float, default=0.0, help="Simulator 429 fraction (default: 0)")
+    parser.add_argument("--seed", type=int, help="Random seed, for reproducible runs")
+    parser.add_argument("-o", "--output", help="Write JSON results to this file ('-' for stdout)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Do not print the report")
+    parser.set_defaults(func=_main)
+
+
+def _main(args: argparse.Namespace) -> int:
+    try:
+        profile = LoadProfile(
+            mix=args.mix,
+            rate=args.rate,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            warmup=args.warmup,
+            seed=args.seed,
+            expected_interval=args.expected_interval,
+        )
+        simulator = None
+        if args.base_url is None:
+            latency = lognormal(args.sim_latency, args.sim_sigma) if args.sim_latency > 0 else None
+            simulator = FakeFaceVault(
+                latency=latency,
+                error_rate=args.sim_error_rate,
+                rate_limit_rate=args.sim_rate_limit_rate,
+                seed=args.seed,
+            )
+        results = run_load_test(
+            profile,
+            client=args.client,
+            base_url=args.base_url,
+            api_key=args.api_key,
+            simulator=simulator,
+            timeout=args.timeout,
+        )
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    except FaceVaultError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    if not args.quiet:
+        print(format_report(results), file=sys.stderr)
+    if args.output == "-":
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    elif args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m facevault.loadtest",
+        description="Drive a mix of FaceVault calls at a target rate or concurrency and report latency percentiles.",
+    )
+    _add_arguments(parser)
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
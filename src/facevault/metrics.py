@@ -0,0 +1,458 @@
+"""Request instrumentation for the FaceVault clients.
+
+Every HTTP request made by :class:`FaceVaultClient` or
+:class:`AsyncFaceVaultClient` produces one :class:`RequestMetrics` record,
+which is handed to each registered :class:`MetricsHook`. Each client also
+keeps a built-in :class:`ClientStats` hook with HDR-style latency histograms
+and counters, available via ``client.stats()``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+if TYPE_CHECKING:
+    import httpx
+
+
+logger = logging.getLogger("facevault")
+
+# Exception names recorded for attempts abandoned on purpose (e.g. losing hedges).
+_CANCELLED = ("CancelledError", "Cancelled")
+
+# Prometheus histogram bucket bounds, in seconds.
+_PROMETHEUS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@dataclass
+class RequestMetrics:
+    """Measurements for a single HTTP request to the FaceVault API.
+
+    All durations are in seconds.
+    """
+
+    method: str
+    endpoint: str
+    status_code: int | None = None
+    retries: int = 0
+    request_bytes: int = 0
+    response_bytes: int = 0
+    queue_wait: float = 0.0
+    connect_time: float = 0.0
+    latency: float = 0.0
+    error: str | None = None
+    priority: str = "interactive"
+
+
+class MetricsHook:
+    """Base class for instrumentation hooks.
+
+    Subclass and override the methods you need, then pass instances to the
+    client with ``hooks=[...]``. Hooks are called synchronously on the
+    request path, so keep them cheap. Exceptions raised by a hook are
+    logged and never affect the API call.
+    """
+
+    def on_request(self, metrics: RequestMetrics) -> None:
+        """Called once per completed (or failed) HTTP request."""
+
+    def on_circuit_state(self, endpoint: str, old_state: str, new_state: str) -> None:
+        """Called when a circuit breaker changes state.
+
+        ``endpoint`` is ``"*"`` unless the breaker tracks endpoints separately.
+        """
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of durations.
+
+    Values are recorded in microseconds into buckets whose width grows with
+    magnitude, keeping the relative error below ``2 ** -(precision_bits - 1)``
+    (under 1% with the default of 8 bits) at a constant memory cost per
+    order of magnitude.
+
+    Not thread-safe on its own; :class:`ClientStats` serializes access.
+    """
+
+    def __init__(self, precision_bits: int = 8):
+        if precision_bits < 2:
+            raise ValueError("precision_bits must be at least 2")
+        self._bits = precision_bits
+        self._half = 1 << (precision_bits - 1)
+        self._counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = 0.0
+        self.max = 0.0
+
+    def _index(self, micros: int) -> int:
+        length = micros.bit_length()
+        if length <= self._bits:
+            return micros
+        shift = length - self._bits
+        return (1 << self._bits) + (shift - 1) * self._half + (micros >> shift) - self._half
+
+    def _upper_bound(self, index: int) -> int:
+        """Largest microsecond value that maps into ``index``."""
+        full = 1 << self._bits
+        if index < full:
+            return index
+        shift = (index - full) // self._half + 1
+        top = (index - full) % self._half + self._half
+        return ((top + 1) << shift) - 1
+
+    def record(self, seconds: float, count: int = 1) -> None:
+        """Record a duration (in seconds) ``count`` times."""
+        if seconds < 0:
+            seconds = 0.0
+        index = self._index(int(seconds * 1_000_000))
+        self._counts[index] = self._counts.get(index, 0) + count
+        if self.count == 0 or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.count += count
+        self.total += seconds * count
+
+    def merge(self, other: LatencyHistogram) -> None:
+        """Add all values recorded in ``other`` to this histogram."""
+        if other._bits != self._bits:
+            raise ValueError("Cannot merge histograms with different precision")
+        if other.count == 0:
+            return
+        for index, n in other._counts.items():
+            self._counts[index] = self._counts.get(index, 0) + n
+        if self.count == 0 or other.min < self.min:
+            self.min = other.min
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def corrected(self, expected_interval: float) -> LatencyHistogram:
+        """Return a copy corrected for coordinated omission.
+
+        A closed-loop load generator that waits for each response before
+        sending the next request never samples the stalls it was stuck in.
+        Each value above ``expected_interval`` (the usual gap between
+        requests) is therefore also recorded as ``value - interval``,
+        ``value - 2 * interval`` and so on down to ``expected_interval``:
+        the latencies the requests that should have been sent during the
+        stall would have seen.
+        """
+        result = LatencyHistogram(self._bits)
+        result.merge(self)
+        interval = int(expected_interval * 1_000_000)
+        if interval <= 0:
+            return result
+        largest = int(self.max * 1_000_000)
+        for index, n in self._counts.items():
+            missing = min(self._upper_bound(index), largest) - interval
+            while missing >= interval:
+                result.record(missing / 1_000_000, n)
+                missing -= interval
+        return result
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Return the value (in seconds) at percentile ``q`` (0-100)."""
+        if not 0 <= q <= 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if self.count == 0:
+            return 0.0
+        rank = max(1, -(-self.count * q // 100))
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= rank:
+                value = self._upper_bound(index) / 1_000_000
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def count_at_or_below(self, seconds: float) -> int:
+        """Return how many recorded values fall at or below ``seconds``."""
+        limit = self._index(int(seconds * 1_000_000))
+        return sum(n for index, n in self._counts.items() if index <= limit)
+
+    def snapshot(self, percentiles: Iterable[float] = (50, 90, 95, 99, 99.9)) -> dict:
+        """Return summary statistics as a plain dict."""
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "percentiles": {_format_percentile(q): self.percentile(q) for q in percentiles},
+        }
+
+
+class _EndpointStats:
+    __slots__ = (
+        "requests", "errors", "retries", "request_bytes", "response_bytes",
+        "status_codes", "latency", "queue_wait", "connect_time",
+    )
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.status_codes: dict[str, int] = {}
+        self.latency = LatencyHistogram()
+        self.queue_wait = LatencyHistogram()
+        self.connect_time = LatencyHistogram()
+
+
+class ClientStats(MetricsHook):
+    """In-process counters and latency histograms, keyed by endpoint.
+
+    Every client owns one instance, returned by ``client.stats()``. It is
+    safe to read from other threads while requests are in flight.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoints: dict[tuple[str, str], _EndpointStats] = {}
+        self._counters: dict[str, int] = {}
+        self._started = time.time()
+
+    def on_request(self, metrics: RequestMetrics) -> None:
+        key = (metrics.method, metrics.endpoint)
+        if metrics.status_code is not None:
+            status = str(metrics.status_code)
+        elif metrics.error in _CANCELLED:
+            status = "cancelled"
+        else:
+            status = "error"
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = _EndpointStats()
+            stats.requests += 1
+            if status == "error" or (metrics.status_code or 0) >= 400:
+                stats.errors += 1
+            stats.retries += metrics.retries
+            stats.request_bytes += metrics.request_bytes
+            stats.response_bytes += metrics.response_bytes
+            stats.status_codes[status] = stats.status_codes.get(status, 0) + 1
+            stats.latency.record(metrics.latency)
+            stats.queue_wait.record(metrics.queue_wait)
+            stats.connect_time.record(metrics.connect_time)
+
+    def on_circuit_state(self, endpoint: str, old_state: str, new_state: str) -> None:
+        self.increment(f"circuit_{new_state}")
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Increment a named client-level counter, e.g. ``"hedges_sent"``."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def counter(self, name: str) -> int:
+        """Return the current value of a named counter."""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def latency(self, method: str, endpoint: str) -> LatencyHistogram:
+        """Return a copy of the latency histogram for one endpoint."""
+        histogram = LatencyHistogram()
+        with self._lock:
+            stats = self._endpoints.get((method, endpoint))
+            if stats is not None:
+                histogram.merge(stats.latency)
+        return histogram
+
+    def snapshot(self) -> dict:
+        """Return all counters and histogram summaries as a plain dict."""
+        with self._lock:
+            endpoints = {
+                f"{method} {endpoint}": {
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "retries": stats.retries,
+                    "request_bytes": stats.request_bytes,
+                    "response_bytes": stats.response_bytes,
+                    "status_codes": dict(stats.status_codes),
+                    "latency": stats.latency.snapshot(),
+                    "queue_wait": stats.queue_wait.snapshot(),
+                    "connect_time": stats.connect_time.snapshot(),
+                }
+                for (method, endpoint), stats in sorted(self._endpoints.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+        return {"since": self._started, "endpoints": endpoints, "counters": counters}
+
+    def reset(self) -> None:
+        """Discard all recorded data."""
+        with self._lock:
+            self._endpoints.clear()
+            self._counters.clear()
+            self._started = time.time()
+
+    def _after_fork(self) -> None:
+        # The lock may have been held by another thread of the parent; the
+        # counters describe the parent's traffic, not this process's.
+        self._lock = threading.Lock()
+        self.reset()
+
+    def to_prometheus(self, namespace: str = "facevault") -> str:
+        """Render the stats in the Prometheus text exposition format."""
+        lines: list[str] = []
+        with self._lock:
+            items = sorted(self._endpoints.items())
+
+            lines.append(f"# HELP {namespace}_requests_total Requests sent to the FaceVault API.")
+            lines.append(f"# TYPE {namespace}_requests_total counter")
+            for (method, endpoint), stats in items:
+                for status, n in sorted(stats.status_codes.items()):
+                    labels = _labels(method=method, endpoint=endpoint, status=status)
+                    lines.append(f"{namespace}_requests_total{{{labels}}} {n}")
+
+            counters = (
+                ("retries_total", "Retried request attempts.", "retries"),
+                ("request_bytes_total", "Request body bytes sent.", "request_bytes"),
+                ("response_bytes_total", "Response body bytes received.", "response_bytes"),
+            )
+            for name, help_text, attr in counters:
+                lines.append(f"# HELP {namespace}_{name} {help_text}")
+                lines.append(f"# TYPE {namespace}_{name} counter")
+                for (method, endpoint), stats in items:
+                    labels = _labels(method=method, endpoint=endpoint)
+                    lines.append(f"{namespace}_{name}{{{labels}}} {getattr(stats, attr)}")
+
+            histograms = (
+                ("request_duration_seconds", "Total request latency.", "latency"),
+                ("queue_wait_seconds", "Time spent waiting before the request was sent.", "queue_wait"),
+                ("connect_duration_seconds", "Time spent establishing connections.", "connect_time"),
+            )
+            for name, help_text, attr in histograms:
+                lines.append(f"# HELP {namespace}_{name} {help_text}")
+                lines.append(f"# TYPE {namespace}_{name} histogram")
+                for (method, endpoint), stats in items:
+                    histogram: LatencyHistogram = getattr(stats, attr)
+                    labels = _labels(method=method, endpoint=endpoint)
+                    for bound in _PROMETHEUS_BUCKETS:
+                        n = histogram.count_at_or_below(bound)
+                        lines.append(f'{namespace}_{name}_bucket{{{labels},le="{bound}"}} {n}')
+                    lines.append(f'{namespace}_{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                    lines.append(f"{namespace}_{name}_sum{{{labels}}} {histogram.total}")
+                    lines.append(f"{namespace}_{name}_count{{{labels}}} {histogram.count}")
+
+            for name, value in sorted(self._counters.items()):
+                lines.append(f"# TYPE {namespace}_{name}_total counter")
+                lines.append(f"{namespace}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+
+class _RequestTimer:
+    """Collects timing for one request from httpcore ``trace`` events."""
+
+    __slots__ = ("start", "first_io", "connect_started", "connect_done", "queue_wait")
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.first_io: float | None = None
+        self.connect_started: float | None = None
+        self.connect_done: float | None = None
+        # Lane wait alone, reported when the request never reached the network.
+        self.queue_wait = 0.0
+
+    def trace(self, name: str, info: dict) -> None:
+        now = time.perf_counter()
+        if name.endswith(".started") and self.first_io is None:
+            self.first_io = now
+        if name == "connection.connect_tcp.started":
+            self.connect_started = now
+        elif name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            self.connect_done = now
+
+    async def atrace(self, name: str, info: dict) -> None:
+        self.trace(name, info)
+
+    def stamp_elapsed(self, response: httpx.Response) -> None:
+        """Set ``response.elapsed`` where httpx leaves it unset.
+
+        httpx never sets it for a body the transport returned already read
+        (as mock transports do). Lane admission is left out, as it is from
+        the value httpx sets.
+        """
+        try:
+            response.elapsed
+        except RuntimeError:
+            response.elapsed = timedelta(seconds=time.perf_counter() - self.start - self.queue_wait)
+
+    def metrics(
+        self,
+        method: str,
+        endpoint: str,
+        request: object | None,
+        response: object | None,
+        error: BaseException | None,
+        retries: int = 0,
+        priority: str = "interactive",
+    ) -> RequestMetrics:
+        end = time.perf_counter()
+        if self.first_io is not None:
+            # The clock starts before lane admission, so this covers the lane wait too.
+            queue_wait = self.first_io - self.start
+        else:
+            queue_wait = self.queue_wait
+        connect_time = 0.0
+        if self.connect_started is not None and self.connect_done is not None:
+            connect_time = self.connect_done - self.connect_started
+        request_bytes = 0
+        if request is not None:
+            request_bytes = len(getattr(request, "content", b"") or b"")
+        status_code = None
+        response_bytes = 0
+        if response is not None:
+            status_code = response.status_code
+            response_bytes = len(response.content)
+        return RequestMetrics(
+            method=method,
+            endpoint=endpoint,
+            status_code=status_code,
+            retries=retries,
+            request_bytes=request_bytes,
+            response_bytes=response_bytes,
+            queue_wait=queue_wait,
+            connect_time=connect_time,
+            latency=end - self.start,
+            error=type(error).__name__ if error is not None else None,
+            priority=priority,
+        )
+
+
+def _emit(hooks: Sequence[MetricsHook], metrics: RequestMetrics) -> None:
+    for hook in hooks:
+        try:
+            hook.on_request(metrics)
+        except Exception:
+            logger.exception("FaceVault metrics hook %r failed", hook)
+
+
+def _emit_circuit_state(hooks: Sequence[MetricsHook], endpoint: str, old_state: str, new_state: str) -> None:
+    for hook in hooks:
+        try:
+            hook.on_circuit_state(endpoint, old_state, new_state)
+        except Exception:
+            logger.exception("FaceVault metrics hook %r failed", hook)
+
+
+def _format_percentile(q: float) -> str:
+    return f"p{q:g}".replace(".", "")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
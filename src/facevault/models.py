@@ -5,6 +5,13 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
 
+from . import _codec
+from ._timestamps import Timestamp, epoch
+
+
+TERMINAL_STATUSES = frozenset({"completed", "passed", "failed", "rejected", "expired", "cancelled"})
+"""Session statuses that will not change again."""
+
 
 @dataclass
 class Session:
@@ -24,18 +31,43 @@ class Session:
             f"webapp_url='{self.webapp_url.split('st=')[0]}st=***')"
         )
 
+    def to_bytes(self, *, redact: bool = False) -> bytes:
+        """Encode compactly, e.g. for a cache shared between processes.
+
+        With ``redact=True``, ``session_token``, ``webapp_url`` and
+        ``challenge_nonce`` are left out.
+        """
+        return _SESSION_CODEC.encode(self, redact)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Session:
+        """Decode bytes produced by :meth:`to_bytes`.
+
+        Raises:
+            ValueError: If ``data`` is not a valid encoding of this model.
+        """
+        return _SESSION_CODEC.decode(data)
+
+    def __reduce__(self) -> tuple:
+        return _SESSION_CODEC.reduce(self)
+
 
 @dataclass
 class SessionStatus:
-    """Returned by get_session(). Full session status."""
+    """Returned by get_session(). Full session status.
+
+    ``created_at`` and ``completed_at`` accept ISO-8601 strings and are
+    parsed into timezone-aware datetimes on first access. A string that is
+    not ISO-8601 is kept and returned as given.
+    """
 
     session_id: str
     status: str
     steps: dict[str, bool]
     face_match_passed: bool | None = None
     error: str = ""
-    created_at: datetime | None = None
-    completed_at: datetime | None = None
+    created_at: datetime | None = Timestamp()
+    completed_at: datetime | None = Timestamp()
     trust_score: float | None = None
     trust_decision: str | None = None
     require_poa: bool = False
@@ -43,6 +75,40 @@ class SessionStatus:
     anti_spoofing: dict | None = None
     credential: dict | None = None
 
+    @property
+    def is_terminal(self) -> bool:
+        """True once the session has reached a final status."""
+        return self.status in TERMINAL_STATUSES
+
+    @property
+    def created_at_epoch(self) -> int | None:
+        """``created_at`` as whole seconds since the Unix epoch."""
+        return epoch(self.created_at)
+
+    @property
+    def completed_at_epoch(self) -> int | None:
+        """``completed_at`` as whole seconds since the Unix epoch."""
+        return epoch(self.completed_at)
+
+    def to_bytes(self, *, redact: bool = False) -> bytes:
+        """Encode compactly, e.g. for a cache shared between processes.
+
+        With ``redact=True``, ``poa`` and ``credential`` are left out.
+        """
+        return _SESSION_STATUS_CODEC.encode(self, redact)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> SessionStatus:
+        """Decode bytes produced by :meth:`to_bytes`.
+
+        Raises:
+            ValueError: If ``data`` is not a valid encoding of this model.
+        """
+        return _SESSION_STATUS_CODEC.decode(data)
+
+    def __reduce__(self) -> tuple:
+        return _SESSION_STATUS_CODEC.reduce(self)
+
 
 @dataclass
 class WebhookEvent:
@@ -57,9 +123,94 @@ class WebhookEvent:
     anti_spoofing_score: float | None = None
     anti_spoofing_passed: bool | None = None
     confirmed_data: dict | None = None
-    completed_at: str | None = None
+    completed_at: datetime | None = Timestamp()
     document_check: dict | None = None
     trust_score: float | None = None
     trust_decision: str | None = None
     sanctions_hit: bool | None = None
     poa: dict | None = None
+
+    @property
+    def completed_at_epoch(self) -> int | None:
+        """``completed_at`` as whole seconds since the Unix epoch."""
+        return epoch(self.completed_at)
+
+    def to_bytes(self, *, redact: bool = False) -> bytes:
+        """Encode compactly, e.g. for a cache shared between processes.
+
+        With ``redact=True``, ``external_user_id``, ``confirmed_data``,
+        ``document_check`` and ``poa`` are left out.
+        """
+        return _WEBHOOK_EVENT_CODEC.encode(self, redact)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> WebhookEvent:
+        """Decode bytes produced by :meth:`to_bytes`.
+
+        Raises:
+            ValueError: If ``data`` is not a valid encoding of this model.
+        """
+        return _WEBHOOK_EVENT_CODEC.decode(data)
+
+    def __reduce__(self) -> tuple:
+        return _WEBHOOK_EVENT_CODEC.reduce(self)
+
+
+# Binary layouts for to_bytes()/from_bytes(). Only ever append fields.
+
+_SESSION_CODEC = _codec.Schema(
+    1,
+    Session,
+    [
+        ("session_id", _codec.STR),
+        ("session_token", _codec.STR),
+        ("steps", _codec.JSON),
+        ("webapp_url", _codec.STR),
+        ("challenge_nonce", _codec.STR),
+    ],
+    sensitive=("session_token", "webapp_url", "challenge_nonce"),
+)
+
+_SESSION_STATUS_CODEC = _codec.Schema(
+    2,
+    SessionStatus,
+    [
+        ("session_id", _codec.STR),
+        ("status", _codec.STR),
+        ("steps", _codec.JSON),
+        ("face_match_passed", _codec.BOOL),
+        ("error", _codec.STR),
+        ("created_at", _codec.TIME),
+        ("completed_at", _codec.TIME),
+        ("trust_score", _codec.FLOAT),
+        ("trust_decision", _codec.STR),
+        ("require_poa", _codec.BOOL),
+        ("poa", _codec.JSON),
+        ("anti_spoofing", _codec.JSON),
+        ("credential", _codec.JSON),
+    ],
+    sensitive=("poa", "credential"),
+)
+
+_WEBHOOK_EVENT_CODEC = _codec.Schema(
+    3,
+    WebhookEvent,
+    [
+        ("event", _codec.STR),
+        ("session_id", _codec.STR),
+        ("status", _codec.STR),
+        ("external_user_id", _codec.STR),
+        ("face_match_passed", _codec.BOOL),
+        ("face_match_score", _codec.FLOAT),
+        ("anti_spoofing_score", _codec.FLOAT),
+        ("anti_spoofing_passed", _codec.BOOL),
+        ("confirmed_data", _codec.JSON),
+        ("completed_at", _codec.TIME),
+        ("document_check", _codec.JSON),
+        ("trust_score", _codec.FLOAT),
+        ("trust_decision", _codec.STR),
+        ("sanctions_hit", _codec.BOOL),
+        ("poa", _codec.JSON),
+    ],
+    sensitive=("external_user_id", "confirmed_data", "document_check", "poa"),
+)
@@ -0,0 +1,162 @@
+"""Speculative session creation for :class:`AsyncFaceVaultClient`.
+
+With ``prefetch=PrefetchPolicy(...)``, call :meth:`~AsyncFaceVaultClient.prefetch`
+when a user is likely to verify soon (e.g. on ``/start``). A session is
+created in the background and kept for that ``external_user_id``; the next
+matching ``create_session`` returns it immediately instead of making a
+round-trip. If it is still being created, ``create_session`` waits for it
+rather than creating a second one.
+
+Prefetched sessions that are never used (they expire, are evicted to stay
+within ``max_entries``, or are left over when the client closes) are kept
+for reporting via :meth:`~AsyncFaceVaultClient.unused_prefetches`.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import anyio
+
+from .metrics import ClientStats
+from .models import Session
+
+_Key = Tuple[str, Optional[bool]]
+
+
+@dataclass
+class PrefetchPolicy:
+    """Configuration for prefetched sessions.
+
+    Args:
+        ttl: Seconds a prefetched session stays usable. Keep this below the
+            session lifetime configured for your FaceVault account.
+        max_entries: Most users with a prefetched session at once; the
+            oldest is dropped beyond that.
+        keep_unused: Most unused sessions remembered for
+            :meth:`~AsyncFaceVaultClient.unused_prefetches`.
+    """
+
+    ttl: float = 240.0
+    max_entries: int = 1000
+    keep_unused: int = 1000
+
+    def __post_init__(self) -> None:
+        if self.ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if self.max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+
+@dataclass
+class UnusedPrefetch:
+    """A prefetched session that was never handed out.
+
+    Attributes:
+        session: The session that was created.
+        external_user_id: The user it was created for.
+        created_at: Unix timestamp of its creation.
+        reason: ``"expired"``, ``"evicted"``, ``"abandoned"`` (a caller
+            stopped waiting for it) or ``"closed"``.
+    """
+
+    session: Session
+    external_user_id: str
+    created_at: float
+    reason: str
+
+
+class _Slot:
+    __slots__ = ("ready", "session", "created", "created_at", "orphaned")
+
+    def __init__(self) -> None:
+        self.ready = anyio.Event()
+        self.session: Session | None = None
+        self.created = 0.0
+        self.created_at = 0.0
+        # Why the slot was dropped while its session was still being created.
+        self.orphaned: str | None = None
+
+
+class _Prefetcher:
+    """Per-user prefetched sessions for one client. Used from a single event loop."""
+
+    def __init__(self, policy: PrefetchPolicy, stats: ClientStats):
+        self.policy = policy
+        self._stats = stats
+        self._slots: OrderedDict[_Key, _Slot] = OrderedDict()
+        self._unused: deque[UnusedPrefetch] = deque(maxlen=policy.keep_unused)
+
+    def begin(self, key: _Key) -> _Slot | None:
+        """Reserve a slot for a new prefetch, or return None if one is held or under way."""
+        self.expire()
+        if key in self._slots:
+            return None
+        slot = self._slots[key] = _Slot()
+        while len(self._slots) > self.policy.max_entries:
+            old_key, old = self._slots.popitem(last=False)
+            self._drop(old_key, old, "evicted")
+        return slot
+
+    def finish(self, key: _Key, slot: _Slot, session: Session | None) -> None:
+        """Record the outcome of a prefetch started with :meth:`begin`."""
+        slot.session = session
+        slot.created = time.monotonic()
+        slot.created_at = time.time()
+        slot.ready.set()
+        if session is None:
+            if self._slots.get(key) is slot:
+                del self._slots[key]
+        elif slot.orphaned is not None:
+            self._drop(key, slot, slot.orphaned)
+
+    async def take(self, key: _Key, timeout: float = math.inf) -> Session | None:
+        """Claim the prefetched session for ``key``, waiting up to ``timeout`` if it is under way."""
+        self.expire()
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return None
+        claimed = False
+        try:
+            if not slot.ready.is_set():
+                with anyio.move_on_after(timeout):
+                    await slot.ready.wait()
+            claimed = slot.ready.is_set()
+            return slot.session if claimed else None
+        finally:
+            # Also reached when the caller is cancelled while waiting: the
+            # slot is already popped, so record its session as unused.
+            if not claimed:
+                self._drop(key, slot, "abandoned")
+
+    def expire(self) -> None:
+        deadline = time.monotonic() - self.policy.ttl
+        # Slots are kept in the order their prefetches began, not the order they
+        # finished, so a fresh slot can sit ahead of an expired one: check them all.
+        for key, slot in list(self._slots.items()):
+            if not slot.ready.is_set() or slot.created > deadline:
+                continue
+            del self._slots[key]
+            self._drop(key, slot, "expired")
+
+    def close(self) -> None:
+        for key, slot in self._slots.items():
+            self._drop(key, slot, "closed")
+        self._slots.clear()
+
+    def unused(self) -> list[UnusedPrefetch]:
+        self.expire()
+        unused = list(self._unused)
+        self._unused.clear()
+        return unused
+
+    def _drop(self, key: _Key, slot: _Slot, reason: str) -> None:
+        if slot.session is None:
+            slot.orphaned = reason  # recorded once its session arrives
+            return
+        self._stats.increment("prefetch_unused")
+        self._unused.append(UnusedPrefetch(slot.session, key[0], slot.created_at, reason))
@@ -0,0 +1,555 @@
+"""Local record of the sessions your application has created.
+
+A :class:`SessionRegistry` remembers every session a client creates and
+follows it through later ``get_session`` results and webhook events, so
+questions like "what is this user's latest session?" or "which sessions
+have been stuck in progress for ten minutes?" are answered locally instead
+of by re-querying the API::
+
+    registry = SQLiteSessionRegistry("sessions.db")
+    client = FaceVaultClient("fv_live_...", registry=registry)
+
+    client.create_session("user-42")          # recorded automatically
+    registry.record_event(parse_event(body))  # from your webhook handler
+
+    latest = registry.latest_for_user("user-42")
+    stuck = registry.in_progress(older_than=600)
+
+Records are indexed by ``session_id``, ``external_user_id``, status and
+creation time; every lookup is a dictionary access, a binary search or a
+B-tree index seek.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Iterator
+
+from ._timestamps import parse_iso
+from .models import TERMINAL_STATUSES, Session, SessionStatus, WebhookEvent
+
+
+@dataclass
+class SessionRecord:
+    """What the registry knows about one session.
+
+    Timestamps are Unix timestamps in seconds. ``created_at`` is when the
+    session was recorded (or the API's creation time, if that arrived
+    first); ``updated_at`` is when the registry last saw news about it.
+    """
+
+    session_id: str
+    external_user_id: str | None
+    status: str
+    created_at: float
+    updated_at: float
+    completed_at: float | None = None
+    face_match_passed: bool | None = None
+    trust_score: float | None = None
+    trust_decision: str | None = None
+
+    @property
+    def is_terminal(self) -> bool:
+        """True once the session has reached a final status."""
+        return self.status in TERMINAL_STATUSES
+
+
+def _timestamp(value: datetime | str | float | None) -> float | None:
+    """Convert an API timestamp (ISO-8601 string, datetime or epoch) to epoch seconds.
+
+    Returns None for a missing or unparseable value, so a malformed timestamp
+    never stops the rest of the update from being recorded.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            value = parse_iso(value)
+        except ValueError:
+            return None
+    return value.timestamp()
+
+
+class SessionRegistry(ABC):
+    """Base class for registry backends.
+
+    Backends implement :meth:`_load` and :meth:`_store` plus the query
+    methods; the ``record_*`` methods are shared.
+    """
+
+    def record_session(
+        self, session: Session, external_user_id: str, *, created_at: float | None = None
+    ) -> SessionRecord:
+        """Record a session returned by ``create_session()``.
+
+        Args:
+            session: The new session.
+            external_user_id: The user identifier it was created for.
+            created_at: Creation time as a Unix timestamp. Defaults to now.
+                If the session is already known (e.g. a webhook arrived
+                first), the earlier of the two times is kept.
+
+        Returns:
+            The stored record.
+        """
+        now = time.time()
+        created = now if created_at is None else created_at
+        with self._lock:
+            record = self._load(session.session_id)
+            if record is None:
+                record = SessionRecord(
+                    session_id=session.session_id,
+                    external_user_id=external_user_id,
+                    status="pending",
+                    created_at=created,
+                    updated_at=now,
+                )
+            else:
+                record = replace(
+                    record, external_user_id=external_user_id, created_at=min(record.created_at, created)
+                )
+            self._store(record)
+            return record
+
+    def record_status(self, status: SessionStatus) -> SessionRecord:
+        """Record a ``get_session()`` result.
+
+        Sessions the registry has not seen before are added with an unknown
+        ``external_user_id``.
+
+        Returns:
+            The updated record.
+        """
+        return self._update(
+            status.session_id,
+            status=status.status,
+            created_at=_timestamp(status.created_at),
+            completed_at=_timestamp(status.completed_at),
+            face_match_passed=status.face_match_passed,
+            trust_score=status.trust_score,
+            trust_decision=status.trust_decision,
+        )
+
+    def record_event(self, event: WebhookEvent) -> SessionRecord:
+        """Record a webhook event.
+
+        Returns:
+            The updated record.
+        """
+        return self._update(
+            event.session_id,
+            status=event.status,
+            external_user_id=event.external_user_id,
+            completed_at=_timestamp(event.completed_at),
+            face_match_passed=event.face_match_passed,
+            trust_score=event.trust_score,
+            trust_decision=event.trust_decision,
+        )
+
+    def _update(
+        self, session_id: str, *, status: str, created_at: float | None = None, **fields: object
+    ) -> SessionRecord:
+        now = time.time()
+        with self._lock:
+            record = self._load(session_id)
+            if record is None:
+                record = SessionRecord(
+                    session_id=session_id,
+                    external_user_id=None,
+                    status=status,
+                    created_at=now if created_at is None else created_at,
+                    updated_at=now,
+                )
+            # A terminal status is final; a late or reordered update must not reopen it.
+            if not record.is_terminal:
+                record.status = status
+            changes = {key: value for key, value in fields.items() if value is not None}
+            record = replace(record, updated_at=now, **changes)
+            self._store(record)
+            return record
+
+    def touch(self, session_id: str) -> SessionRecord | None:
+        """Set a session's ``updated_at`` to now without changing anything else.
+
+        The sweeper uses this to send sessions it failed to refresh to the
+        back of the :meth:`in_progress` queue.
+
+        Returns:
+            The updated record, or None if the session is unknown.
+        """
+        with self._lock:
+            record = self._load(session_id)
+            if record is None:
+                return None
+            record = replace(record, updated_at=time.time())
+            self._store(record)
+            return record
+
+    def get(self, session_id: str) -> SessionRecord | None:
+        """Return the record for ``session_id``, or None if unknown."""
+        with self._lock:
+            return self._load(session_id)
+
+    @abstractmethod
+    def latest_for_user(self, external_user_id: str) -> SessionRecord | None:
+        """Return the most recently created session for a user, or None."""
+
+    @abstractmethod
+    def for_user(self, external_user_id: str) -> list[SessionRecord]:
+        """Return all sessions for a user, oldest first."""
+
+    @abstractmethod
+    def by_status(self, status: str, *, limit: int | None = None) -> list[SessionRecord]:
+        """Return sessions with the given status, least recently updated first."""
+
+    @abstractmethod
+    def created_between(self, start: float, end: float) -> list[SessionRecord]:
+        """Return sessions created in ``[start, end)`` (Unix timestamps), oldest first."""
+
+    @abstractmethod
+    def in_progress(
+        self,
+        *,
+        older_than: float = 0.0,
+        stale_for: float = 0.0,
+        limit: int | None = None,
+    ) -> list[SessionRecord]:
+        """Return sessions that have not reached a terminal status.
+
+        Args:
+            older_than: Only sessions created at least this many seconds ago.
+            stale_for: Only sessions not updated for at least this many
+                seconds.
+            limit: Maximum number of records to return.
+
+        Returns:
+            Matching records, least recently updated first.
+        """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+    def __enter__(self) -> SessionRegistry:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def _after_fork(self) -> None:
+        self._lock = threading.RLock()
+
+    # Backend storage primitives; called with ``self._lock`` held.
+
+    _lock: threading.RLock
+
+    @abstractmethod
+    def _load(self, session_id: str) -> SessionRecord | None:
+        ...
+
+    @abstractmethod
+    def _store(self, record: SessionRecord) -> None:
+        ...
+
+
+class InMemorySessionRegistry(SessionRegistry):
+    """Registry kept in process memory, lost on restart.
+
+    Secondary indexes are sorted lists maintained with :mod:`bisect`. Open
+    sessions are indexed twice, by update and by creation time, so
+    :meth:`in_progress` scans only the candidates of its more selective
+    cutoff.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        _live_registries.add(self)
+        self._records: dict[str, SessionRecord] = {}
+        self._by_user: dict[str, list[tuple[float, str]]] = {}
+        self._by_status: dict[str, list[tuple[float, str]]] = {}
+        self._by_created: list[tuple[float, str]] = []
+        self._open: list[tuple[float, str]] = []
+        self._open_created: list[tuple[float, str]] = []
+
+    def _load(self, session_id: str) -> SessionRecord | None:
+        record = self._records.get(session_id)
+        return None if record is None else replace(record)
+
+    def _store(self, record: SessionRecord) -> None:
+        old = self._records.get(record.session_id)
+        if old is not None:
+            self._unindex(old)
+        record = replace(record)
+        self._records[record.session_id] = record
+        self._index(record)
+
+    def _index(self, record: SessionRecord) -> None:
+        sid = record.session_id
+        if record.external_user_id is not None:
+            bisect.insort(self._by_user.setdefault(record.external_user_id, []), (record.created_at, sid))
+        bisect.insort(self._by_status.setdefault(record.status, []), (record.updated_at, sid))
+        bisect.insort(self._by_created, (record.created_at, sid))
+        if not record.is_terminal:
+            bisect.insort(self._open, (record.updated_at, sid))
+            bisect.insort(self._open_created, (record.created_at, sid))
+
+    def _unindex(self, record: SessionRecord) -> None:
+        sid = record.session_id
+        if record.external_user_id is not None:
+            _discard(self._by_user[record.external_user_id], (record.created_at, sid))
+        _discard(self._by_status[record.status], (record.updated_at, sid))
+        _discard(self._by_created, (record.created_at, sid))
+        if not record.is_terminal:
+            _discard(self._open, (record.updated_at, sid))
+            _discard(self._open_created, (record.created_at, sid))
+
+    def _records_for(self, keys: Iterator[tuple[float, str]]) -> list[SessionRecord]:
+        return [replace(self._records[sid]) for _, sid in keys]
+
+    def latest_for_user(self, external_user_id: str) -> SessionRecord | None:
+        with self._lock:
+            index = self._by_user.get(external_user_id)
+            return replace(self._records[index[-1][1]]) if index else None
+
+    def for_user(self, external_user_id: str) -> list[SessionRecord]:
+        with self._lock:
+            return self._records_for(iter(self._by_user.get(external_user_id, ())))
+
+    def by_status(self, status: str, *, limit: int | None = None) -> list[SessionRecord]:
+        with self._lock:
+            return self._records_for(iter(self._by_status.get(status, ())[:limit]))
+
+    def created_between(self, start: float, end: float) -> list[SessionRecord]:
+        with self._lock:
+            lo = bisect.bisect_left(self._by_created, (start, ""))
+            hi = bisect.bisect_left(self._by_created, (end, ""))
+            return self._records_for(iter(self._by_created[lo:hi]))
+
+    def in_progress(
+        self,
+        *,
+        older_than: float = 0.0,
+        stale_for: float = 0.0,
+        limit: int | None = None,
+    ) -> list[SessionRecord]:
+        now = time.time()
+        updated_cutoff = now - stale_for
+        created_cutoff = now - older_than
+        with self._lock:
+            stale = bisect.bisect_right(self._open, (updated_cutoff, "\uffff"))
+            old = bisect.bisect_right(self._open_created, (created_cutoff, "\uffff"))
+            if stale <= old:
+                # Already in result order: filter and stop at the limit.
+                result = []
+                for _, sid in self._open[:stale]:
+                    record = self._records[sid]
+                    if record.created_at <= created_cutoff:
+                        result.append(replace(record))
+                        if limit is not None and len(result) >= limit:
+                            break
+                return result
+            matches = [
+                (record.updated_at, sid)
+                for _, sid in self._open_created[:old]
+                if (record := self._records[sid]).updated_at <= updated_cutoff
+            ]
+            matches.sort()
+            return self._records_for(iter(matches[:limit]))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+_live_registries: weakref.WeakSet[SessionRegistry] = weakref.WeakSet()
+_inherited_connections: list[sqlite3.Connection] = []
+
+
+def _after_fork_in_child() -> None:
+    for registry in list(_live_registries):
+        registry._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _discard(index: list[tuple[float, str]], key: tuple[float, str]) -> None:
+    i = bisect.bisect_left(index, key)
+    if i < len(index) and index[i] == key:
+        del index[i]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS facevault_sessions (
+    session_id TEXT PRIMARY KEY,
+    external_user_id TEXT,
+    status TEXT NOT NULL,
+    terminal INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    completed_at REAL,
+    face_match_passed INTEGER,
+    trust_score REAL,
+    trust_decision TEXT
+);
+CREATE INDEX IF NOT EXISTS facevault_sessions_user ON facevault_sessions (external_user_id, created_at);
+CREATE INDEX IF NOT EXISTS facevault_sessions_status ON facevault_sessions (status, updated_at);
+CREATE INDEX IF NOT EXISTS facevault_sessions_created ON facevault_sessions (created_at);
+DROP INDEX IF EXISTS facevault_sessions_open;
+CREATE INDEX IF NOT EXISTS facevault_sessions_open_due ON facevault_sessions (terminal, updated_at, created_at);
+"""
+
+_COLUMNS = (
+    "session_id, external_user_id, status, created_at, updated_at, "
+    "completed_at, face_match_passed, trust_score, trust_decision"
+)
+
+
+class SQLiteSessionRegistry(SessionRegistry):
+    """Registry stored in a SQLite database, shared across restarts and processes.
+
+    Args:
+        path: Database file path, or ``":memory:"``.
+        timeout: Seconds to wait for another process's write lock.
+    """
+
+    def __init__(self, path: str = "facevault_sessions.db", *, timeout: float = 5.0):
+        self._lock = threading.RLock()
+        self._path = path
+        self._timeout = timeout
+        self._db = self._connect()
+        self._db.executescript(_SCHEMA)
+        _live_registries.add(self)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self._path, timeout=self._timeout, check_same_thread=False, isolation_level=None)
+        if self._path != ":memory:":
+            db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def _after_fork(self) -> None:
+        super()._after_fork()
+        # SQLite connections must not be used across fork(); an in-memory
+        # database is private to this process anyway, so it can be kept. The
+        # inherited connection is never closed either, since closing it can
+        # touch the parent's file locks and WAL.
+        if self._path != ":memory:":
+            _inherited_connections.append(self._db)
+            self._db = self._connect()
+
+    def _query(self, sql: str, params: tuple = ()) -> list[SessionRecord]:
+        with self._lock:
+            rows = self._db.execute(f"SELECT {_COLUMNS} FROM facevault_sessions {sql}", params).fetchall()
+        return [_from_row(row) for row in rows]
+
+    def _load(self, session_id: str) -> SessionRecord | None:
+        rows = self._query("WHERE session_id = ?", (session_id,))
+        return rows[0] if rows else None
+
+    def _store(self, record: SessionRecord) -> None:
+        self._db.execute(
+            f"INSERT OR REPLACE INTO facevault_sessions ({_COLUMNS}, terminal) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                record.session_id,
+                record.external_user_id,
+                record.status,
+                record.created_at,
+                record.updated_at,
+                record.completed_at,
+                record.face_match_passed,
+                record.trust_score,
+                record.trust_decision,
+                int(record.is_terminal),
+            ),
+        )
+
+    def record_session(
+        self, session: Session, external_user_id: str, *, created_at: float | None = None
+    ) -> SessionRecord:
+        with self._lock, _transaction(self._db):
+            return super().record_session(session, external_user_id, created_at=created_at)
+
+    def _update(self, session_id: str, **kwargs: object) -> SessionRecord:
+        with self._lock, _transaction(self._db):
+            return super()._update(session_id, **kwargs)
+
+    def touch(self, session_id: str) -> SessionRecord | None:
+        with self._lock, _transaction(self._db):
+            return super().touch(session_id)
+
+    def latest_for_user(self, external_user_id: str) -> SessionRecord | None:
+        rows = self._query(
+            "WHERE external_user_id = ? ORDER BY created_at DESC LIMIT 1", (external_user_id,)
+        )
+        return rows[0] if rows else None
+
+    def for_user(self, external_user_id: str) -> list[SessionRecord]:
+        return self._query("WHERE external_user_id = ? ORDER BY created_at", (external_user_id,))
+
+    def by_status(self, status: str, *, limit: int | None = None) -> list[SessionRecord]:
+        return self._query(
+            "WHERE status = ? ORDER BY updated_at LIMIT ?", (status, -1 if limit is None else limit)
+        )
+
+    def created_between(self, start: float, end: float) -> list[SessionRecord]:
+        return self._query(
+            "WHERE created_at >= ? AND created_at < ? ORDER BY created_at", (start, end)
+        )
+
+    def in_progress(
+        self,
+        *,
+        older_than: float = 0.0,
+        stale_for: float = 0.0,
+        limit: int | None = None,
+    ) -> list[SessionRecord]:
+        now = time.time()
+        # facevault_sessions_open_due yields rows in result order and carries
+        # created_at, so sessions too young are skipped without reading the
+        # table and the scan ends once ``limit`` rows match.
+        return self._query(
+            "WHERE terminal = 0 AND updated_at <= ? AND created_at <= ? ORDER BY updated_at LIMIT ?",
+            (now - stale_for, now - older_than, -1 if limit is None else limit),
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM facevault_sessions").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class _transaction:
+    """Wrap a read-modify-write in ``BEGIN IMMEDIATE`` so concurrent processes serialise."""
+
+    def __init__(self, db: sqlite3.Connection):
+        self._db = db
+
+    def __enter__(self) -> None:
+        self._db.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type: type | None, *args: object) -> None:
+        self._db.execute("ROLLBACK" if exc_type is not None else "COMMIT")
+
+
+def _from_row(row: tuple) -> SessionRecord:
+    record = SessionRecord(*row)
+    if record.face_match_passed is not None:
+        record.face_match_passed = bool(record.face_match_passed)
+    return record
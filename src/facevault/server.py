@@ -0,0 +1,579 @@
+"""Multi-process webhook receiver: ``python -m facevault serve-webhooks``.
+
+Webhook verification is CPU-bound pure Python, so a single process tops out
+on one core. :class:`WebhookServer` binds the listening socket once and forks
+``workers`` processes that all accept from it (or, with ``reuse_port``, each
+worker binds its own ``SO_REUSEPORT`` socket and the kernel spreads
+connections between them). Every worker verifies and parses deliveries and
+passes each :class:`~facevault.WebhookEvent` to your handler::
+
+    python -m facevault serve-webhooks --handler myapp.hooks:on_event --workers 8
+
+Responses are 200 once the handler returns, 401 for a bad signature, 400 for
+a malformed body, 413 above ``max_body_size`` and 500 if the handler raises
+(so FaceVault retries the delivery). Bodies may be sent with a
+``Content-Length`` or ``Transfer-Encoding: chunked``; any other transfer
+coding gets 411.
+
+Signals to the main process:
+
+- ``SIGHUP``: graceful restart. A new generation of workers starts (importing
+  the handler afresh), then the old workers finish in-flight requests and exit.
+- ``SIGUSR1``: every worker logs its :class:`WorkerStats` as a JSON line.
+- ``SIGTERM`` / ``SIGINT``: graceful shutdown.
+
+Workers that die are restarted. Requires a POSIX system (``os.fork``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.server
+import importlib
+import importlib.util
+import inspect
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from typing import Any, Callable, Union
+
+from .exceptions import PayloadTooLargeError
+from .metrics import LatencyHistogram
+from .models import WebhookEvent
+from .webhook import DEFAULT_MAX_BODY_SIZE, StreamingVerifier
+
+logger = logging.getLogger("facevault")
+
+Handler = Callable[[WebhookEvent], Any]
+"""Called with each verified event. Raising makes the server answer 500."""
+
+# Exit status of a worker that could not start (e.g. the handler failed to import).
+_BOOT_ERROR = 3
+# Minimum seconds between restarts of a crashing worker.
+_RESTART_BACKOFF = 1.0
+# Longest chunk-size or trailer line accepted in a chunked request body.
+_MAX_LINE = 4096
+
+
+def load_handler(path: str) -> Handler:
+    """Import a handler given as ``"package.module:function"``.
+
+    Raises:
+        ValueError: If ``path`` is not of that form.
+        ImportError: If the module cannot be imported.
+        AttributeError: If the module has no such attribute.
+        TypeError: If the attribute is not callable, or is an ``async`` function.
+    """
+    module_name, sep, attr = path.partition(":")
+    if not sep or not module_name or not attr:
+        raise ValueError(f"Handler must look like 'package.module:function' (got {path!r})")
+    target: Any = importlib.import_module(module_name)
+    for part in attr.split("."):
+        target = getattr(target, part)
+    _check_handler(target, path)
+    return target
+
+
+def _check_handler(handler: Any, name: str) -> None:
+    if not callable(handler):
+        raise TypeError(f"Handler {name!r} is not callable")
+    # Workers call the handler synchronously; a coroutine would never be awaited.
+    if inspect.iscoroutinefunction(handler) or inspect.iscoroutinefunction(getattr(handler, "__call__", None)):
+        raise TypeError(
+            f"Handler {name!r} is an async function; webhook workers need a plain function "
+            "(wrap it with asyncio.run or anyio.run)"
+        )
+
+
+class WorkerStats:
+    """Request counters and latency for one worker process."""
+
+    COUNTERS = ("received", "accepted", "bad_signature", "malformed", "too_large", "handler_errors")
+
+    def __init__(self, generation: int = 0):
+        self._lock = threading.Lock()
+        self.generation = generation
+        self.started = time.time()
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.latency = LatencyHistogram()
+
+    def record(self, outcome: str, seconds: float) -> None:
+        with self._lock:
+            self.counters["received"] += 1
+            self.counters[outcome] += 1
+            self.latency.record(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "generation": self.generation,
+                "uptime": time.time() - self.started,
+                **self.counters,
+                "latency": self.latency.snapshot(),
+            }
+
+
+class _ChunkedBody:
+    """``wsgi.input`` for a ``Transfer-Encoding: chunked`` request body.
+
+    Reads return ``b""`` once the last chunk and any trailers are consumed,
+    leaving the connection at the start of the next request.
+
+    Raises:
+        ValueError: From :meth:`read`, if the chunked framing is malformed.
+    """
+
+    def __init__(self, rfile: Any):
+        self._rfile = rfile
+        self._left = 0
+        self.done = False
+
+    def read(self, size: int) -> bytes:
+        if self.done:
+            return b""
+        if not self._left:
+            self._left = self._chunk_size()
+            if not self._left:
+                self._skip_trailers()
+                self.done = True
+                return b""
+        data = self._rfile.read(min(size, self._left))
+        if not data:
+            raise ValueError("Chunked body ended early")
+        self._left -= len(data)
+        if not self._left and self._line() != b"":
+            raise ValueError("Missing CRLF after chunk")
+        return data
+
+    def _line(self) -> bytes:
+        line = self._rfile.readline(_MAX_LINE + 1)
+        if len(line) > _MAX_LINE or not line.endswith(b"\n"):
+            raise ValueError("Malformed chunked body")
+        return line.rstrip(b"\r\n")
+
+    def _chunk_size(self) -> int:
+        size = self._line().split(b";", 1)[0].strip()
+        if not size or size.lstrip(b"0123456789abcdefABCDEF"):
+            raise ValueError(f"Invalid chunk size {size!r}")
+        return int(size, 16)
+
+    def _skip_trailers(self) -> None:
+        while self._line():
+            pass
+
+
+class _RequestHandler(http.server.BaseHTTPRequestHandler):
+    server: _WorkerServer
+    protocol_version = "HTTP/1.1"
+    timeout = 30  # seconds a slow client may take per read
+
+    def do_POST(self) -> None:
+        if self.path.split("?", 1)[0] != self.server.path:
+            self._respond(404, {"error": "not found"})
+            return
+        encoding = self.headers.get("Transfer-Encoding")
+        if encoding is None:
+            status, body = self.server.deliver(self.headers, self.rfile)
+            if status == 413:
+                self.close_connection = True  # the rest of the body was never read
+        elif encoding.strip().lower() == "chunked":
+            chunked = _ChunkedBody(self.rfile)
+            status, body = self.server.deliver(self.headers, chunked, chunked=True)
+            # A rejected or malformed body may not have been read to its end.
+            self.close_connection = not chunked.done
+        else:
+            # The body's length can't be determined, so the connection can't be reused.
+            self.close_connection = True
+            status, body = 411, {"error": "length required"}
+        self._respond(status, body)
+
+    def _respond(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class _WorkerServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    # Join in-flight requests on close, so shutting down drains them.
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        handler: Handler,
+        secret: str,
+        *,
+        path: str,
+        max_body_size: int,
+        stats: WorkerStats,
+    ):
+        super().__init__(sock.getsockname()[:2], _RequestHandler, bind_and_activate=False)
+        self.socket.close()
+        self.socket = sock
+        self.handler = handler
+        self.secret = secret
+        self.path = path
+        self.max_body_size = max_body_size
+        self.stats = stats
+        self._log_stats = False
+
+    def get_request(self) -> tuple[socket.socket, Any]:
+        # The listening socket is non-blocking, so workers racing for a connection don't stall.
+        conn, address = self.socket.accept()
+        conn.setblocking(True)
+        return conn, address
+
+    def deliver(self, headers: Any, rfile: Any, *, chunked: bool = False) -> tuple[int, dict]:
+        """Verify, parse and dispatch one delivery. Returns the status and response body.
+
+        With ``chunked``, ``rfile`` is the decoded body and ends at EOF; any
+        ``Content-Length`` header is ignored.
+        """
+        start = time.perf_counter()
+        outcome = "accepted"
+        try:
+            try:
+                verifier = StreamingVerifier.from_wsgi({
+                    "CONTENT_LENGTH": None if chunked else headers.get("Content-Length"),
+                    "HTTP_X_SIGNATURE": headers.get("X-Signature", ""),
+                    "wsgi.input": rfile,
+                    "wsgi.input_terminated": chunked,
+                }, self.secret, max_body_size=self.max_body_size)
+            except PayloadTooLargeError as exc:
+                outcome = "too_large"
+                return 413, {"error": str(exc)}
+            except ValueError:
+                outcome = "malformed"
+                return 400, {"error": "malformed body"}
+            if not verifier.verify():
+                outcome = "bad_signature"
+                return 401, {"error": "invalid signature"}
+            try:
+                event = verifier.event()
+            except ValueError:
+                outcome = "malformed"
+                return 400, {"error": "malformed body"}
+            try:
+                self.handler(event)
+            except Exception:
+                logger.exception("Webhook handler failed for session %s", event.session_id)
+                outcome = "handler_errors"
+                return 500, {"error": "handler failed"}
+            return 200, {"ok": True}
+        finally:
+            self.stats.record(outcome, time.perf_counter() - start)
+
+    def request_stats_log(self) -> None:
+        self._log_stats = True
+
+    def service_actions(self) -> None:
+        if self._log_stats:
+            self._log_stats = False
+            logger.info("worker stats %s", json.dumps(self.stats.snapshot()))
+
+
+class WebhookServer:
+    """Pre-forking webhook receiver.
+
+    Args:
+        handler: Callable receiving each verified event, or its import path
+            (``"package.module:function"``). An import path is imported in
+            each worker, so a ``SIGHUP`` restart picks up new code. It is
+            called synchronously, so it must not be an ``async`` function.
+        secret: Your webhook secret (from API dashboard).
+        host: Address to listen on.
+        port: Port to listen on; ``0`` picks a free port (see :attr:`address`).
+        workers: Worker processes. Defaults to the number of CPUs.
+        path: URL path deliveries are posted to.
+        reuse_port: Give each worker its own ``SO_REUSEPORT`` socket instead
+            of sharing one (Linux and BSD), spreading connections more evenly.
+        max_body_size: Largest body accepted, in bytes.
+        graceful_timeout: Seconds workers get to drain before being killed.
+    """
+
+    def __init__(
+        self,
+        handler: Union[Handler, str],
+        secret: str,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        workers: int | None = None,
+        path: str = "/",
+        reuse_port: bool = False,
+        max_body_size: int = DEFAULT_MAX_BODY_SIZE,
+        graceful_timeout: float = 30.0,
+    ):
+        if not secret:
+            raise ValueError("A webhook secret is required")
+        workers = workers or os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if reuse_port and not hasattr(socket, "SO_REUSEPORT"):
+            raise ValueError("SO_REUSEPORT is not supported on this platform")
+        if isinstance(handler, str):
+            if importlib.util.find_spec(handler.partition(":")[0]) is None:
+                raise ImportError(f"Cannot find handler module for {handler!r}")
+        else:
+            _check_handler(handler, getattr(handler, "__qualname__", repr(handler)))
+        self.handler = handler
+        self.secret = secret
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.path = path
+        self.reuse_port = reuse_port
+        self.max_body_size = max_body_size
+        self.graceful_timeout = graceful_timeout
+        self._socket: socket.socket | None = None
+        self._children: dict[int, int] = {}  # pid -> generation
+        self._generation = 0
+        self._signals: list[int] = []
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """The ``(host, port)`` being served, once :meth:`run` has bound it."""
+        if self._socket is None:
+            return self.host, self.port
+        return self._socket.getsockname()[:2]
+
+    def run(self) -> int:
+        """Serve until ``SIGTERM`` or ``SIGINT``. Returns a process exit status.
+
+        Raises:
+            RuntimeError: If the platform cannot fork.
+        """
+        if not hasattr(os, "fork"):
+            raise RuntimeError("serve-webhooks requires os.fork (a POSIX system)")
+        self._socket = self._bind()
+        self.port = self.address[1]
+        if not self.reuse_port:
+            self._socket.listen(1024)
+            self._socket.setblocking(False)
+        logger.info("Listening on http://%s:%d%s with %d workers", *self.address, self.path, self.workers)
+
+        previous = {
+            signum: signal.signal(signum, self._on_signal)
+            for signum in (signal.SIGHUP, signal.SIGUSR1, signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            return self._supervise()
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+            self._socket.close()
+
+    # ── Main process ────────────────────────────────────────
+
+    def _bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((self.host, self.port))
+        return sock
+
+    def _on_signal(self, signum: int, frame: Any) -> None:
+        self._signals.append(signum)
+
+    def _supervise(self) -> int:
+        for _ in range(self.workers):
+            self._spawn()
+        last_restart = 0.0
+        missing = 0
+        while True:
+            while self._signals:
+                signum = self._signals.pop(0)
+                if signum in (signal.SIGTERM, signal.SIGINT):
+                    self._stop_all()
+                    return 0
+                if signum == signal.SIGHUP:
+                    self._reload()
+                elif signum == signal.SIGUSR1:
+                    for pid in self._children:
+                        self._kill(pid, signal.SIGUSR1)
+
+            for pid, status in self._reap():
+                generation = self._children.pop(pid)
+                code = os.waitstatus_to_exitcode(status)
+                if generation != self._generation:
+                    logger.info("Worker %d (generation %d) exited", pid, generation)
+                    continue
+                if code == _BOOT_ERROR:
+                    logger.error("Worker %d failed to start; shutting down", pid)
+                    self._stop_all()
+                    return 1
+                logger.warning("Worker %d exited unexpectedly (status %d); restarting", pid, code)
+                missing += 1
+
+            if missing and time.monotonic() - last_restart >= _RESTART_BACKOFF:
+                missing -= 1
+                last_restart = time.monotonic()
+                self._spawn()
+            time.sleep(0.1)
+
+    def _reap(self) -> list[tuple[int, int]]:
+        exited = []
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            if pid in self._children:
+                exited.append((pid, status))
+        return exited
+
+    def _reload(self) -> None:
+        old = [pid for pid, generation in self._children.items() if generation == self._generation]
+        self._generation += 1
+        logger.info("Reloading: starting worker generation %d", self._generation)
+        for _ in range(self.workers):
+            self._spawn()
+        for pid in old:
+            self._kill(pid, signal.SIGTERM)
+
+    def _stop_all(self) -> None:
+        logger.info("Shutting down %d workers", len(self._children))
+        for pid in self._children:
+            self._kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self._children and time.monotonic() < deadline:
+            for pid, _ in self._reap():
+                self._children.pop(pid)
+            time.sleep(0.05)
+        for pid in self._children:
+            logger.warning("Worker %d did not stop in time; killing it", pid)
+            self._kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self._children.clear()
+
+    @staticmethod
+    def _kill(pid: int, signum: int) -> None:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def _spawn(self) -> None:
+        generation = self._generation
+        pid = os.fork()
+        if pid:
+            self._children[pid] = generation
+            logger.info("Booted worker %d (generation %d)", pid, generation)
+            return
+        code = 1
+        try:
+            code = self._work(generation)
+        except BaseException:
+            logger.exception("Worker %d crashed", os.getpid())
+        finally:
+            logging.shutdown()
+            os._exit(code)
+
+    # ── Worker process ──────────────────────────────────────
+
+    def _work(self, generation: int) -> int:
+        # Ctrl-C and terminal hangups reach the whole process group; the main process decides what to do.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        self._children = {}
+        try:
+            handler = load_handler(self.handler) if isinstance(self.handler, str) else self.handler
+            if self.reuse_port:
+                sock = self._bind()
+                sock.listen(1024)
+                sock.setblocking(False)
+            else:
+                sock = self._socket
+        except Exception:
+            logger.exception("Worker %d failed to start", os.getpid())
+            return _BOOT_ERROR
+
+        stats = WorkerStats(generation)
+        server = _WorkerServer(
+            sock, handler, self.secret, path=self.path, max_body_size=self.max_body_size, stats=stats
+        )
+        signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+        signal.signal(signal.SIGUSR1, lambda signum, frame: server.request_stats_log())
+        try:
+            server.serve_forever(poll_interval=0.5)
+        finally:
+            server.server_close()  # waits for in-flight requests
+        logger.info("worker stats %s", json.dumps(stats.snapshot()))
+        return 0
+
+
+# ── Command line ────────────────────────────────────────────
+
+
+def add_parser(subparsers: Any) -> None:
+    """Register the ``serve-webhooks`` subcommand."""
+    parser = subparsers.add_parser(
+        "serve-webhooks",
+        help="Receive webhooks on multiple worker processes",
+        description="Verify FaceVault webhooks on a pool of worker processes and pass each event to a handler.",
+    )
+    parser.add_argument("--handler", help="Handler import path, package.module:function (default: accept and discard)")
+    parser.add_argument(
+        "--secret", default=os.environ.get("FACEVAULT_WEBHOOK_SECRET"),
+        help="Webhook secret (default: $FACEVAULT_WEBHOOK_SECRET)",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("-p", "--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument("-w", "--workers", type=int, help="Worker processes (default: number of CPUs)")
+    parser.add_argument("--path", default="/", help="URL path webhooks are posted to (default: /)")
+    parser.add_argument("--reuse-port", action="store_true", help="Give each worker its own SO_REUSEPORT socket")
+    parser.add_argument(
+        "--max-body-size", type=int, default=DEFAULT_MAX_BODY_SIZE,
+        help=f"Largest body accepted, in bytes (default: {DEFAULT_MAX_BODY_SIZE})",
+    )
+    parser.add_argument(
+        "--graceful-timeout", type=float, default=30.0,
+        help="Seconds workers get to finish in-flight requests on shutdown (default: 30)",
+    )
+    parser.add_argument("--log-level", default="INFO", help="Logging level (default: INFO)")
+    parser.set_defaults(func=_main)
+
+
+def _discard(event: WebhookEvent) -> None:
+    pass
+
+
+def _main(args: argparse.Namespace) -> int:
+    if not args.secret:
+        print("error: a webhook secret is required (--secret or $FACEVAULT_WEBHOOK_SECRET)", file=sys.stderr)
+        return 2
+    logging.basicConfig(level=args.log_level.upper(), format="[%(process)d] %(levelname)s %(message)s")
+    try:
+        server = WebhookServer(
+            args.handler or _discard,
+            args.secret,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            path=args.path,
+            reuse_port=args.reuse_port,
+            max_body_size=args.max_body_size,
+            graceful_timeout=args.graceful_timeout,
+        )
+    except (ImportError, ValueError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    return server.run()
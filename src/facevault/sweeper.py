@@ -0,0 +1,339 @@
+"""Reconcile sessions that are stuck in progress locally.
+
+If a webhook is lost, a session stays non-terminal in your records forever.
+A sweeper periodically re-fetches those sessions, stalest first, in small
+concurrent batches at a bounded rate, and reports only the ones whose status
+actually changed::
+
+    registry = SQLiteSessionRegistry("sessions.db")
+    client = AsyncFaceVaultClient("fv_live_...", registry=registry)
+
+    async with AsyncSweeper(client, registry=registry, on_change=notify_user):
+        await serve_forever()
+
+Candidates come from a :class:`~facevault.registry.SessionRegistry`
+(non-terminal sessions created at least ``older_than`` seconds ago and not
+refreshed for ``stale_for`` seconds) or from a caller-supplied ``source`` of
+``(session_id, known_status)`` pairs. Sweeper calls use the ``"batch"``
+priority lane, so they never crowd out interactive traffic.
+
+A registry session that cannot be refreshed (deleted upstream, or failing)
+is touched so it moves behind the others. It is retried after ``stale_for``
+instead of taking a slot in every sweep.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Tuple, Union
+
+import anyio
+
+from .exceptions import CircuitOpenError, NotFoundError
+from .lanes import BATCH
+from .models import SessionStatus
+from .registry import SessionRegistry
+
+if TYPE_CHECKING:
+    from ._async_client import AsyncFaceVaultClient
+    from ._client import FaceVaultClient
+
+
+logger = logging.getLogger("facevault")
+
+Candidate = Tuple[str, str]
+"""A ``(session_id, known_status)`` pair."""
+
+CandidateSource = Callable[[], Iterable[Candidate]]
+"""Called at the start of every sweep to list the sessions to refresh, stalest first."""
+
+
+@dataclass
+class StatusChange:
+    """A session whose remote status differs from what was known locally."""
+
+    session_id: str
+    old_status: str
+    new_status: str
+    status: SessionStatus
+
+
+ChangeCallback = Callable[[StatusChange], None]
+
+
+class _SweeperBase:
+    def __init__(
+        self,
+        client: Union[FaceVaultClient, AsyncFaceVaultClient],
+        *,
+        registry: SessionRegistry | None = None,
+        source: CandidateSource | None = None,
+        on_change: ChangeCallback | None = None,
+        interval: float = 60.0,
+        older_than: float = 300.0,
+        stale_for: float | None = None,
+        batch_size: int = 20,
+        rate_limit: float | None = 10.0,
+        max_per_sweep: int | None = 1000,
+    ):
+        if (registry is None) == (source is None):
+            raise ValueError("Pass exactly one of registry or source")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if rate_limit is not None and rate_limit <= 0:
+            raise ValueError("rate_limit must be positive")
+        self._client = client
+        self._registry = registry
+        # The client records into its own registry; only write if ours is a different one.
+        self._writes = registry if registry is not client._registry else None
+        self._source = source
+        self._on_change = on_change
+        self.interval = interval
+        self.older_than = older_than
+        self.stale_for = interval if stale_for is None else stale_for
+        self.batch_size = batch_size
+        self.rate_limit = rate_limit
+        self.max_per_sweep = max_per_sweep
+
+    def _candidates(self) -> Iterator[Candidate]:
+        if self._registry is not None:
+            records = self._registry.in_progress(
+                older_than=self.older_than, stale_for=self.stale_for, limit=self.max_per_sweep
+            )
+            return ((record.session_id, record.status) for record in records)
+        return islice(iter(self._source()), self.max_per_sweep)
+
+    def _batches(self) -> Iterator[list[Candidate]]:
+        candidates = self._candidates()
+        while True:
+            batch = list(islice(candidates, self.batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def _defers(self, error: Exception) -> bool:
+        """Whether a failed refresh should move the session to the back of the queue."""
+        # An open circuit says nothing about the session itself.
+        return self._registry is not None and not isinstance(error, CircuitOpenError)
+
+    def _pace(self, batch: list[Candidate], started: float) -> float:
+        """Seconds to wait after a batch so the sweep stays within ``rate_limit``."""
+        if self.rate_limit is None:
+            return 0.0
+        return max(0.0, len(batch) / self.rate_limit - (time.monotonic() - started))
+
+    def _settle(self, known: str, session_id: str, result: SessionStatus | BaseException) -> StatusChange | None:
+        """Count one refresh outcome and return it if the status changed."""
+        stats = self._client._stats
+        if isinstance(result, NotFoundError):
+            stats.increment("sweeper_not_found")
+            logger.warning("Sweeper: session %s no longer exists", session_id)
+            return None
+        if isinstance(result, BaseException):
+            stats.increment("sweeper_errors")
+            logger.warning("Sweeper: refreshing session %s failed: %s", session_id, result)
+            return None
+        stats.increment("sweeper_refreshed")
+        if result.status == known:
+            return None
+        stats.increment("sweeper_changes")
+        change = StatusChange(session_id, known, result.status, result)
+        if self._on_change is not None:
+            try:
+                self._on_change(change)
+            except Exception:
+                logger.exception("Sweeper change callback %r failed", self._on_change)
+        return change
+
+
+class AsyncSweeper(_SweeperBase):
+    """Background sweeper for :class:`~facevault.AsyncFaceVaultClient`.
+
+    Use as an async context manager, or call :meth:`start` with a task group
+    you own and :meth:`stop`. :meth:`sweep_once` runs a single pass on
+    demand.
+
+    Args:
+        client: Client used for ``get_session`` calls.
+        registry: Registry to take non-terminal sessions from.
+        source: Alternative to ``registry``: a callable returning
+            ``(session_id, known_status)`` pairs, stalest first.
+        on_change: Called with a :class:`StatusChange` for every session
+            whose status changed.
+        interval: Seconds between sweeps.
+        older_than: Only sweep sessions created at least this many seconds
+            ago (registry only).
+        stale_for: Only sweep sessions not updated for this many seconds
+            (registry only). Defaults to ``interval``.
+        batch_size: Sessions refreshed concurrently per batch.
+        rate_limit: Maximum ``get_session`` calls per second, or ``None``.
+        max_per_sweep: Maximum sessions refreshed per sweep, or ``None``.
+    """
+
+    _client: AsyncFaceVaultClient
+
+    def __init__(self, client: AsyncFaceVaultClient, **kwargs):
+        super().__init__(client, **kwargs)
+        self._scope: anyio.CancelScope | None = None
+        self._stopped: anyio.Event | None = None
+        self._task_group: anyio.abc.TaskGroup | None = None
+
+    async def sweep_once(self) -> list[StatusChange]:
+        """Refresh one round of candidates and return the status changes."""
+        changes = []
+        for batch in self._batches():
+            started = time.monotonic()
+            results: list = [None] * len(batch)
+
+            async def refresh(index: int, session_id: str) -> None:
+                try:
+                    status = await self._client.get_session(session_id, priority=BATCH)
+                    if self._writes is not None:
+                        await anyio.to_thread.run_sync(self._writes.record_status, status)
+                    results[index] = status
+                except Exception as exc:
+                    results[index] = exc
+                    if self._defers(exc):
+                        await anyio.to_thread.run_sync(self._registry.touch, session_id)
+
+            async with anyio.create_task_group() as tasks:
+                for index, (session_id, _) in enumerate(batch):
+                    tasks.start_soon(refresh, index, session_id)
+            for (session_id, known), result in zip(batch, results):
+                change = self._settle(known, session_id, result)
+                if change is not None:
+                    changes.append(change)
+            if any(isinstance(result, CircuitOpenError) for result in results):
+                logger.warning("Sweeper: circuit open, ending sweep early")
+                return changes
+            await anyio.sleep(self._pace(batch, started))
+        return changes
+
+    async def run(self) -> None:
+        """Sweep every ``interval`` seconds until cancelled."""
+        while True:
+            try:
+                await self.sweep_once()
+            except Exception:
+                logger.exception("Sweep failed")
+            await anyio.sleep(self.interval)
+
+    def start(self, task_group: anyio.abc.TaskGroup) -> None:
+        """Start sweeping in the background, as a task in ``task_group``.
+
+        Works with any task group (or trio nursery) the caller owns. Does
+        nothing if the sweeper is already running.
+        """
+        if self._scope is not None:
+            return
+        self._scope = anyio.CancelScope()
+        self._stopped = anyio.Event()
+        task_group.start_soon(self._run_in, self._scope, self._stopped)
+
+    async def _run_in(self, scope: anyio.CancelScope, stopped: anyio.Event) -> None:
+        try:
+            with scope:
+                await self.run()
+        finally:
+            stopped.set()
+
+    async def stop(self) -> None:
+        """Stop the sweep started by :meth:`start`, waiting for it to finish."""
+        scope, self._scope = self._scope, None
+        if scope is None:
+            return
+        scope.cancel()
+        await self._stopped.wait()
+
+    async def __aenter__(self) -> AsyncSweeper:
+        tasks = anyio.create_task_group()
+        await tasks.__aenter__()
+        tasks.start_soon(self.run)
+        self._task_group = tasks
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        tasks, self._task_group = self._task_group, None
+        tasks.cancel_scope.cancel()
+        # The sweep task never raises, so an error from the body propagates unwrapped.
+        await tasks.__aexit__(None, None, None)
+
+
+class Sweeper(_SweeperBase):
+    """Background sweeper for :class:`~facevault.FaceVaultClient`, run in a thread.
+
+    Takes the same arguments as :class:`AsyncSweeper`; batches are refreshed
+    on a pool of ``batch_size`` worker threads.
+    """
+
+    _client: FaceVaultClient
+
+    def __init__(self, client: FaceVaultClient, **kwargs):
+        super().__init__(client, **kwargs)
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def sweep_once(self) -> list[StatusChange]:
+        """Refresh one round of candidates and return the status changes."""
+        changes = []
+        with ThreadPoolExecutor(self.batch_size, thread_name_prefix="facevault-sweeper") as pool:
+            for batch in self._batches():
+                started = time.monotonic()
+                futures = [pool.submit(self._refresh, sid) for sid, _ in batch]
+                results = [future.exception() or future.result() for future in futures]
+                for (session_id, known), result in zip(batch, results):
+                    change = self._settle(known, session_id, result)
+                    if change is not None:
+                        changes.append(change)
+                if any(isinstance(result, CircuitOpenError) for result in results):
+                    logger.warning("Sweeper: circuit open, ending sweep early")
+                    return changes
+                if self._stopping.wait(self._pace(batch, started)):
+                    break
+        return changes
+
+    def _refresh(self, session_id: str) -> SessionStatus:
+        try:
+            status = self._client.get_session(session_id, priority=BATCH)
+        except Exception as exc:
+            if self._defers(exc):
+                self._registry.touch(session_id)
+            raise
+        if self._writes is not None:
+            self._writes.record_status(status)
+        return status
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self.sweep_once()
+            except Exception:
+                logger.exception("Sweep failed")
+            self._stopping.wait(self.interval)
+
+    def start(self) -> None:
+        """Start sweeping in a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="facevault-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop the thread after its current batch, waiting up to ``timeout`` seconds."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def __enter__(self) -> Sweeper:
+        self.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.stop()
@@ -0,0 +1,332 @@
+"""In-process FaceVault API simulator for tests and load testing.
+
+:class:`FakeFaceVault` implements ``POST /api/v1/sessions`` and
+``GET /api/v1/sessions/{session_id}`` with configurable latency, error and
+429 injection, session state progression, and signed webhooks. Plug it into
+a client through an httpx transport, or serve it as an ASGI app::
+
+    fake = FakeFaceVault(latency=lognormal(0.05, 0.5), rate_limit_rate=0.01)
+    client = FaceVaultClient("fv_test_key", transport=fake.transport())
+    async_client = AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport())
+
+    uvicorn.run(fake)  # FakeFaceVault instances are ASGI apps
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Sequence
+from urllib.parse import parse_qs
+
+import anyio
+import httpx
+
+
+LatencyDistribution = Callable[[random.Random], float]
+"""Returns a simulated response delay in seconds."""
+
+WebhookCallback = Callable[[bytes, "dict[str, str]"], None]
+"""Receives the raw body and headers of each emitted webhook."""
+
+_SESSIONS_PATH = "/api/v1/sessions"
+
+
+def fixed(seconds: float) -> LatencyDistribution:
+    """Always delay by ``seconds``."""
+    return lambda rng: seconds
+
+
+def uniform(low: float, high: float) -> LatencyDistribution:
+    """Delay uniformly between ``low`` and ``high`` seconds."""
+    return lambda rng: rng.uniform(low, high)
+
+
+def exponential(mean: float) -> LatencyDistribution:
+    """Exponentially distributed delay with the given mean."""
+    return lambda rng: rng.expovariate(1 / mean) if mean > 0 else 0.0
+
+
+def lognormal(median: float, sigma: float) -> LatencyDistribution:
+    """Log-normal delay with the given median, a realistic long-tailed shape."""
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+@dataclass
+class FakeSession:
+    """Server-side state of a simulated session."""
+
+    session_id: str
+    session_token: str
+    external_user_id: str
+    require_poa: bool
+    steps: list[str]
+    created_at: str
+    status: str
+    polls: int = 0
+    completed_at: str | None = None
+    trust_score: float | None = None
+    trust_decision: str | None = None
+    face_match_passed: bool | None = None
+    step_results: dict[str, bool] = field(default_factory=dict)
+
+
+class FakeFaceVault:
+    """Simulated FaceVault API.
+
+    Args:
+        api_key: If set, requests must carry this key or get a 401.
+        latency: Response delay, as seconds or a distribution such as
+            :func:`lognormal`. Defaults to no delay.
+        error_rate: Fraction of requests answered with a 500/503.
+        rate_limit_rate: Fraction of requests answered with a 429.
+        progression: Statuses a session moves through, one step every
+            ``polls_per_step`` status reads. The last status is terminal.
+        polls_per_step: Status reads per progression step.
+        pass_rate: Fraction of sessions that end with a passing result.
+        webhook_secret: Secret used to sign emitted webhooks.
+        on_webhook: Called with ``(body, headers)`` when a session reaches
+            its terminal status. Webhooks are also kept in :attr:`webhooks`.
+        seed: Seed for the internal random generator, for reproducible runs.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: str | None = None,
+        latency: float | LatencyDistribution | None = None,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        progression: Sequence[str] = ("pending", "in_progress", "completed"),
+        polls_per_step: int = 1,
+        pass_rate: float = 1.0,
+        webhook_secret: str = "whsec_test",
+        on_webhook: WebhookCallback | None = None,
+        seed: int | None = None,
+    ):
+        if not progression:
+            raise ValueError("progression must contain at least one status")
+        if polls_per_step < 1:
+            raise ValueError("polls_per_step must be at least 1")
+        self.api_key = api_key
+        self.latency = fixed(latency) if isinstance(latency, (int, float)) else latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.progression = tuple(progression)
+        self.polls_per_step = polls_per_step
+        self.pass_rate = pass_rate
+        self.webhook_secret = webhook_secret
+        self.on_webhook = on_webhook
+        self.sessions: dict[str, FakeSession] = {}
+        self.webhooks: list[tuple[bytes, dict[str, str]]] = []
+        self.request_count = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+
+    # ── Transports ──────────────────────────────────────────
+
+    def transport(self) -> httpx.MockTransport:
+        """Transport for :class:`FaceVaultClient`. Latency blocks the calling thread."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            delay, response = self._dispatch(
+                request.method, request.url.path, request.url.query.decode(), request.headers
+            )
+            if delay > 0:
+                time.sleep(delay)
+            return response
+
+        return httpx.MockTransport(handler)
+
+    def async_transport(self) -> httpx.MockTransport:
+        """Transport for :class:`AsyncFaceVaultClient`. Latency is simulated without blocking."""
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            delay, response = self._dispatch(
+                request.method, request.url.path, request.url.query.decode(), request.headers
+            )
+            if delay > 0:
+                await anyio.sleep(delay)
+            return response
+
+        return httpx.MockTransport(handler)
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        """ASGI entry point."""
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        while True:
+            message = await receive()
+            if not message.get("more_body"):
+                break
+        headers = httpx.Headers([(k.decode("latin-1"), v.decode("latin-1")) for k, v in scope["headers"]])
+        delay, response = self._dispatch(
+            scope["method"], scope["path"], scope.get("query_string", b"").decode(), headers
+        )
+        if delay > 0:
+            await anyio.sleep(delay)
+        await send({
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in response.headers.items()],
+        })
+        await send({"type": "http.response.body", "body": response.content})
+
+    # ── State control ───────────────────────────────────────
+
+    def complete(self, session_id: str, *, status: str | None = None, passed: bool | None = None) -> None:
+        """Move a session straight to a terminal status and emit its webhook.
+
+        Args:
+            session_id: Session to complete.
+            status: Final status. Defaults to the last progression status.
+            passed: Force a passing or failing result instead of using
+                ``pass_rate``.
+        """
+        with self._lock:
+            session = self.sessions[session_id]
+            session.status = status or self.progression[-1]
+            session.polls = self.polls_per_step * len(self.progression)
+            self._finish(session, passed)
+
+    # ── Request handling ────────────────────────────────────
+
+    def _dispatch(
+        self, method: str, path: str, query: str, headers: httpx.Headers
+    ) -> tuple[float, httpx.Response]:
+        with self._lock:
+            self.request_count += 1
+            delay = max(0.0, self.latency(self._rng)) if self.latency else 0.0
+            return delay, self._route(method, path, parse_qs(query), headers)
+
+    def _route(self, method: str, path: str, query: dict, headers: httpx.Headers) -> httpx.Response:
+        if self.api_key is not None and headers.get("x-facevault-api-key") != self.api_key:
+            return _error(401, "Invalid API key")
+        if self.rate_limit_rate and self._rng.random() < self.rate_limit_rate:
+            return _error(429, "Rate limit exceeded", headers={"Retry-After": "1"})
+        if self.error_rate and self._rng.random() < self.error_rate:
+            return _error(self._rng.choice((500, 503)), "Simulated server error")
+
+        if path == _SESSIONS_PATH:
+            if method != "POST":
+                return _error(405, "Method not allowed")
+            return self._create(query)
+        if path.startswith(_SESSIONS_PATH + "/"):
+            if method != "GET":
+                return _error(405, "Method not allowed")
+            return self._get(path[len(_SESSIONS_PATH) + 1:])
+        return _error(404, "Not found")
+
+    def _create(self, query: dict) -> httpx.Response:
+        external_user_id = query.get("external_user_id", [""])[0]
+        if not external_user_id:
+            return _error(422, "external_user_id is required")
+        require_poa = query.get("require_poa", ["false"])[0] == "true"
+        steps = ["liveness", "document"] + (["poa"] if require_poa else [])
+        session = FakeSession(
+            session_id=f"sess_{uuid.UUID(int=self._rng.getrandbits(128)).hex[:24]}",
+            session_token=f"tok_{uuid.UUID(int=self._rng.getrandbits(128)).hex}",
+            external_user_id=external_user_id,
+            require_poa=require_poa,
+            steps=steps,
+            created_at=_now(),
+            status=self.progression[0],
+        )
+        self.sessions[session.session_id] = session
+        return httpx.Response(200, json={
+            "session_id": session.session_id,
+            "session_token": session.session_token,
+            "steps": steps,
+            "challenge_nonce": uuid.UUID(int=self._rng.getrandbits(128)).hex,
+        })
+
+    def _get(self, session_id: str) -> httpx.Response:
+        session = self.sessions.get(session_id)
+        if session is None:
+            return _error(404, "Session not found")
+
+        terminal = len(self.progression) - 1
+        session.polls += 1
+        index = min(session.polls // self.polls_per_step, terminal)
+        if session.completed_at is None:
+            session.status = self.progression[index]
+            done = len(session.steps) * index // terminal if terminal else len(session.steps)
+            session.step_results = {step: i < done for i, step in enumerate(session.steps)}
+            if index == terminal:
+                self._finish(session)
+
+        return httpx.Response(200, json={
+            "session_id": session.session_id,
+            "status": session.status,
+            "steps": session.step_results,
+            "face_match_passed": session.face_match_passed,
+            "error": "",
+            "created_at": session.created_at,
+            "completed_at": session.completed_at,
+            "trust_score": session.trust_score,
+            "trust_decision": session.trust_decision,
+            "require_poa": session.require_poa,
+            "poa": {"status": "verified"} if session.require_poa and session.completed_at else None,
+            "anti_spoofing": {"score": 0.97, "passed": True} if session.completed_at else None,
+            "credential": None,
+        })
+
+    def _finish(self, session: FakeSession, passed: bool | None = None) -> None:
+        if session.completed_at is not None:
+            return
+        if passed is None:
+            passed = self._rng.random() < self.pass_rate
+        session.completed_at = _now()
+        session.face_match_passed = passed
+        session.trust_score = round(self._rng.uniform(70, 99) if passed else self._rng.uniform(5, 40), 1)
+        session.trust_decision = "accept" if passed else "reject"
+        session.step_results = {step: True for step in session.steps}
+        self._emit_webhook(session)
+
+    def _emit_webhook(self, session: FakeSession) -> None:
+        payload = {
+            "event": "verification.completed",
+            "session_id": session.session_id,
+            "status": session.status,
+            "external_user_id": session.external_user_id,
+            "face_match_passed": session.face_match_passed,
+            "face_match_score": 0.95 if session.face_match_passed else 0.2,
+            "anti_spoofing_score": 0.97,
+            "anti_spoofing_passed": True,
+            "completed_at": session.completed_at,
+            "trust_score": session.trust_score,
+            "trust_decision": session.trust_decision,
+            "sanctions_hit": False,
+        }
+        body = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode()
+        signature = hmac.new(self.webhook_secret.encode(), body, hashlib.sha256).hexdigest()
+        headers = {"Content-Type": "application/json", "X-Signature": signature}
+        self.webhooks.append((body, headers))
+        if self.on_webhook is not None:
+            self.on_webhook(body, headers)
+
+
+def _error(status_code: int, detail: str, headers: dict | None = None) -> httpx.Response:
+    return httpx.Response(status_code, json={"detail": detail}, headers=headers)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
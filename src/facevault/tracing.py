@@ -0,0 +1,275 @@
+"""Optional tracing for FaceVault API calls.
+
+Pass a :class:`Tracer` to either client with ``tracer=...`` to get one span
+per logical call (``facevault.create_session``, ``facevault.get_session``)
+with a child span per HTTP attempt. Each attempt carries a W3C
+``traceparent`` header so FaceVault requests can be correlated with the
+rest of your application's trace. When no tracer is configured the clients
+skip all of this entirely.
+
+The built-in :class:`Tracer` hands finished spans to a :class:`SpanExporter`;
+use :class:`InMemoryExporter` in tests. To report into an existing
+OpenTelemetry setup, use :class:`OpenTelemetryTracer` instead
+(requires ``opentelemetry-api``).
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from contextvars import ContextVar, Token
+from typing import Any
+
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current_span: ContextVar[Span | None] = ContextVar("facevault_current_span", default=None)
+
+
+def current_span() -> Span | None:
+    """Return the span active in the current context, if any."""
+    return _current_span.get()
+
+
+class Span:
+    """A timed operation within a trace.
+
+    Spans are context managers: entering one makes it the current span
+    (the default parent for new spans), and leaving it ends the span,
+    recording any exception raised inside the block.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        span_id: str,
+        parent_span_id: str | None = None,
+        attributes: dict[str, Any] | None = None,
+        *,
+        tracer: Tracer | None = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_span_id = parent_span_id
+        self.attributes: dict[str, Any] = dict(attributes or {})
+        self.status = "unset"
+        self.exception: BaseException | None = None
+        self.start_time = time.time()
+        self.end_time: float | None = None
+        self._tracer = tracer
+        self._token: Token | None = None
+
+    @property
+    def traceparent(self) -> str:
+        """W3C ``traceparent`` header value identifying this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    @property
+    def duration(self) -> float | None:
+        if self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_status(self, status: str) -> None:
+        """Set the span status: ``"ok"``, ``"error"`` or ``"unset"``."""
+        self.status = status
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.exception = exc
+        self.status = "error"
+
+    def end(self) -> None:
+        if self.end_time is not None:
+            return
+        self.end_time = time.time()
+        if self._tracer is not None:
+            self._tracer._on_end(self)
+
+    def __enter__(self) -> Span:
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type: object, exc: BaseException | None, tb: object) -> None:
+        if exc is not None:
+            self.record_exception(exc)
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+        self.end()
+
+    def __repr__(self) -> str:
+        return f"Span(name={self.name!r}, trace_id={self.trace_id!r}, span_id={self.span_id!r})"
+
+
+class SpanExporter(ABC):
+    """Receives spans as they finish."""
+
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        """Called once with each span as it ends."""
+
+
+class InMemoryExporter(SpanExporter):
+    """Collects finished spans in a list. Intended for tests."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class Tracer:
+    """Creates spans and exports them when they end.
+
+    Args:
+        exporter: Where finished spans are sent. Spans are discarded if
+            omitted, but ``traceparent`` headers are still injected.
+    """
+
+    def __init__(self, exporter: SpanExporter | None = None):
+        self._exporter = exporter
+
+    def start_span(
+        self,
+        name: str,
+        *,
+        parent: Span | str | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> Span:
+        """Start a new span.
+
+        Args:
+            name: Span name.
+            parent: Parent span, or an incoming ``traceparent`` header value.
+                Defaults to the current span, starting a new trace if there
+                is none.
+            attributes: Initial span attributes.
+        """
+        if parent is None:
+            parent = _current_span.get()
+        if isinstance(parent, str):
+            match = _TRACEPARENT_RE.match(parent.strip().lower())
+            if match is None:
+                raise ValueError(f"Invalid traceparent header: {parent!r}")
+            trace_id, parent_span_id = match.group(1), match.group(2)
+        elif parent is not None:
+            trace_id, parent_span_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_span_id = os.urandom(16).hex(), None
+        return Span(name, trace_id, os.urandom(8).hex(), parent_span_id, attributes, tracer=self)
+
+    def _on_end(self, span: Span) -> None:
+        if self._exporter is not None:
+            self._exporter.export(span)
+
+
+class OpenTelemetryTracer(Tracer):
+    """Reports FaceVault spans through OpenTelemetry.
+
+    Spans join whatever OpenTelemetry context is active when the client is
+    called, and ``traceparent`` headers are produced by the globally
+    configured propagator.
+
+    Args:
+        tracer_provider: OpenTelemetry tracer provider. Defaults to the
+            global provider.
+    """
+
+    def __init__(self, tracer_provider: Any = None):
+        try:
+            from opentelemetry import trace
+        except ImportError as exc:
+            raise ImportError(
+                "OpenTelemetryTracer requires opentelemetry-api: pip install 'facevault[otel]'"
+            ) from exc
+        from . import __version__
+
+        super().__init__()
+        self._otel_tracer = trace.get_tracer("facevault", __version__, tracer_provider)
+
+    def start_span(
+        self,
+        name: str,
+        *,
+        parent: Span | str | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> Span:
+        from opentelemetry import propagate, trace
+
+        context = None
+        if isinstance(parent, _OpenTelemetrySpan):
+            context = trace.set_span_in_context(parent._otel_span)
+        elif isinstance(parent, str):
+            context = propagate.extract({"traceparent": parent})
+        otel_span = self._otel_tracer.start_span(
+            name, context=context, kind=trace.SpanKind.CLIENT, attributes=attributes
+        )
+        span_context = otel_span.get_span_context()
+        return _OpenTelemetrySpan(
+            otel_span,
+            name,
+            format(span_context.trace_id, "032x"),
+            format(span_context.span_id, "016x"),
+            attributes,
+        )
+
+
+class _OpenTelemetrySpan(Span):
+    def __init__(self, otel_span: Any, name: str, trace_id: str, span_id: str, attributes: dict | None):
+        super().__init__(name, trace_id, span_id, None, attributes)
+        self._otel_span = otel_span
+        self._otel_token: object | None = None
+
+    @property
+    def traceparent(self) -> str:
+        from opentelemetry import propagate, trace
+
+        carrier: dict[str, str] = {}
+        propagate.inject(carrier, context=trace.set_span_in_context(self._otel_span))
+        return carrier.get("traceparent") or super().traceparent
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        super().set_attribute(key, value)
+        self._otel_span.set_attribute(key, value)
+
+    def set_status(self, status: str) -> None:
+        from opentelemetry.trace import Status, StatusCode
+
+        super().set_status(status)
+        code = {"ok": StatusCode.OK, "error": StatusCode.ERROR}.get(status, StatusCode.UNSET)
+        self._otel_span.set_status(Status(code))
+
+    def record_exception(self, exc: BaseException) -> None:
+        super().record_exception(exc)
+        self._otel_span.record_exception(exc)
+        self.set_status("error")
+
+    def end(self) -> None:
+        if self.end_time is None:
+            super().end()
+            self._otel_span.end()
+
+    def __enter__(self) -> Span:
+        from opentelemetry import context, trace
+
+        self._otel_token = context.attach(trace.set_span_in_context(self._otel_span))
+        return super().__enter__()
+
+    def __exit__(self, exc_type: object, exc: BaseException | None, tb: object) -> None:
+        from opentelemetry import context
+
+        super().__exit__(exc_type, exc, tb)
+        if self._otel_token is not None:
+            context.detach(self._otel_token)
+            self._otel_token = None
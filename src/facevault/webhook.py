@@ -3,6 +3,11 @@
 The FaceVault API signs webhook payloads with HMAC-SHA256. This module
 provides helpers to verify the signature and parse the payload into a
 typed WebhookEvent.
+
+For large payloads, :class:`StreamingVerifier` verifies the body chunk by
+chunk as it is received, with a hard size limit, from an ASGI ``receive``
+loop (:meth:`~StreamingVerifier.from_asgi`), a WSGI input stream
+(:meth:`~StreamingVerifier.from_wsgi`) or any other source.
 """
 
 from __future__ import annotations
@@ -10,9 +15,25 @@ from __future__ import annotations
 import hashlib
 import hmac
 import json
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice, repeat
+from typing import Awaitable, Callable, Iterable, Sequence, Tuple, Union
 
+from .exceptions import PayloadTooLargeError
 from .models import WebhookEvent
 
+DEFAULT_MAX_BODY_SIZE = 4 * 1024 * 1024
+"""Default limit for :class:`StreamingVerifier` bodies, in bytes."""
+
+_READ_SIZE = 64 * 1024
+
+# verify_many: bodies at least this large are hashed on worker threads (hashlib
+# releases the GIL for them); smaller ones are cheaper to hash inline.
+_THREAD_MIN_BODY = 16 * 1024
+# Non-canonical bodies needing re-serialization before a process pool pays for itself.
+_PROCESS_MIN_ITEMS = 256
+
 
 def verify_signature(body: str | bytes, signature: str, secret: str) -> bool:
     """Verify HMAC-SHA256 signature of a webhook payload.
@@ -36,15 +57,23 @@ def verify_signature(body: str | bytes, signature: str, secret: str) -> bool:
     else:
         body_bytes = body
 
-    # Re-serialize to match the server's canonical form
+    key = secret.encode()
+    # FaceVault sends bodies in canonical form, so the raw bytes usually match as-is.
+    if _verify_raw(body_bytes, signature, key):
+        return True
+    return _verify_canonical(body_bytes, signature, key)
+
+
+def _verify_canonical(body: bytes | bytearray, signature: str, key: bytes) -> bool:
+    """Check ``signature`` against the body re-serialized to the server's canonical form."""
     try:
-        parsed = json.loads(body_bytes)
+        parsed = json.loads(body)
         canonical = json.dumps(parsed, separators=(",", ":"), sort_keys=True).encode()
-    except (json.JSONDecodeError, TypeError):
+    except (ValueError, TypeError):
         return False
 
     expected = hmac.new(
-        secret.encode(),
+        key,
         canonical,
         hashlib.sha256,
     ).hexdigest()
@@ -52,11 +81,293 @@ def verify_signature(body: str | bytes, signature: str, secret: str) -> bool:
     return hmac.compare_digest(expected, signature)
 
 
-def parse_event(body: str | bytes) -> WebhookEvent:
+def verify_many(
+    items: Iterable[Tuple[Union[str, bytes], str]],
+    secret: str,
+    *,
+    workers: int | None = None,
+    chunk_size: int = 64,
+    process_pool: Executor | None = None,
+) -> list[bool]:
+    """Verify a batch of webhook deliveries, using multiple cores.
+
+    Equivalent to calling :func:`verify_signature` on each item. Bodies are
+    first checked against their raw bytes; large ones are hashed on a thread
+    pool, where ``hashlib`` runs without the GIL. Bodies that fail the raw
+    check are re-serialized to the canonical form, which is pure Python, so
+    large numbers of them are checked on a process pool. Work is handed out
+    in chunks of ``chunk_size`` items to amortize scheduling overhead.
+
+    Args:
+        items: ``(body, signature)`` pairs.
+        secret: Your webhook secret (from API dashboard).
+        workers: Threads and processes to use. Defaults to the number of
+            CPUs; ``1`` verifies everything in the calling thread.
+        chunk_size: Items per unit of work handed to a pool.
+        process_pool: Executor to use for re-serialization instead of
+            starting a temporary process pool, e.g. one kept for the
+            lifetime of a queue consumer.
+
+    Returns:
+        One boolean per item, in input order.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    workers = workers or os.cpu_count() or 1
+    key = secret.encode()
+    threaded = workers > 1
+    batch: list[tuple[bytes, str]] = []
+    results: list[bool] = []
+    large: list[int] = []
+    for body, signature in items:
+        if isinstance(body, str):
+            body = body.encode()
+        if not isinstance(signature, str):
+            signature = ""
+        batch.append((body, signature))
+        if threaded and signature and len(body) >= _THREAD_MIN_BODY:
+            large.append(len(results))
+            results.append(False)
+        else:
+            results.append(bool(signature) and _verify_raw(body, signature, key))
+
+    if len(large) == 1:
+        results[large[0]] = _verify_raw(*batch[large[0]], key)
+    elif large:
+        with ThreadPoolExecutor(min(workers, len(large))) as threads:
+            verified = threads.map(_verify_raw_chunk, _chunks([batch[i] for i in large], chunk_size), repeat(key))
+            for i, ok in zip(large, (ok for chunk in verified for ok in chunk)):
+                results[i] = ok
+
+    fallback = [i for i, ok in enumerate(results) if not ok and batch[i][1]]
+    if not fallback:
+        return results
+    pending = [batch[i] for i in fallback]
+    if process_pool is None and (workers == 1 or len(fallback) < _PROCESS_MIN_ITEMS):
+        verified = _verify_canonical_chunk(pending, key)
+    else:
+        pool = process_pool or ProcessPoolExecutor(min(workers, -(-len(pending) // chunk_size)))
+        try:
+            verified = [
+                ok for chunk in pool.map(_verify_canonical_chunk, _chunks(pending, chunk_size), repeat(key))
+                for ok in chunk
+            ]
+        finally:
+            if process_pool is None:
+                pool.shutdown()
+    for i, ok in zip(fallback, verified):
+        results[i] = ok
+    return results
+
+
+def _verify_raw(body: bytes, signature: str, key: bytes) -> bool:
+    return hmac.compare_digest(hmac.new(key, body, hashlib.sha256).hexdigest(), signature)
+
+
+def _verify_raw_chunk(items: Sequence[tuple[bytes, str]], key: bytes) -> list[bool]:
+    return [_verify_raw(body, signature, key) for body, signature in items]
+
+
+def _verify_canonical_chunk(items: Sequence[tuple[bytes, str]], key: bytes) -> list[bool]:
+    return [_verify_canonical(body, signature, key) for body, signature in items]
+
+
+def _chunks(items: list, size: int) -> Iterable[list]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class StreamingVerifier:
+    """Verify a webhook signature incrementally as the body arrives.
+
+    Each chunk updates the HMAC directly, so a body sent in FaceVault's
+    canonical form (the normal case) is verified without being parsed or
+    re-serialized. If the raw bytes don't match, e.g. because a proxy
+    reformatted the JSON, the received chunks are assembled into a single
+    buffer and checked like :func:`verify_signature` does::
+
+        verifier = StreamingVerifier(signature, secret, content_length=length)
+        for chunk in chunks:
+            verifier.update(chunk)
+        if verifier.verify():
+            event = verifier.event()
+
+    Args:
+        signature: Value of the ``X-Signature`` header.
+        secret: Your webhook secret (from API dashboard).
+        max_body_size: Largest body accepted, in bytes.
+        content_length: Declared body size, if known. A body declared larger
+            than ``max_body_size`` is rejected before anything is read. The
+            buffer still grows only with the bytes actually received, so a
+            sender cannot reserve memory by declaring a large body.
+
+    Raises:
+        PayloadTooLargeError: If the body is, or is declared to be, larger
+            than ``max_body_size``.
+    """
+
+    def __init__(
+        self,
+        signature: str,
+        secret: str,
+        *,
+        max_body_size: int = DEFAULT_MAX_BODY_SIZE,
+        content_length: int | None = None,
+    ):
+        if content_length is not None and content_length > max_body_size:
+            raise PayloadTooLargeError(content_length, max_body_size)
+        self.signature = signature if isinstance(signature, str) else ""
+        self.max_body_size = max_body_size
+        self.size = 0
+        self._key = secret.encode()
+        self._mac = hmac.new(self._key, digestmod=hashlib.sha256)
+        self._declared = content_length
+        self._buffer: bytearray | None = None
+        self._chunks: list[bytes] = []
+
+    def update(self, chunk: bytes | bytearray | memoryview) -> None:
+        """Feed the next chunk of the body.
+
+        Raises:
+            PayloadTooLargeError: If the body grows past ``max_body_size``.
+            ValueError: If the body grows past its declared ``content_length``.
+        """
+        if not chunk:
+            return
+        end = self.size + len(chunk)
+        if end > self.max_body_size:
+            raise PayloadTooLargeError(end, self.max_body_size)
+        if self._declared is not None and end > self._declared:
+            raise ValueError(f"Webhook body is longer than its declared length of {self._declared} bytes")
+        self._mac.update(chunk)
+        if self._buffer is not None:
+            self._buffer += chunk
+        else:
+            # Copy only buffers the caller may reuse; bytes chunks are kept by reference.
+            self._chunks.append(chunk if isinstance(chunk, bytes) else bytes(chunk))
+        self.size = end
+
+    @property
+    def body(self) -> bytearray:
+        """The body received so far, as one buffer."""
+        if self._buffer is None:
+            self._buffer = bytearray(self.size)
+            offset = 0
+            for chunk in self._chunks:
+                self._buffer[offset:offset + len(chunk)] = chunk
+                offset += len(chunk)
+            self._chunks = []
+        return self._buffer
+
+    def verify(self) -> bool:
+        """Return True if the body received so far matches the signature."""
+        if not self.signature:
+            return False
+        if hmac.compare_digest(self._mac.hexdigest(), self.signature):
+            return True
+        return _verify_canonical(self.body, self.signature, self._key)
+
+    def event(self) -> WebhookEvent:
+        """Parse the body into a :class:`WebhookEvent`. Call after :meth:`verify`."""
+        return parse_event(self.body)
+
+    @classmethod
+    async def from_asgi(
+        cls,
+        scope: dict,
+        receive: Callable[[], Awaitable[dict]],
+        secret: str,
+        *,
+        max_body_size: int = DEFAULT_MAX_BODY_SIZE,
+    ) -> StreamingVerifier:
+        """Read an ASGI request's body into a verifier.
+
+        Args:
+            scope: The ASGI HTTP connection scope.
+            receive: The ASGI ``receive`` callable.
+            secret: Your webhook secret.
+            max_body_size: Largest body accepted, in bytes.
+
+        Returns:
+            A verifier holding the whole body; call :meth:`verify` on it.
+
+        Raises:
+            PayloadTooLargeError: If the body is too large (respond with 413).
+            ValueError: If the client disconnects before sending the body.
+        """
+        signature = ""
+        content_length = None
+        for name, value in scope.get("headers", ()):
+            name = name.lower()
+            if name == b"x-signature":
+                signature = value.decode("latin-1")
+            elif name == b"content-length":
+                content_length = _content_length(value.decode("latin-1"))
+        verifier = cls(signature, secret, max_body_size=max_body_size, content_length=content_length)
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise ValueError("Client disconnected before sending the webhook body")
+            verifier.update(message.get("body", b""))
+            if not message.get("more_body"):
+                return verifier
+
+    @classmethod
+    def from_wsgi(cls, environ: dict, secret: str, *, max_body_size: int = DEFAULT_MAX_BODY_SIZE) -> StreamingVerifier:
+        """Read a WSGI request's body into a verifier.
+
+        Args:
+            environ: The WSGI environ.
+            secret: Your webhook secret.
+            max_body_size: Largest body accepted, in bytes.
+
+        Returns:
+            A verifier holding the whole body; call :meth:`verify` on it.
+
+        Raises:
+            PayloadTooLargeError: If the body is too large (respond with 413).
+        """
+        content_length = _content_length(environ.get("CONTENT_LENGTH"))
+        verifier = cls(
+            environ.get("HTTP_X_SIGNATURE", ""), secret, max_body_size=max_body_size, content_length=content_length
+        )
+        stream = environ["wsgi.input"]
+        if content_length is None:
+            # Without a length, only read to EOF if the server says the stream ends there.
+            if environ.get("wsgi.input_terminated"):
+                while True:
+                    chunk = stream.read(_READ_SIZE)
+                    if not chunk:
+                        break
+                    verifier.update(chunk)
+            return verifier
+        remaining = content_length
+        while remaining:
+            chunk = stream.read(min(_READ_SIZE, remaining))
+            if not chunk:
+                break
+            verifier.update(chunk)
+            remaining -= len(chunk)
+        return verifier
+
+
+def _content_length(value: str | None) -> int | None:
+    try:
+        length = int(value)
+    except (TypeError, ValueError):
+        return None
+    return length if length >= 0 else None
+
+
+def parse_event(body: str | bytes | bytearray) -> WebhookEvent:
     """Parse a webhook payload into a WebhookEvent.
 
     Args:
-        body: Raw request body (str or bytes).
+        body: Raw request body (str, bytes or bytearray).
 
     Returns:
         Parsed WebhookEvent dataclass.
@@ -64,9 +375,7 @@ def parse_event(body: str | bytes) -> WebhookEvent:
     Raises:
         ValueError: If the body is not valid JSON.
     """
-    if isinstance(body, bytes):
-        body = body.decode()
-
+    # json.loads decodes bytes itself, without an intermediate str copy of the body.
     data = json.loads(body)
 
     return WebhookEvent(
@@ -166,3 +166,128 @@ def test_async_empty_api_key_rejected():
 def test_async_whitespace_api_key_rejected():
     with pytest.raises(ValueError, match="non-empty"):
         AsyncFaceVaultClient("   ")
+
+
+def _large_status():
+    return {
+        "session_id": "sess_big",
+        "status": "completed",
+        "steps": {},
+        "credential": {"claims": [{"name": f"claim_{i}", "value": "x" * 64} for i in range(200)]},
+    }
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_only_large_bodies_are_read_off_loop():
+    respx.get(f"{BASE_URL}/api/v1/sessions/sess_big").mock(return_value=httpx.Response(200, json=_large_status()))
+    respx.get(f"{BASE_URL}/api/v1/sessions/sess_small").mock(
+        return_value=httpx.Response(200, json={"session_id": "sess_small", "status": "pending", "steps": {}})
+    )
+    async with AsyncFaceVaultClient("fv_live_test", body_offload_threshold=4096) as client:
+        status = await client.get_session("sess_big")
+        await client.get_session("sess_small")
+    assert len(status.credential["claims"]) == 200
+    assert client.stats().counter("body_offloaded") == 1
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_large_error_body_read_off_loop():
+    respx.get(f"{BASE_URL}/api/v1/sessions/sess_1").mock(
+        return_value=httpx.Response(404, json={"detail": "gone", "trace": ["x" * 100] * 100})
+    )
+    async with AsyncFaceVaultClient("fv_live_test", body_offload_threshold=1024) as client:
+        with pytest.raises(NotFoundError, match="gone"):
+            await client.get_session("sess_1")
+    assert client.stats().counter("body_offloaded") == 1
+
+
+class _Chunks(httpx.AsyncByteStream):
+    def __init__(self, data, size=1000):
+        self._chunks = [data[i:i + size] for i in range(0, len(data), size)]
+        self.closed = False
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            yield chunk
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_large_streamed_body_is_decompressed_off_loop(monkeypatch):
+    import gzip
+    import json
+    import threading
+
+    from facevault import _async_client
+
+    streams = []
+
+    async def handler(request):
+        body = gzip.compress(json.dumps(_large_status()).encode())
+        streams.append(_Chunks(body))
+        # No Content-Length, as with a chunked response: the body size is unknown up front.
+        return httpx.Response(200, headers={"Content-Encoding": "gzip"}, stream=streams[-1])
+
+    buffered_on = []
+    buffered = _async_client._buffered
+
+    def recording_buffered(response, chunks):
+        buffered_on.append(threading.current_thread())
+        return buffered(response, chunks)
+
+    monkeypatch.setattr(_async_client, "_buffered", recording_buffered)
+
+    async with AsyncFaceVaultClient(
+        "fv_live_test", transport=httpx.MockTransport(handler), body_offload_threshold=4096
+    ) as client:
+        status = await client.get_session("sess_big")
+
+    assert status.credential == _large_status()["credential"]
+    assert buffered_on and buffered_on[0] is not threading.main_thread()
+    assert streams[0].closed
+    assert client.stats().counter("body_offloaded") == 1
+
+
+@pytest.mark.asyncio
+async def test_offloaded_body_stalls_the_loop_less():
+    import asyncio
+    import gzip
+    import time
+
+    padding = b"x" * (32 << 20)
+    body = gzip.compress(b'{"session_id": "sess_big", "status": "completed", "pad": "' + padding + b'"}', 1)
+
+    async def worst_lag(threshold):
+        async def handler(request):
+            return httpx.Response(200, headers={"Content-Encoding": "gzip"}, stream=_Chunks(body, 64 * 1024))
+
+        worst, done = 0.0, False
+
+        async def ticker():
+            nonlocal worst
+            while not done:
+                start = time.perf_counter()
+                await asyncio.sleep(0.001)
+                worst = max(worst, time.perf_counter() - start - 0.001)
+
+        async with AsyncFaceVaultClient(
+            "fv_live_test", transport=httpx.MockTransport(handler), body_offload_threshold=threshold
+        ) as client:
+            task = asyncio.ensure_future(ticker())
+            await asyncio.sleep(0.01)
+            # _send reads the body without decoding the JSON, which holds the GIL
+            # wherever it runs; this times only what the threshold moves off the loop.
+            response = await client._send("GET", "/api/v1/sessions/sess_big", "/api/v1/sessions/{session_id}")
+            done = True
+            await task
+        assert len(response.content) > len(padding)
+        return worst, client.stats().counter("body_offloaded")
+
+    on_loop, not_offloaded = await worst_lag(None)
+    offloaded, offloads = await worst_lag(4096)
+    assert (not_offloaded, offloads) == (0, 1)
+    assert offloaded < on_loop * 0.6
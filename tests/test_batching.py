@@ -0,0 +1,201 @@
+"""Tests for micro-batching of webhook events."""
+
+import threading
+
+import anyio
+import pytest
+
+from facevault import EventBatcher, EventBus, PartialBatchError, WebhookEvent
+
+
+def _event(i):
+    return WebhookEvent(event="verification.completed", session_id=f"sess_{i}", status="completed")
+
+
+def _ids(batches):
+    return [[event.session_id for event in batch] for batch in batches]
+
+
+async def test_flushes_by_size_and_on_close():
+    batches = []
+
+    async def sink(events):
+        batches.append(events)
+
+    async with EventBatcher(sink, max_size=3, max_age=60) as batcher:
+        for i in range(7):
+            await batcher.add(_event(i))
+        assert _ids(batches) == [["sess_0", "sess_1", "sess_2"], ["sess_3", "sess_4", "sess_5"]]
+        assert batcher.pending == 1
+
+    assert _ids(batches)[-1] == ["sess_6"]
+    assert batcher.stats() == {"events": 7, "batches": 3, "delivered": 7, "retries": 0, "failed": 0, "pending": 0}
+
+
+async def test_flushes_by_age():
+    batches = []
+
+    async def sink(events):
+        batches.append((anyio.current_time(), events))
+
+    async with EventBatcher(sink, max_size=100, max_age=0.05) as batcher:
+        start = anyio.current_time()
+        await batcher.add(_event(0))
+        await batcher.add(_event(1))
+        await anyio.sleep(0.2)
+        assert len(batches) == 1
+        flushed_at, events = batches[0]
+        assert 0.04 <= flushed_at - start < 0.15
+        assert len(events) == 2
+
+
+async def test_explicit_flush_and_sync_sink():
+    threads = []
+    batches = []
+
+    def sink(events):
+        threads.append(threading.current_thread())
+        batches.append(events)
+
+    async with EventBatcher(sink, max_age=60) as batcher:
+        await batcher.add(_event(0))
+        await batcher.flush()
+        assert _ids(batches) == [["sess_0"]]
+    assert threads[0] is not threading.main_thread()
+
+
+async def test_retries_failed_batches():
+    calls = []
+
+    async def flaky(events):
+        calls.append(len(events))
+        if len(calls) < 3:
+            raise ConnectionError("database unavailable")
+
+    async with EventBatcher(flaky, max_size=2, retry_backoff=0.001) as batcher:
+        await batcher.add(_event(0))
+        await batcher.add(_event(1))
+
+    assert calls == [2, 2, 2]
+    assert batcher.stats()["retries"] == 2
+    assert batcher.stats()["delivered"] == 2
+
+
+async def test_partial_failure_retries_only_failed_events():
+    seen = []
+
+    async def sink(events):
+        seen.append([e.session_id for e in events])
+        if len(seen) == 1:
+            raise PartialBatchError([e for e in events if e.session_id == "sess_1"])
+
+    async with EventBatcher(sink, max_size=3, retry_backoff=0.001) as batcher:
+        for i in range(3):
+            await batcher.add(_event(i))
+
+    assert seen == [["sess_0", "sess_1", "sess_2"], ["sess_1"]]
+    assert batcher.stats()["delivered"] == 3
+
+
+async def test_gives_up_after_max_retries():
+    failures = []
+
+    async def sink(events):
+        raise ValueError("bad row")
+
+    batcher = EventBatcher(
+        sink, max_retries=2, retry_backoff=0.001, on_failure=lambda events, exc: failures.append((events, exc)),
+    )
+    async with batcher:
+        await batcher.add(_event(0))
+
+    assert len(failures) == 1
+    assert [e.session_id for e in failures[0][0]] == ["sess_0"]
+    assert isinstance(failures[0][1], ValueError)
+    assert batcher.stats()["failed"] == 1
+    assert batcher.stats()["retries"] == 2
+
+
+async def test_flushes_on_cancellation():
+    batches = []
+
+    async def sink(events):
+        batches.append(events)
+
+    with anyio.move_on_after(0.05):
+        async with EventBatcher(sink, max_age=60) as batcher:
+            await batcher.add(_event(0))
+            await anyio.sleep(1)
+
+    assert _ids(batches) == [["sess_0"]]
+
+
+async def test_cancelled_partial_retry_requeues_only_failed_events():
+    seen = []
+
+    async def sink(events):
+        seen.append([e.session_id for e in events])
+        if len(seen) == 1:
+            raise PartialBatchError([e for e in events if e.session_id == "sess_1"])
+
+    with anyio.move_on_after(0.05):
+        # The retry backoff outlasts the scope, so the retry is cancelled mid-wait.
+        async with EventBatcher(sink, max_size=3, retry_backoff=10) as batcher:
+            for i in range(3):
+                await batcher.add(_event(i))
+
+    assert seen == [["sess_0", "sess_1", "sess_2"], ["sess_1"]]
+    assert batcher.stats()["delivered"] == 3
+
+
+async def test_hung_sink_is_abandoned_after_shutdown_timeout():
+    failures = []
+    started = anyio.Event()
+
+    async def sink(events):
+        started.set()
+        await anyio.sleep_forever()
+
+    batcher = EventBatcher(
+        sink, max_age=0.01, shutdown_timeout=0.1, on_failure=lambda events, exc: failures.append((events, exc)),
+    )
+    with anyio.fail_after(2):
+        async with batcher:
+            await batcher.add(_event(0))
+            # The timer's flush is stuck in the sink when the batcher closes.
+            await started.wait()
+            await batcher.add(_event(1))
+
+    [(events, error)] = failures
+    assert [e.session_id for e in events] == ["sess_0", "sess_1"]
+    assert isinstance(error, TimeoutError)
+    assert batcher.stats()["failed"] == 2
+    assert batcher.pending == 0
+
+
+async def test_consumes_event_bus_subscription():
+    batches = []
+
+    async def sink(events):
+        batches.append(events)
+
+    bus = EventBus()
+    subscription = bus.subscribe("warehouse")
+    async with EventBatcher(sink, max_size=4) as batcher:
+        for i in range(10):
+            await bus.publish(_event(i))
+        bus.close()
+        await batcher.consume(subscription)
+
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+
+
+def test_validation():
+    with pytest.raises(ValueError):
+        EventBatcher(print, max_size=0)
+    with pytest.raises(ValueError):
+        EventBatcher(print, max_age=0)
+    with pytest.raises(ValueError):
+        EventBatcher(print, max_retries=-1)
+    with pytest.raises(ValueError):
+        EventBatcher(print, shutdown_timeout=-1)
@@ -0,0 +1,115 @@
+"""Tests for the sync/async bridge and the loop-blocking warning."""
+
+import asyncio
+import threading
+import warnings
+
+import pytest
+
+from facevault import FaceVaultBridge, FaceVaultClient, LoopBlockingWarning, Session
+from facevault.testing import FakeFaceVault
+
+
+@pytest.fixture
+def fake():
+    return FakeFaceVault(progression=("pending", "completed"))
+
+
+def _bridge(fake, **kwargs):
+    return FaceVaultBridge(
+        "fv_test_key", transport=fake.transport(), async_transport=fake.async_transport(), **kwargs
+    )
+
+
+def test_without_loop_uses_pool(fake):
+    bridge = _bridge(fake)
+    session = bridge.create_session("alice")
+    assert isinstance(session, Session)
+    assert bridge.get_session(session.session_id).status == "completed"
+    assert bridge.pool_stats()["submitted"] == 2
+    assert bridge.sync_client.stats().counter("loop_blocking_calls") == 0
+    bridge.close()
+
+
+async def test_on_loop_returns_awaitable(fake):
+    bridge = _bridge(fake)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", LoopBlockingWarning)
+        session = await bridge.create_session("alice")
+    assert isinstance(session, Session)
+    assert bridge.pool_stats()["submitted"] == 0
+    assert bridge.async_client().stats().snapshot()["endpoints"]
+    await bridge.aclose()
+    bridge.close()
+
+
+async def test_worker_thread_calls_are_routed_to_the_loop(fake):
+    bridge = _bridge(fake)
+    session = await bridge.create_session("alice")  # attaches the running loop
+
+    status = await asyncio.get_running_loop().run_in_executor(None, bridge.get_session, session.session_id)
+    assert status.status == "completed"
+    assert bridge.pool_stats()["submitted"] == 0
+    requests = sum(e["requests"] for e in bridge.async_client().stats().snapshot()["endpoints"].values())
+    assert requests == 2
+    await bridge.aclose()
+    bridge.close()
+
+
+def test_pool_is_bounded(fake):
+    fake.latency = lambda rng: 0.05
+    bridge = _bridge(fake, max_workers=2, max_pending=1)
+    threads = [threading.Thread(target=bridge.create_session, args=(f"u{i}",)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = bridge.pool_stats()
+    assert stats["submitted"] == 6
+    assert stats["peak_active"] == 2
+    assert stats["queue_wait"]["count"] == 6
+    bridge.close()
+
+
+async def test_sync_client_on_loop_warns(fake):
+    client = FaceVaultClient("fv_test_key", transport=fake.transport())
+    with pytest.warns(LoopBlockingWarning, match="create_session"):
+        client.create_session("alice")
+    assert client.stats().counter("loop_blocking_calls") == 1
+    client.close()
+
+
+def test_async_only_options_are_not_passed_to_the_sync_client(fake):
+    from facevault import HedgePolicy, PrefetchPolicy
+
+    bridge = _bridge(fake, hedge=HedgePolicy(), prefetch=PrefetchPolicy(), body_offload_threshold=None)
+    assert bridge.create_session("alice").session_id
+    bridge.close()
+
+
+def test_close_closes_async_clients_on_their_loops(fake):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    bridge = _bridge(fake)
+
+    async def use():
+        await bridge.create_session("alice")
+        return bridge.async_client()
+
+    client = asyncio.run_coroutine_threadsafe(use(), loop).result()
+    bridge.close()
+    assert client._client.is_closed
+
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+async def test_close_on_a_loop_requires_aclose(fake):
+    bridge = _bridge(fake)
+    await bridge.create_session("alice")
+    with pytest.raises(RuntimeError, match="aclose"):
+        bridge.close()
+    await bridge.aclose()
+    bridge.close()
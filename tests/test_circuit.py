@@ -0,0 +1,183 @@
+"""Tests for the circuit breaker."""
+
+import time
+
+import httpx
+import pytest
+import respx
+
+from facevault import AsyncFaceVaultClient, CircuitBreaker, CircuitOpenError, FaceVaultClient, FaceVaultError
+from facevault import MetricsHook, NotFoundError
+from facevault.circuit import CLOSED, HALF_OPEN, OPEN
+from facevault.lanes import LanePolicy
+
+
+BASE_URL = "https://api.facevault.id"
+
+
+class TransitionHook(MetricsHook):
+    def __init__(self):
+        self.transitions = []
+
+    def on_circuit_state(self, endpoint, old_state, new_state):
+        self.transitions.append((endpoint, old_state, new_state))
+
+
+def _ok():
+    return httpx.Response(200, json={"session_id": "s", "session_token": "t", "steps": []})
+
+
+@respx.mock
+def test_opens_after_threshold_and_fails_fast():
+    route = respx.post(f"{BASE_URL}/api/v1/sessions").mock(return_value=httpx.Response(503, json={}))
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    hook = TransitionHook()
+
+    client = FaceVaultClient("fv_live_test", circuit_breaker=breaker, hooks=[hook])
+    for _ in range(3):
+        with pytest.raises(FaceVaultError):
+            client.create_session("user-1")
+    assert breaker.state() == OPEN
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        client.create_session("user-1")
+    assert exc_info.value.retry_after > 59
+    assert route.call_count == 3
+    assert hook.transitions == [("*", CLOSED, OPEN)]
+    assert client.stats().counter("circuit_open") == 1
+    client.close()
+
+
+@respx.mock
+def test_half_open_probe_closes_on_success():
+    route = respx.post(f"{BASE_URL}/api/v1/sessions")
+    route.side_effect = [httpx.ConnectError("refused"), _ok(), _ok()]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    hook = TransitionHook()
+
+    client = FaceVaultClient("fv_live_test", circuit_breaker=breaker, hooks=[hook])
+    with pytest.raises(httpx.ConnectError):
+        client.create_session("user-1")
+    with pytest.raises(CircuitOpenError):
+        client.create_session("user-1")
+
+    time.sleep(0.06)
+    assert breaker.state() == HALF_OPEN
+    client.create_session("user-1")
+    assert breaker.state() == CLOSED
+    assert hook.transitions == [("*", CLOSED, OPEN), ("*", OPEN, HALF_OPEN), ("*", HALF_OPEN, CLOSED)]
+    client.close()
+
+
+@respx.mock
+def test_failed_probe_reopens():
+    respx.post(f"{BASE_URL}/api/v1/sessions").mock(return_value=httpx.Response(500, json={}))
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+
+    client = FaceVaultClient("fv_live_test", circuit_breaker=breaker)
+    with pytest.raises(FaceVaultError):
+        client.create_session("user-1")
+    time.sleep(0.06)
+    with pytest.raises(FaceVaultError) as exc_info:
+        client.create_session("user-1")
+    assert not isinstance(exc_info.value, CircuitOpenError)
+    assert breaker.state() == OPEN
+    client.close()
+
+
+@respx.mock
+def test_client_errors_do_not_trip():
+    respx.get(f"{BASE_URL}/api/v1/sessions/nope").mock(return_value=httpx.Response(404, json={}))
+    breaker = CircuitBreaker(failure_threshold=1)
+
+    client = FaceVaultClient("fv_live_test", circuit_breaker=breaker)
+    for _ in range(3):
+        with pytest.raises(NotFoundError):
+            client.get_session("nope")
+    assert breaker.state() == CLOSED
+    client.close()
+
+
+def test_slow_calls_count_as_failures():
+    def handler(request):
+        time.sleep(0.02)
+        return _ok()
+
+    breaker = CircuitBreaker(failure_threshold=2, slow_call_threshold=0.01)
+    client = FaceVaultClient("fv_live_test", circuit_breaker=breaker, transport=httpx.MockTransport(handler))
+    client.create_session("user-1")
+    client.create_session("user-1")
+    assert breaker.state() == OPEN
+    client.close()
+
+
+@respx.mock
+def test_per_endpoint_circuits():
+    respx.post(f"{BASE_URL}/api/v1/sessions").mock(return_value=httpx.Response(500, json={}))
+    respx.get(f"{BASE_URL}/api/v1/sessions/sess_1").mock(
+        return_value=httpx.Response(200, json={"session_id": "sess_1", "status": "pending", "steps": {}})
+    )
+    breaker = CircuitBreaker(failure_threshold=1, per_endpoint=True)
+
+    client = FaceVaultClient("fv_live_test", circuit_breaker=breaker)
+    with pytest.raises(FaceVaultError):
+        client.create_session("user-1")
+    assert breaker.state("/api/v1/sessions") == OPEN
+    assert client.get_session("sess_1").status == "pending"
+    client.close()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_async_client_fails_fast():
+    route = respx.post(f"{BASE_URL}/api/v1/sessions").mock(side_effect=httpx.ReadTimeout("slow"))
+    breaker = CircuitBreaker(failure_threshold=2)
+
+    async with AsyncFaceVaultClient("fv_live_test", circuit_breaker=breaker) as client:
+        for _ in range(2):
+            with pytest.raises(httpx.ReadTimeout):
+                await client.create_session("user-1")
+        with pytest.raises(CircuitOpenError):
+            await client.create_session("user-1")
+    assert route.call_count == 2
+
+
+def test_lane_queueing_does_not_count_as_slow():
+    def handler(request):
+        return _ok()
+
+    # Every call after the first waits ~50 ms for a rate-limit token.
+    breaker = CircuitBreaker(failure_threshold=1, slow_call_threshold=0.03)
+    client = FaceVaultClient(
+        "fv_live_test",
+        circuit_breaker=breaker,
+        lanes=LanePolicy(rate_limit=20, burst=1),
+        transport=httpx.MockTransport(handler),
+    )
+    start = time.perf_counter()
+    for _ in range(3):
+        client.create_session("user-1")
+    assert time.perf_counter() - start > 0.09
+    assert breaker.state() == CLOSED
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_closed_clients_stop_listening():
+    def handler(request):
+        return httpx.Response(503, json={})
+
+    breaker = CircuitBreaker(failure_threshold=1)
+    closed_hook, open_hook = TransitionHook(), TransitionHook()
+    transport = httpx.MockTransport(handler)
+    FaceVaultClient("fv_live_test", circuit_breaker=breaker, hooks=[closed_hook], transport=transport).close()
+    async with AsyncFaceVaultClient("fv_live_test", circuit_breaker=breaker, hooks=[closed_hook], transport=transport):
+        pass
+
+    client = FaceVaultClient("fv_live_test", circuit_breaker=breaker, hooks=[open_hook], transport=transport)
+    with pytest.raises(FaceVaultError):
+        client.create_session("user-1")
+    client.close()
+    assert open_hook.transitions == [("*", CLOSED, OPEN)]
+    assert closed_hook.transitions == []
+    assert breaker._listeners == []
@@ -0,0 +1,98 @@
+"""Tests for columnar result batches."""
+
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from facevault import SessionStatus, WebhookEvent  # noqa: E402
+from facevault.columnar import SessionStatusBatch  # noqa: E402
+
+
+def _event(i, passed, decision, score, sanctions=False):
+    return WebhookEvent(
+        event="verification.completed",
+        session_id=f"s{i}",
+        status="completed",
+        face_match_passed=passed,
+        face_match_score=0.9 if passed else 0.2,
+        anti_spoofing_score=0.97,
+        trust_score=score,
+        trust_decision=decision,
+        sanctions_hit=sanctions,
+        completed_at=f"2026-01-01T00:00:{i:02d}Z",
+    )
+
+
+@pytest.fixture
+def batch():
+    records = [
+        _event(0, True, "accept", 90.0),
+        _event(1, True, "accept", 80.0),
+        _event(2, False, "reject", 20.0, sanctions=True),
+        _event(3, True, "review", 60.0),
+        SessionStatus(session_id="s4", status="in_progress", steps={}),
+    ]
+    return SessionStatusBatch.from_records(iter(records))
+
+
+def test_columns(batch):
+    assert len(batch) == 5
+    assert batch.trust_score.dtype == np.float64
+    assert math.isnan(batch.trust_score[4])
+    assert batch.face_match_passed.tolist() == [True, True, False, True, False]
+    assert batch.face_match_passed_known.tolist() == [True, True, True, True, False]
+    assert batch.categories["status"] == ["completed", "in_progress"]
+    assert batch.trust_decision.tolist() == [0, 0, 1, 2, -1]
+    assert batch.completed_at[1] == 1767225601.0
+
+
+def test_filtering(batch):
+    accepted = batch[batch.decision_is("accept")]
+    assert accepted.session_id.tolist() == ["s0", "s1"]
+    high = batch[batch.trust_score > 70]
+    assert len(high) == 2
+    assert batch[batch.status_is("in_progress", "unknown")].session_id.tolist() == ["s4"]
+    assert len(batch[batch.completed_between(1767225600, 1767225602)]) == 2
+    assert batch.decision_is("nonexistent").sum() == 0
+
+
+def test_aggregates(batch):
+    assert batch.pass_rate() == 0.75
+    assert batch.decision_counts() == {"accept": 2, "reject": 1, "review": 1, None: 1}
+    assert batch.status_counts() == {"completed": 4, "in_progress": 1}
+    counts, edges = batch.histogram("trust_score", bins=4, range=(0, 100))
+    assert counts.tolist() == [1, 0, 1, 2]
+    assert batch.mean("trust_score") == 62.5
+    assert batch.quantiles("trust_score", q=(0.5,)) == {0.5: 70.0}
+    assert batch.sanctions_hit.sum() == 1
+    with pytest.raises(ValueError):
+        batch.histogram("status")
+
+
+def test_concat_reconciles_categories():
+    first = SessionStatusBatch.from_records([_event(0, True, "accept", 90.0)])
+    second = SessionStatusBatch.from_records([_event(1, False, "reject", 10.0), _event(2, True, "accept", 95.0)])
+    merged = SessionStatusBatch.concat([first, second])
+    assert len(merged) == 3
+    assert merged.decision_counts() == {"accept": 2, "reject": 1}
+    assert merged.row(1)["trust_decision"] == "reject"
+
+
+def test_row_and_empty(batch):
+    assert batch.row(4) == {
+        "session_id": "s4",
+        "trust_score": None,
+        "face_match_score": None,
+        "anti_spoofing_score": None,
+        "completed_at": None,
+        "face_match_passed": None,
+        "sanctions_hit": None,
+        "status": "in_progress",
+        "trust_decision": None,
+    }
+    empty = SessionStatusBatch.from_records([])
+    assert len(empty) == 0
+    assert math.isnan(empty.pass_rate())
+    assert empty.decision_counts() == {}
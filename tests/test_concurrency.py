@@ -0,0 +1,99 @@
+"""Thread-safety and fork-safety of the sync client."""
+
+import os
+import threading
+
+import pytest
+
+from facevault import CircuitBreaker, FaceVaultClient, LanePolicy, SQLiteSessionRegistry
+from facevault.testing import FakeFaceVault, uniform
+
+
+def test_shared_client_under_thread_stress(tmp_path):
+    fake = FakeFaceVault(latency=uniform(0, 0.002), progression=("pending", "completed"), seed=3)
+    registry = SQLiteSessionRegistry(str(tmp_path / "sessions.db"))
+    client = FaceVaultClient(
+        "fv_test_key",
+        transport=fake.transport(),
+        circuit_breaker=CircuitBreaker(),
+        lanes=LanePolicy(max_concurrency=8, batch_concurrency=4),
+        registry=registry,
+    )
+    threads, calls = 16, 25
+    errors = []
+    barrier = threading.Barrier(threads)
+
+    def worker(n):
+        barrier.wait()
+        try:
+            for i in range(calls):
+                session = client.create_session(f"user-{n}-{i}", priority="batch" if i % 2 else "interactive")
+                status = client.get_session(session.session_id)
+                assert status.session_id == session.session_id
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    assert errors == []
+    snapshot = client.stats().snapshot()["endpoints"]
+    assert sum(e["requests"] for e in snapshot.values()) == threads * calls * 2
+    assert len(registry) == threads * calls
+    assert len(registry.by_status("completed")) == threads * calls
+    client.close()
+    registry.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_child_gets_fresh_pool_and_stats(tmp_path):
+    fake = FakeFaceVault(progression=("pending", "completed"))
+    registry = SQLiteSessionRegistry(str(tmp_path / "sessions.db"))
+    client = FaceVaultClient("fv_test_key", transport=fake.transport(), registry=registry)
+    parent_session = client.create_session("parent")
+    parent_pool = client._client
+
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # child
+        code = 1
+        try:
+            session = client.create_session("child")
+            ok = (
+                client._client is not parent_pool
+                and sum(e["requests"] for e in client.stats().snapshot()["endpoints"].values()) == 1
+                and registry.latest_for_user("child").session_id == session.session_id
+                and registry.get(parent_session.session_id) is not None
+            )
+            code = 0 if ok else 1
+        finally:
+            os.write(write_end, bytes([code]))
+            os._exit(0)
+    os.close(write_end)
+    result = os.read(read_end, 1)
+    os.waitpid(pid, 0)
+    os.close(read_end)
+
+    assert result == b"\x00"
+    # The parent's pool and stats are untouched, and it sees the child's write.
+    assert client._client is parent_pool
+    assert client.get_session(parent_session.session_id).status == "completed"
+    assert registry.latest_for_user("child") is not None
+    client.close()
+    registry.close()
+
+
+def test_closed_client_is_not_reset_after_fork():
+    from facevault._client import _live_clients
+
+    client = FaceVaultClient("fv_test_key", transport=FakeFaceVault().transport())
+    assert client in _live_clients
+    client.close()
+    assert client not in _live_clients
+
+    # Even if a fork lands while close() is running, a closed client stays closed.
+    client._after_fork()
+    assert client._client.is_closed
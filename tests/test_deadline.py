@@ -0,0 +1,129 @@
+"""Tests for per-call timeout budgets and deadlines."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from facevault import AsyncFaceVaultClient, DeadlineExceededError, FaceVaultClient, LanePolicy
+from facevault.lanes import BATCH
+
+
+def _status_response():
+    return httpx.Response(200, json={"session_id": "sess_1", "status": "pending", "steps": {}})
+
+
+def test_expired_deadline_fails_without_request():
+    calls = []
+    transport = httpx.MockTransport(lambda request: calls.append(request) or _status_response())
+
+    client = FaceVaultClient("fv_live_test", transport=transport)
+    with pytest.raises(DeadlineExceededError):
+        client.get_session("sess_1", deadline=time.time() - 1)
+    with pytest.raises(DeadlineExceededError):
+        client.get_session("sess_1", timeout=0)
+
+    assert calls == []
+    assert client.stats().counter("deadline_exceeded") == 2
+    client.close()
+
+
+def test_request_timeout_capped_by_budget():
+    seen = []
+
+    def handler(request):
+        seen.append(request.extensions["timeout"])
+        return _status_response()
+
+    client = FaceVaultClient("fv_live_test", transport=httpx.MockTransport(handler), timeout=15)
+    client.get_session("sess_1", timeout=2)
+    client.get_session("sess_1")
+
+    capped, default = seen
+    assert all(0 < value <= 2 for value in capped.values())
+    assert default["read"] == 15
+    client.close()
+
+
+class _SlowDrip(httpx.SyncByteStream):
+    """A JSON body sent one byte every ``interval`` seconds."""
+
+    def __init__(self, interval):
+        self.interval = interval
+
+    def __iter__(self):
+        for byte in b'{"session_id": "sess_1", "status": "pending", "steps": {}}':
+            time.sleep(self.interval)
+            yield bytes([byte])
+
+
+def test_slow_response_body_bounded_by_deadline():
+    def handler(request):
+        return httpx.Response(200, headers={"Content-Type": "application/json"}, stream=_SlowDrip(0.05))
+
+    client = FaceVaultClient("fv_live_test", transport=httpx.MockTransport(handler))
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceededError, match="reading the response"):
+        client.get_session("sess_1", timeout=0.3)
+    # Each read is well under the read timeout; only the per-chunk check stops it (~3s otherwise).
+    assert time.monotonic() - start < 0.6
+    assert client.stats().counter("deadline_exceeded") == 1
+
+    status = client.get_session("sess_1", timeout=10)
+    assert status.session_id == "sess_1"
+    client.close()
+
+
+def test_earlier_of_timeout_and_deadline_wins():
+    seen = []
+
+    def handler(request):
+        seen.append(request.extensions["timeout"]["read"])
+        return _status_response()
+
+    client = FaceVaultClient("fv_live_test", transport=httpx.MockTransport(handler))
+    client.get_session("sess_1", timeout=10, deadline=time.time() + 1)
+
+    assert seen[0] <= 1
+    client.close()
+
+
+def test_rate_limit_wait_that_cannot_be_met_fails_fast():
+    lanes = LanePolicy(rate_limit=1, burst=1, interactive_reserve=0)
+    client = FaceVaultClient("fv_live_test", transport=httpx.MockTransport(lambda r: _status_response()), lanes=lanes)
+    client.get_session("sess_1", priority=BATCH)
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceededError, match="cannot be met"):
+        client.get_session("sess_1", priority=BATCH, timeout=0.2)
+    assert time.monotonic() - start < 0.1
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_async_budget_covers_slow_response():
+    async def handler(request):
+        await asyncio.sleep(1)
+        return _status_response()
+
+    async with AsyncFaceVaultClient("fv_live_test", transport=httpx.MockTransport(handler)) as client:
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            await client.get_session("sess_1", timeout=0.05)
+        assert time.monotonic() - start < 0.5
+
+
+@pytest.mark.asyncio
+async def test_async_budget_shared_with_queue_wait():
+    async def handler(request):
+        await asyncio.sleep(0.1)
+        return _status_response()
+
+    lanes = LanePolicy(max_concurrency=1, batch_concurrency=1)
+    async with AsyncFaceVaultClient("fv_live_test", transport=httpx.MockTransport(handler), lanes=lanes) as client:
+        busy = asyncio.ensure_future(client.get_session("sess_1"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(DeadlineExceededError):
+            await client.get_session("sess_1", timeout=0.05)
+        await busy
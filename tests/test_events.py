@@ -0,0 +1,145 @@
+"""Tests for the webhook event bus."""
+
+import anyio
+import pytest
+
+from facevault import EventBus, WebhookEvent
+
+
+def _event(i):
+    return WebhookEvent(event="verification.completed", session_id=f"sess_{i}", status="completed", trust_score=i)
+
+
+async def _drain(subscription):
+    return [event.session_id async for event in subscription]
+
+
+async def test_fan_out_in_order():
+    async with EventBus() as bus:
+        a = bus.subscribe("analytics")
+        b = bus.subscribe("notifier")
+        for i in range(5):
+            await bus.publish(_event(i))
+
+    expected = [f"sess_{i}" for i in range(5)]
+    assert await _drain(a) == expected
+    assert await _drain(b) == expected
+    assert bus.stats()["analytics"] == {"pending": 0, "delivered": 5, "dropped": 0, "spilled": 0}
+
+
+async def test_drop_oldest():
+    bus = EventBus()
+    sub = bus.subscribe("lossy", max_buffer=2)
+    for i in range(5):
+        bus.publish_nowait(_event(i))
+    bus.close()
+
+    assert await _drain(sub) == ["sess_3", "sess_4"]
+    assert sub.dropped == 3
+
+
+async def test_block_waits_for_room_without_holding_up_others():
+    bus = EventBus()
+    slow = bus.subscribe("audit", max_buffer=1, overflow="block")
+    fast = bus.subscribe("notifier")
+    bus.publish_nowait(_event(0))
+
+    with pytest.raises(anyio.WouldBlock):
+        bus.publish_nowait(_event(1))
+    assert fast.pending == 1  # nobody got the rejected event
+
+    async with anyio.create_task_group() as tasks:
+        tasks.start_soon(bus.publish, _event(1))
+        # The fast subscriber has the event while publish still waits on the slow one.
+        assert (await fast.__anext__()).session_id == "sess_0"
+        assert (await fast.__anext__()).session_id == "sess_1"
+        assert slow.pending == 1
+        assert (await slow.__anext__()).session_id == "sess_0"
+    bus.close()
+    assert await _drain(slow) == ["sess_1"]
+
+
+async def test_spill_to_disk_keeps_order(tmp_path):
+    bus = EventBus(spill_dir=str(tmp_path))
+    sub = bus.subscribe("audit", max_buffer=2, overflow="spill")
+    for i in range(10):
+        await bus.publish(_event(i))
+    assert sub.spilled == 8
+    assert sub.pending == 10
+
+    first = [(await sub.__anext__()).session_id for _ in range(4)]
+    for i in range(10, 12):
+        await bus.publish(_event(i))  # still behind: goes to disk after the rest
+    bus.close()
+    rest = await _drain(sub)
+
+    assert first + rest == [f"sess_{i}" for i in range(12)]
+    assert sub.spilled == 10
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_spilled_events_round_trip():
+    bus = EventBus()
+    sub = bus.subscribe("audit", max_buffer=1, overflow="spill")
+    events = [_event(i) for i in range(3)]
+    for event in events:
+        await bus.publish(event)
+    bus.close()
+    assert [event async for event in sub] == events
+
+
+async def test_slow_subscriber_does_not_delay_others():
+    bus = EventBus()
+    slow = bus.subscribe("audit", max_buffer=100)
+    fast = bus.subscribe("notifier")
+    received = {}
+
+    async def consume(subscription, delay):
+        async for event in subscription:
+            await anyio.sleep(delay)
+            received.setdefault(subscription.name, []).append((event.session_id, anyio.current_time()))
+
+    start = anyio.current_time()
+    async with anyio.create_task_group() as tasks:
+        tasks.start_soon(consume, slow, 0.05)
+        tasks.start_soon(consume, fast, 0)
+        for i in range(10):
+            await bus.publish(_event(i))
+        await anyio.sleep(0.01)
+        bus.close()
+
+    assert len(received["notifier"]) == len(received["audit"]) == 10
+    assert received["notifier"][-1][1] - start < 0.1
+    assert received["audit"][-1][1] - start >= 0.5
+
+
+async def test_publish_from_thread():
+    bus = EventBus()
+    sub = bus.subscribe("db")
+    await anyio.to_thread.run_sync(bus.publish_from_thread, _event(1))
+    assert (await sub.__anext__()).session_id == "sess_1"
+    with pytest.raises(RuntimeError):
+        EventBus().publish_from_thread(_event(2))
+
+
+async def test_unsubscribe_and_validation():
+    bus = EventBus()
+    sub = bus.subscribe("a")
+    with pytest.raises(ValueError, match="already"):
+        bus.subscribe("a")
+    with pytest.raises(ValueError):
+        bus.subscribe("b", overflow="explode")
+    with pytest.raises(ValueError):
+        bus.subscribe("b", max_buffer=0)
+
+    await bus.publish(_event(0))
+    sub.close()
+    assert await _drain(sub) == []
+    assert "a" not in bus.stats()
+    bus.subscribe("a")  # name is free again
+
+    bus.close()
+    with pytest.raises(RuntimeError):
+        await bus.publish(_event(1))
+    with pytest.raises(RuntimeError):
+        bus.subscribe("c")
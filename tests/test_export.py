@@ -0,0 +1,222 @@
+"""Tests for the bulk export command."""
+
+import csv
+import io
+import json
+
+import httpx
+import pytest
+import respx
+
+from facevault import AsyncFaceVaultClient, AuthError
+from facevault import __main__ as cli
+from facevault import export
+from facevault.export import export_sessions, read_ids
+from facevault.testing import FakeFaceVault
+
+
+BASE_URL = "https://api.facevault.id"
+
+
+@pytest.fixture
+def fake():
+    return FakeFaceVault(progression=("pending", "completed"), seed=1)
+
+
+def _create(fake, n):
+    with httpx.Client(transport=fake.transport(), base_url=BASE_URL) as http:
+        return [
+            http.post("/api/v1/sessions", params={"external_user_id": f"u{i}"}).json()["session_id"]
+            for i in range(n)
+        ]
+
+
+async def test_jsonl_in_input_order(fake, tmp_path):
+    ids = _create(fake, 50)
+    output = tmp_path / "out.jsonl"
+    async with AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport()) as client:
+        progress = await export_sessions(client, iter(ids + ["missing"]), str(output), concurrency=8)
+
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [row["session_id"] for row in rows] == ids + ["missing"]
+    assert rows[0]["status"] == "completed"
+    assert rows[-1]["status"] == "not_found"
+    assert progress.exported == 51
+    assert progress.not_found == 1
+
+
+async def test_csv_flattens_nested_fields(fake):
+    ids = _create(fake, 3)
+    output = io.BytesIO()
+    async with AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport()) as client:
+        await export_sessions(client, ids, output, format="csv")
+
+    rows = list(csv.DictReader(io.StringIO(output.getvalue().decode())))
+    assert [row["session_id"] for row in rows] == ids
+    assert json.loads(rows[0]["steps"]) == {"liveness": True, "document": True}
+
+
+async def test_resume_after_failure(fake, tmp_path):
+    ids = _create(fake, 30)
+    output = str(tmp_path / "out.jsonl")
+    checkpoint = output + ".checkpoint"
+    inner = fake.async_transport()
+    failing = {ids[17]}
+
+    async def handler(request):
+        if request.url.path.rsplit("/", 1)[-1] in failing:
+            return httpx.Response(401, json={"detail": "Invalid API key"})
+        return await inner.handle_async_request(request)
+
+    transport = httpx.MockTransport(handler)
+    async with AsyncFaceVaultClient("fv_test_key", transport=transport) as client:
+        with pytest.raises(AuthError):
+            await export_sessions(client, iter(ids), output, checkpoint=checkpoint, checkpoint_every=5)
+        with open(checkpoint) as f:
+            state = json.load(f)
+        assert state["consumed"] == 17
+
+        failing.clear()
+        progress = await export_sessions(client, iter(ids), output, checkpoint=checkpoint, checkpoint_every=5)
+
+    with open(output) as f:
+        rows = [json.loads(line) for line in f]
+    assert [row["session_id"] for row in rows] == ids
+    assert progress.resumed_from == 17
+    assert progress.exported == 30
+    assert not (tmp_path / "out.jsonl.checkpoint").exists()
+
+
+async def test_partial_output_after_checkpoint_is_discarded(fake, tmp_path):
+    ids = _create(fake, 4)
+    output = tmp_path / "out.jsonl"
+    checkpoint = tmp_path / "out.jsonl.checkpoint"
+    line = b'{"session_id":"%s"}\n' % ids[0].encode()
+    output.write_bytes(line + b'{"session_id":"torn')
+    checkpoint.write_text(json.dumps({
+        "version": 1, "format": "jsonl", "consumed": 1, "exported": 1, "not_found": 0,
+        "output": {"bytes": len(line)},
+    }))
+
+    async with AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport()) as client:
+        await export_sessions(client, iter(ids), str(output), checkpoint=str(checkpoint))
+    assert [json.loads(l)["session_id"] for l in output.read_text().splitlines()] == ids
+
+
+@respx.mock
+async def test_transient_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(export.anyio, "sleep", _no_sleep)
+    respx.get(f"{BASE_URL}/api/v1/sessions/s1").mock(side_effect=[
+        httpx.Response(503, json={}),
+        httpx.Response(429, json={}),
+        httpx.Response(200, json={"session_id": "s1", "status": "completed"}),
+    ])
+    output = io.BytesIO()
+    async with AsyncFaceVaultClient("fv_live_test") as client:
+        await export_sessions(client, ["s1"], output)
+    assert json.loads(output.getvalue())["status"] == "completed"
+
+
+async def test_write_errors_are_raised_unwrapped(fake):
+    ids = _create(fake, 5)
+
+    class FullDisk(io.BytesIO):
+        def write(self, data):
+            raise OSError(28, "No space left on device")
+
+    async with AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport()) as client:
+        with pytest.raises(OSError, match="No space left"):
+            await export_sessions(client, ids, FullDisk())
+
+
+async def _no_sleep(delay):
+    return None
+
+
+async def test_parquet(fake, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    ids = _create(fake, 12)
+    output = str(tmp_path / "out.parquet")
+    async with AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport()) as client:
+        await export_sessions(client, ids, output, format="parquet", checkpoint_every=5)
+
+    table = pq.read_table(output)
+    assert table.column("session_id").to_pylist() == ids
+    assert len(list((tmp_path / "out.parquet").iterdir())) == 3
+
+
+async def test_parquet_resume_only_removes_the_interrupted_part(fake, tmp_path):
+    pytest.importorskip("pyarrow")
+    ids = _create(fake, 6)
+    output = tmp_path / "out.parquet"
+    checkpoint = tmp_path / "out.parquet.checkpoint"
+    async with AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport()) as client:
+        await export_sessions(client, ids[:3], str(output), format="parquet", checkpoint_every=3)
+        (output / "part-00001.parquet").write_bytes(b"torn")
+        (output / "part-notes.parquet").write_bytes(b"mine")
+        (output / "part-00009.parquet.bak").write_bytes(b"mine")
+        checkpoint.write_text(json.dumps({
+            "version": 1, "format": "parquet", "consumed": 3, "exported": 3, "not_found": 0,
+            "output": {"parts": 1},
+        }))
+        await export_sessions(client, iter(ids), str(output), format="parquet", checkpoint=str(checkpoint))
+
+    assert sorted(path.name for path in output.iterdir()) == [
+        "part-00000.parquet", "part-00001.parquet", "part-00009.parquet.bak", "part-notes.parquet",
+    ]
+    assert (output / "part-notes.parquet").read_bytes() == b"mine"
+
+
+async def test_parquet_refuses_to_mix_with_an_existing_export(fake, tmp_path):
+    pytest.importorskip("pyarrow")
+    ids = _create(fake, 2)
+    output = str(tmp_path / "out.parquet")
+    async with AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport()) as client:
+        await export_sessions(client, ids, output, format="parquet")
+        with pytest.raises(ValueError, match="already contains an export"):
+            await export_sessions(client, ids, output, format="parquet")
+
+
+def test_read_ids_skips_blanks_and_comments():
+    assert list(read_ids(["a\n", "\n", "# header\n", "  b  \n"])) == ["a", "b"]
+
+
+def test_cli(fake, tmp_path, monkeypatch, capsys):
+    ids = _create(fake, 5)
+    (tmp_path / "ids.txt").write_text("\n".join(ids))
+    output = tmp_path / "out.csv"
+    monkeypatch.setattr(
+        export, "_make_client",
+        lambda args: AsyncFaceVaultClient(args.api_key, transport=fake.async_transport()),
+    )
+
+    code = cli.main(["export", "-i", str(tmp_path / "ids.txt"), "-o", str(output), "--api-key", "fv_test_key"])
+    assert code == 0
+    with output.open() as f:
+        rows = list(csv.DictReader(f))
+    assert [row["session_id"] for row in rows] == ids
+    assert "exported 5 sessions" in capsys.readouterr().err
+
+    # A leftover checkpoint must be resumed explicitly.
+    (tmp_path / "out.csv.checkpoint").write_text("{}")
+    assert cli.main(["export", "-i", str(tmp_path / "ids.txt"), "-o", str(output), "--api-key", "k"]) == 2
+
+
+def test_cli_reports_io_errors(fake, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(
+        export, "_make_client",
+        lambda args: AsyncFaceVaultClient(args.api_key, transport=fake.async_transport()),
+    )
+    missing = str(tmp_path / "missing.txt")
+    assert cli.main(["export", "-i", missing, "-o", str(tmp_path / "out.jsonl"), "--api-key", "k"]) == 1
+    assert capsys.readouterr().err.startswith("error: ")
+
+    (tmp_path / "ids.txt").write_text("s1\n")
+    output = str(tmp_path / "no-such-dir" / "out.jsonl")
+    assert cli.main(["export", "-i", str(tmp_path / "ids.txt"), "-o", output, "--api-key", "k", "-q"]) == 1
+    assert "No such file or directory" in capsys.readouterr().err
+
+
+def test_stream_writer_requires_an_encoder():
+    with pytest.raises(TypeError):
+        export._StreamWriter(io.BytesIO(), None)
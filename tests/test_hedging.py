@@ -0,0 +1,148 @@
+"""Tests for hedged get_session requests."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from facevault import AsyncFaceVaultClient
+from facevault.hedging import HedgePolicy, _Hedger
+
+
+def _status(session_id="sess_1"):
+    return {"session_id": session_id, "status": "pending", "steps": {}}
+
+
+def _transport(delays):
+    """Mock transport answering call N after delays[N] seconds."""
+    calls = []
+
+    async def handler(request):
+        index = len(calls)
+        calls.append(request)
+        await asyncio.sleep(delays[index] if index < len(delays) else 0)
+        return httpx.Response(200, json={**_status(), "status": f"attempt-{index}"})
+
+    return httpx.MockTransport(handler), calls
+
+
+def test_policy_validation():
+    with pytest.raises(ValueError):
+        HedgePolicy(percentile=100)
+    with pytest.raises(ValueError):
+        HedgePolicy(budget=2)
+
+
+def test_delay_tracks_recent_percentile():
+    hedger = _Hedger(HedgePolicy(percentile=90, min_samples=10, initial_delay=1.0, min_delay=0))
+    assert hedger.delay() == 1.0
+
+    for ms in range(1, 101):
+        hedger.observe(ms / 1000)
+    assert hedger.delay() == pytest.approx(0.090)
+
+
+def test_budget_limits_hedges():
+    hedger = _Hedger(HedgePolicy(budget=0.25, burst=1))
+    results = []
+    for _ in range(8):
+        hedger.started()
+        results.append(hedger.try_acquire())
+    assert results.count(True) == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged():
+    transport, calls = _transport([1.0, 0.0])
+    policy = HedgePolicy(initial_delay=0.05, budget=1.0)
+
+    async with AsyncFaceVaultClient("fv_live_test", transport=transport, hedge=policy) as client:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        status = await client.get_session("sess_1")
+        elapsed = loop.time() - start
+
+    assert status.status == "attempt-1"
+    assert elapsed < 0.5
+    assert len(calls) == 2
+    assert client.stats().counter("hedges_sent") == 1
+    assert client.stats().counter("hedges_won") == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    transport, calls = _transport([0.0])
+    policy = HedgePolicy(initial_delay=0.5, budget=1.0)
+
+    async with AsyncFaceVaultClient("fv_live_test", transport=transport, hedge=policy) as client:
+        status = await client.get_session("sess_1")
+
+    assert status.status == "attempt-0"
+    assert len(calls) == 1
+    assert client.stats().counter("hedges_sent") == 0
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_budget():
+    transport, calls = _transport([0.2])
+    policy = HedgePolicy(initial_delay=0.01, budget=0.0)
+
+    async with AsyncFaceVaultClient("fv_live_test", transport=transport, hedge=policy) as client:
+        status = await client.get_session("sess_1")
+
+    assert status.status == "attempt-0"
+    assert len(calls) == 1
+    assert client.stats().counter("hedges_over_budget") == 1
+
+
+@pytest.mark.asyncio
+async def test_create_session_is_never_hedged():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json={"session_id": "s", "session_token": "t", "steps": []})
+
+    policy = HedgePolicy(initial_delay=0.01, budget=1.0)
+    async with AsyncFaceVaultClient("fv_live_test", transport=httpx.MockTransport(handler), hedge=policy) as client:
+        await client.create_session("user-1")
+
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_losing_attempt_is_cancelled():
+    transport, calls = _transport([1.0, 0.0])
+    policy = HedgePolicy(initial_delay=0.02, budget=1.0)
+
+    async with AsyncFaceVaultClient("fv_live_test", transport=transport, hedge=policy) as client:
+        await client.get_session("sess_1")
+        await asyncio.sleep(0)
+
+        endpoint = client.stats().snapshot()["endpoints"]["GET /api/v1/sessions/{session_id}"]
+    assert endpoint["status_codes"] == {"200": 1, "cancelled": 1}
+    assert endpoint["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_and_cancelled_attempts_are_observed():
+    transport, calls = _transport([1.0, 0.0])
+    policy = HedgePolicy(initial_delay=0.05, budget=1.0)
+
+    async with AsyncFaceVaultClient("fv_live_test", transport=transport, hedge=policy) as client:
+        await client.get_session("sess_1")
+        latencies = sorted(client._hedger._latencies)
+    # The cancelled primary is recorded with the time it had run, not dropped.
+    assert len(latencies) == 2
+    assert latencies[1] >= 0.05
+
+    async def failing(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    async with AsyncFaceVaultClient(
+        "fv_live_test", transport=httpx.MockTransport(failing), hedge=policy
+    ) as client:
+        with pytest.raises(Exception):
+            await client.get_session("sess_1")
+        assert len(client._hedger._latencies) >= 1
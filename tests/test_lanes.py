@@ -0,0 +1,143 @@
+"""Tests for interactive/batch priority lanes."""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from facevault import AsyncFaceVaultClient, FaceVaultClient, MetricsHook
+from facevault.lanes import BATCH, INTERACTIVE, LanePolicy, _Scheduler
+
+
+class PriorityHook(MetricsHook):
+    def __init__(self):
+        self.calls = []
+
+    def on_request(self, metrics):
+        self.calls.append(metrics)
+
+
+def _slow_async_transport(delay, log):
+    async def handler(request):
+        log.append(("start", request.url.path))
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={"session_id": "s", "session_token": "t", "status": "pending", "steps": {}})
+
+    return httpx.MockTransport(handler)
+
+
+def test_policy_validation():
+    with pytest.raises(ValueError):
+        LanePolicy(max_concurrency=2, batch_concurrency=3)
+    with pytest.raises(ValueError):
+        LanePolicy(rate_limit=0)
+    with pytest.raises(ValueError, match="burst"):
+        LanePolicy(rate_limit=5, burst=0.5)
+    with pytest.raises(ValueError, match="burst"):
+        LanePolicy(rate_limit=5, burst=0)
+
+
+def test_invalid_priority_rejected():
+    client = FaceVaultClient("fv_live_test")
+    with pytest.raises(ValueError, match="priority"):
+        client.get_session("sess_1", priority="urgent")
+    client.close()
+
+
+def test_scheduler_reserves_slots_for_interactive():
+    scheduler = _Scheduler(LanePolicy(max_concurrency=3, batch_concurrency=1))
+    assert scheduler.try_admit(BATCH) == 0
+    assert scheduler.try_admit(BATCH) == float("inf")
+    assert scheduler.try_admit(INTERACTIVE) == 0
+    assert scheduler.try_admit(INTERACTIVE) == 0
+    assert scheduler.try_admit(INTERACTIVE) == float("inf")
+
+
+def test_scheduler_rate_reserve():
+    policy = LanePolicy(max_concurrency=100, batch_concurrency=100, rate_limit=10, burst=10, interactive_reserve=0.5)
+    scheduler = _Scheduler(policy)
+    admitted = 0
+    while scheduler.try_admit(BATCH) == 0:
+        admitted += 1
+    assert admitted == 5
+    assert scheduler.try_admit(INTERACTIVE) == 0
+
+
+@pytest.mark.parametrize("rate_limit", [0.5, 1, 1.2])
+def test_scheduler_low_rate_limit_admits_batch(rate_limit):
+    # The bucket holds fewer than 1 + reserve tokens; batch calls must still get through.
+    scheduler = _Scheduler(LanePolicy(rate_limit=rate_limit))
+    assert scheduler.try_admit(BATCH) == 0
+    scheduler.release(BATCH)
+    wait = scheduler.try_admit(BATCH)
+    assert 0 < wait <= 1 / rate_limit
+
+
+@pytest.mark.asyncio
+async def test_low_rate_limit_batch_call_completes():
+    policy = LanePolicy(rate_limit=1)
+    transport = _slow_async_transport(0, [])
+    async with AsyncFaceVaultClient("fv_live_test", transport=transport, lanes=policy) as client:
+        status = await asyncio.wait_for(client.get_session("s", priority=BATCH), 2)
+    assert status.session_id == "s"
+
+
+def test_low_rate_limit_sync_batch_call_completes():
+    handler = lambda request: httpx.Response(200, json={"session_id": "s", "status": "pending", "steps": {}})
+    client = FaceVaultClient("fv_live_test", transport=httpx.MockTransport(handler), lanes=LanePolicy(rate_limit=1))
+    assert client.get_session("s", priority=BATCH, timeout=2).session_id == "s"
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_batch_cannot_starve_interactive():
+    log = []
+    policy = LanePolicy(max_concurrency=3, batch_concurrency=2)
+    hook = PriorityHook()
+    transport = _slow_async_transport(0.05, log)
+
+    async with AsyncFaceVaultClient("fv_live_test", transport=transport, lanes=policy, hooks=[hook]) as client:
+        batch = [asyncio.ensure_future(client.get_session(f"b{i}", priority=BATCH)) for i in range(10)]
+        await asyncio.sleep(0.01)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await client.create_session("user-1")
+        interactive_elapsed = loop.time() - start
+        await asyncio.gather(*batch)
+
+    # The interactive call ran in the reserved slot instead of queueing behind ten batch calls.
+    assert interactive_elapsed < 0.1
+    interactive = [m for m in hook.calls if m.priority == INTERACTIVE]
+    assert len(interactive) == 1
+    assert interactive[0].queue_wait < 0.02
+    assert max(m.queue_wait for m in hook.calls if m.priority == BATCH) > 0.1
+
+
+def test_sync_lanes_limit_concurrency():
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def handler(request):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight -= 1
+        return httpx.Response(200, json={"session_id": "s", "status": "pending", "steps": {}})
+
+    policy = LanePolicy(max_concurrency=4, batch_concurrency=2)
+    client = FaceVaultClient("fv_live_test", transport=httpx.MockTransport(handler), lanes=policy)
+    threads = [threading.Thread(target=client.get_session, args=("s",), kwargs={"priority": BATCH})
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+    client.close()
@@ -0,0 +1,126 @@
+"""Tests for the load-test harness."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from facevault.loadtest import LoadProfile, format_report, parse_mix, run_load_test
+from facevault.testing import FakeFaceVault
+
+
+def test_parse_mix():
+    assert parse_mix("get=8, create_session=1,verify=0.5") == {
+        "get_session": 8.0, "create_session": 1.0, "verify_webhook": 0.5,
+    }
+    with pytest.raises(ValueError):
+        parse_mix("get_session")
+
+
+def test_profile_validation():
+    with pytest.raises(ValueError, match="Unknown"):
+        LoadProfile(mix={"delete_session": 1})
+    with pytest.raises(ValueError):
+        LoadProfile(mix={"get_session": 0})
+    with pytest.raises(ValueError):
+        LoadProfile(rate=0)
+    with pytest.raises(ValueError, match="expected_interval"):
+        LoadProfile(expected_interval=0)
+    with pytest.raises(ValueError, match="closed model"):
+        LoadProfile(rate=10, expected_interval=0.1)
+    with pytest.raises(ValueError):
+        run_load_test(LoadProfile(duration=0.1), client="threads")
+    with pytest.raises(ValueError, match="api_key"):
+        run_load_test(LoadProfile(duration=0.1), base_url="http://localhost:1")
+
+
+@pytest.mark.parametrize("client", ["async", "sync"])
+def test_open_model_measures_from_scheduled_start(client):
+    # One slow request at a time: later requests queue behind earlier ones,
+    # so latency from the scheduled start must exceed the service time.
+    fake = FakeFaceVault(latency=0.02)
+    profile = LoadProfile(mix={"get_session": 1}, rate=100, concurrency=1, duration=0.5, seed=1)
+    results = run_load_test(profile, client=client, simulator=fake)
+
+    get = results["operations"]["get_session"]
+    assert results["model"] == "open"
+    assert results["requests"] == get["requests"] == 50
+    assert results["errors"] == 0
+    assert get["service_time"]["percentiles"]["p50"] == pytest.approx(0.02, abs=0.015)
+    assert get["latency"]["percentiles"]["p99"] > 0.2
+    assert results["throughput"] < 100
+
+
+def test_closed_model_corrects_for_coordinated_omission():
+    # One 0.5s stall among 5ms responses, after the sessions seeded before the run.
+    delays = iter([0.005] * 20 + [0.5] + [0.005] * 10_000)
+    fake = FakeFaceVault(latency=lambda rng: next(delays))
+    profile = LoadProfile(mix={"get_session": 1}, concurrency=1, duration=0.8, seed=1, expected_interval=0.005)
+    results = run_load_test(profile, client="async", simulator=fake)
+
+    get = results["operations"]["get_session"]
+    assert results["model"] == "closed"
+    assert results["coordinated_omission"] == {
+        "method": "expected_interval", "expected_interval": 0.005, "caveat": None,
+    }
+    assert get["service_time"]["percentiles"]["p50"] < 0.02
+    # The requests a steady client would have sent during the stall are backfilled.
+    assert get["latency"]["count"] > get["service_time"]["count"] + 50
+    assert get["latency"]["percentiles"]["p50"] > 0.1
+
+
+def test_closed_model_is_uncorrected_without_expected_interval():
+    fake = FakeFaceVault(latency=0.01)
+    profile = LoadProfile(mix={"get_session": 1, "verify_webhook": 3}, concurrency=2, duration=0.3, seed=2)
+    results = run_load_test(profile, client="async", simulator=fake)
+
+    correction = results["coordinated_omission"]
+    assert correction["method"] == "none"
+    assert correction["expected_interval"] is None
+    assert "not corrected" in correction["caveat"]
+    for op in results["operations"].values():
+        assert op["latency"]["count"] == op["service_time"]["count"]
+    assert "--expected-interval" in format_report(results)
+
+
+def test_seeded_sync_open_model_is_reproducible():
+    def run():
+        fake = FakeFaceVault(latency=lambda rng: rng.uniform(0, 0.004), seed=5)
+        profile = LoadProfile(mix={"get_session": 1, "verify_webhook": 1}, rate=400, concurrency=4, duration=0.2, seed=5)
+        results = run_load_test(profile, client="sync", simulator=fake)
+        return {op: stats["requests"] for op, stats in results["operations"].items()}
+
+    assert run() == run() == run()
+
+
+def test_mix_errors_and_report():
+    fake = FakeFaceVault(error_rate=0.2, seed=3)
+    profile = LoadProfile(rate=400, concurrency=8, duration=0.5, warmup=0.1, seed=3)
+    results = run_load_test(profile, simulator=fake)
+
+    ops = results["operations"]
+    assert set(ops) == {"create_session", "get_session", "verify_webhook"}
+    assert ops["get_session"]["requests"] > ops["create_session"]["requests"]
+    assert ops["verify_webhook"]["errors"] == {}
+    assert results["errors"] == sum(sum(op["errors"].values()) for op in ops.values()) > 0
+    assert set(results["latency"]["percentiles"]) == {"p50", "p95", "p99", "p999"}
+    json.dumps(results)
+
+    report = format_report(results)
+    assert "p99.9" in report
+    assert "scheduled start" in report
+
+
+def test_command_line(tmp_path):
+    output = tmp_path / "results.json"
+    completed = subprocess.run(
+        [sys.executable, "-m", "facevault.loadtest", "--rate", "50", "--duration", "0.3",
+         "--mix", "get=1,verify=1", "--sim-latency", "0.001", "--seed", "7", "-o", str(output)],
+        capture_output=True, text=True, timeout=30,
+    )
+    assert completed.returncode == 0, completed.stderr
+    assert "throughput" in completed.stderr
+    results = json.loads(output.read_text())
+    assert results["requests"] == 15
+    assert set(results["operations"]) <= {"get_session", "verify_webhook"}
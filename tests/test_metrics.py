@@ -0,0 +1,168 @@
+"""Tests for request instrumentation and latency histograms."""
+
+import httpx
+import pytest
+import respx
+
+from facevault import AsyncFaceVaultClient, FaceVaultClient, MetricsHook, NotFoundError
+from facevault.metrics import LatencyHistogram, _RequestTimer
+
+
+BASE_URL = "https://api.facevault.id"
+
+
+class RecordingHook(MetricsHook):
+    def __init__(self):
+        self.calls = []
+
+    def on_request(self, metrics):
+        self.calls.append(metrics)
+
+
+def test_histogram_percentiles_within_precision():
+    histogram = LatencyHistogram()
+    for ms in range(1, 1001):
+        histogram.record(ms / 1000)
+
+    assert histogram.count == 1000
+    assert histogram.min == 0.001
+    assert histogram.max == 1.0
+    assert histogram.percentile(50) == pytest.approx(0.5, rel=0.01)
+    assert histogram.percentile(99) == pytest.approx(0.99, rel=0.01)
+    assert histogram.percentile(100) == 1.0
+
+
+def test_histogram_merge_and_empty():
+    a = LatencyHistogram()
+    b = LatencyHistogram()
+    assert a.percentile(99) == 0.0
+
+    a.record(0.010)
+    b.record(0.020, count=3)
+    a.merge(b)
+
+    assert a.count == 4
+    assert a.total == pytest.approx(0.070)
+    assert a.count_at_or_below(0.015) == 1
+
+
+def test_histogram_coordinated_omission_correction():
+    histogram = LatencyHistogram()
+    histogram.record(0.010, count=99)
+    histogram.record(1.0)
+
+    corrected = histogram.corrected(0.010)
+    # The 1s stall hid ~99 requests that would have waited 990ms, 980ms, ... 10ms.
+    assert corrected.count == 100 + 99
+    assert corrected.max == 1.0
+    assert histogram.percentile(90) == pytest.approx(0.010, rel=0.01)
+    assert corrected.percentile(90) == pytest.approx(0.8, rel=0.05)
+    assert histogram.corrected(0).count == histogram.count
+
+
+def test_queue_wait_counts_lane_wait_once():
+    timer = _RequestTimer()
+    timer.start = 100.0
+    timer.queue_wait = 0.1  # lane admission, measured from start
+    timer.first_io = 100.15  # lane wait plus connection pool wait
+    assert timer.metrics("GET", "/x", None, None, None).queue_wait == pytest.approx(0.15)
+
+    timer.first_io = None  # never reached the network
+    assert timer.metrics("GET", "/x", None, None, None).queue_wait == pytest.approx(0.1)
+
+
+@respx.mock
+def test_sync_client_reports_request_metrics():
+    respx.get(f"{BASE_URL}/api/v1/sessions/sess_1").mock(
+        return_value=httpx.Response(200, json={"session_id": "sess_1", "status": "pending", "steps": {}})
+    )
+    hook = RecordingHook()
+
+    client = FaceVaultClient("fv_live_test", hooks=[hook])
+    client.get_session("sess_1")
+
+    [metrics] = hook.calls
+    assert metrics.method == "GET"
+    assert metrics.endpoint == "/api/v1/sessions/{session_id}"
+    assert metrics.status_code == 200
+    assert metrics.retries == 0
+    assert metrics.response_bytes > 0
+    assert metrics.latency > 0
+    assert metrics.error is None
+
+    snapshot = client.stats().snapshot()
+    endpoint = snapshot["endpoints"]["GET /api/v1/sessions/{session_id}"]
+    assert endpoint["requests"] == 1
+    assert endpoint["status_codes"] == {"200": 1}
+    client.close()
+
+
+@respx.mock
+def test_errors_are_counted():
+    respx.get(f"{BASE_URL}/api/v1/sessions/nope").mock(
+        return_value=httpx.Response(404, json={"detail": "Not found"})
+    )
+    respx.get(f"{BASE_URL}/api/v1/sessions/boom").mock(side_effect=httpx.ConnectError("refused"))
+
+    client = FaceVaultClient("fv_live_test")
+    with pytest.raises(NotFoundError):
+        client.get_session("nope")
+    with pytest.raises(httpx.ConnectError):
+        client.get_session("boom")
+
+    endpoint = client.stats().snapshot()["endpoints"]["GET /api/v1/sessions/{session_id}"]
+    assert endpoint["requests"] == 2
+    assert endpoint["errors"] == 2
+    assert endpoint["status_codes"] == {"404": 1, "error": 1}
+    client.close()
+
+
+@respx.mock
+def test_failing_hook_does_not_break_request():
+    class BrokenHook(MetricsHook):
+        def on_request(self, metrics):
+            raise RuntimeError("boom")
+
+    respx.post(f"{BASE_URL}/api/v1/sessions").mock(
+        return_value=httpx.Response(200, json={"session_id": "s", "session_token": "t", "steps": []})
+    )
+
+    client = FaceVaultClient("fv_live_test", hooks=[BrokenHook()])
+    assert client.create_session("user-1").session_id == "s"
+    client.close()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_async_client_reports_request_metrics():
+    respx.post(f"{BASE_URL}/api/v1/sessions").mock(
+        return_value=httpx.Response(200, json={"session_id": "s", "session_token": "t", "steps": []})
+    )
+    hook = RecordingHook()
+
+    async with AsyncFaceVaultClient("fv_live_test", hooks=[hook]) as client:
+        await client.create_session("user-1")
+
+    [metrics] = hook.calls
+    assert metrics.method == "POST"
+    assert metrics.endpoint == "/api/v1/sessions"
+    assert metrics.status_code == 200
+    assert client.stats().latency("POST", "/api/v1/sessions").count == 1
+
+
+@respx.mock
+def test_prometheus_text_format():
+    respx.post(f"{BASE_URL}/api/v1/sessions").mock(
+        return_value=httpx.Response(200, json={"session_id": "s", "session_token": "t", "steps": []})
+    )
+
+    client = FaceVaultClient("fv_live_test")
+    client.create_session("user-1")
+    text = client.stats().to_prometheus()
+
+    assert "# TYPE facevault_requests_total counter" in text
+    assert 'facevault_requests_total{method="POST",endpoint="/api/v1/sessions",status="200"} 1' in text
+    assert '# TYPE facevault_request_duration_seconds histogram' in text
+    assert 'facevault_request_duration_seconds_bucket{method="POST",endpoint="/api/v1/sessions",le="+Inf"} 1' in text
+    assert 'facevault_request_duration_seconds_count{method="POST",endpoint="/api/v1/sessions"} 1' in text
+    client.close()
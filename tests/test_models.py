@@ -1,5 +1,7 @@
 """Tests for FaceVault SDK data models."""
 
+import pytest
+
 from facevault.models import Session, SessionStatus, WebhookEvent
 
 
@@ -140,3 +142,168 @@ def test_webhook_event_full():
     assert event.trust_decision == "accept"
     assert event.sanctions_hit is False
     assert event.poa == {"status": "pending"}
+
+
+def _status():
+    return SessionStatus(
+        session_id="sess_1",
+        status="completed",
+        steps={"liveness": True, "document": True},
+        face_match_passed=False,
+        created_at="2026-01-01T00:00:00Z",
+        trust_score=85.5,
+        require_poa=True,
+        poa={"status": "verified", "address": "1 Main St"},
+        credential={"id": "cred_1"},
+    )
+
+
+def test_bytes_round_trip():
+    session = Session(
+        session_id="sess_1",
+        session_token="tok_1",
+        steps=["liveness"],
+        webapp_url="https://app.facevault.id/?sid=sess_1&st=tok_1",
+        challenge_nonce="nonce_ü",
+    )
+    assert Session.from_bytes(session.to_bytes()) == session
+    assert SessionStatus.from_bytes(_status().to_bytes()) == _status()
+    event = WebhookEvent(event="verification.completed", session_id="sess_1", status="completed", sanctions_hit=False)
+    assert WebhookEvent.from_bytes(event.to_bytes()) == event
+
+
+def test_bytes_smaller_than_json():
+    import dataclasses
+    import json
+
+    status = _status()
+    assert len(status.to_bytes()) < len(json.dumps(dataclasses.asdict(status), default=str)) * 0.7
+
+
+def test_bytes_redaction():
+    session = Session(
+        session_id="sess_1",
+        session_token="tok_secret",
+        steps=["liveness"],
+        webapp_url="https://app.facevault.id/?sid=sess_1&st=tok_secret",
+    )
+    data = session.to_bytes(redact=True)
+    assert b"tok_secret" not in data
+    restored = Session.from_bytes(data)
+    assert restored.session_id == "sess_1"
+    assert restored.session_token == ""
+
+    status = SessionStatus.from_bytes(_status().to_bytes(redact=True))
+    assert status.poa is None and status.credential is None
+    assert status.trust_score == 85.5
+
+
+def test_from_bytes_rejects_bad_input():
+    data = _status().to_bytes()
+    with pytest.raises(ValueError):
+        Session.from_bytes(data)
+    with pytest.raises(ValueError):
+        SessionStatus.from_bytes(data[:-3])
+    with pytest.raises(ValueError):
+        SessionStatus.from_bytes(b"\x09" + data[1:])
+    with pytest.raises(ValueError):
+        SessionStatus.from_bytes(b"")
+
+
+def test_to_bytes_rejects_wrong_field_types():
+    status = _status()
+    status.session_id = 42
+    with pytest.raises(TypeError, match="session_id must be a string"):
+        status.to_bytes()
+
+    status = _status()
+    status.trust_score = "85.5"
+    with pytest.raises(TypeError, match="trust_score must be a number"):
+        status.to_bytes()
+
+
+def test_pickle_round_trip_is_compact():
+    import pickle
+
+    status = _status()
+    data = pickle.dumps(status)
+    assert pickle.loads(data) == status
+    assert b"trust_score" not in data
+
+
+def test_timestamps_parse_lazily_to_aware_datetimes():
+    from datetime import datetime, timedelta, timezone
+
+    status = SessionStatus(
+        session_id="sess_1", status="completed", steps={},
+        created_at="2026-01-01T00:00:00Z", completed_at="2026-01-01T02:05:00.5+02:00",
+    )
+    assert "_created_at_parsed" not in vars(status)
+    assert status.created_at == datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert status.created_at is status.created_at
+    assert status.completed_at - status.created_at == timedelta(minutes=5, seconds=0.5)
+    assert status.created_at_epoch == 1767225600
+    assert status.completed_at_epoch == 1767225900
+
+    status.completed_at = None
+    assert status.completed_at is None and status.completed_at_epoch is None
+
+
+def test_timestamp_formats():
+    from datetime import datetime, timezone
+
+    from facevault._timestamps import parse_iso
+
+    expected = datetime(2026, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    assert parse_iso("2026-01-01T12:30:15.123456Z") == expected
+    assert parse_iso("2026-01-01T12:30:15.1234567+00:00") == expected
+    assert parse_iso("2026-01-01 12:30:15.123456") == expected
+    with pytest.raises(ValueError):
+        parse_iso("yesterday")
+
+
+def test_malformed_timestamp_is_kept_as_given():
+    from facevault import InMemorySessionRegistry
+
+    status = SessionStatus(session_id="s", status="in_progress", steps={}, created_at="yesterday")
+    assert status.created_at == "yesterday"
+    assert status.created_at_epoch is None
+    assert "yesterday" in repr(status)
+    assert status == SessionStatus(session_id="s", status="in_progress", steps={}, created_at="yesterday")
+    assert SessionStatus.from_bytes(status.to_bytes()) == status
+
+    with InMemorySessionRegistry() as registry:
+        record = registry.record_status(status)
+    assert record.status == "in_progress"
+
+
+def test_epoch_and_naive_timestamps_are_utc():
+    from datetime import datetime, timezone
+
+    expected = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for value in (1767225600, 1767225600.0, datetime(2026, 1, 1)):
+        status = SessionStatus(session_id="s", status="completed", steps={}, created_at=value)
+        assert status.created_at == expected
+        assert status.created_at.tzinfo is not None
+        assert status.created_at_epoch == 1767225600
+        assert SessionStatus.from_bytes(status.to_bytes()) == status
+    with pytest.raises(TypeError):
+        SessionStatus(session_id="s", status="completed", steps={}, created_at=True)
+
+
+def test_webhook_event_timestamp():
+    event = WebhookEvent(event="verification.completed", session_id="s", status="completed",
+                         completed_at="2026-01-01T00:00:00Z")
+    assert event.completed_at.year == 2026
+    assert event.completed_at_epoch == 1767225600
+    assert WebhookEvent(event="e", session_id="s", status="completed").completed_at_epoch is None
+
+
+def test_timestamps_survive_bytes_and_pickle_unparsed():
+    import pickle
+
+    status = SessionStatus(session_id="s", status="completed", steps={}, created_at="2026-01-01T00:00:00Z")
+    data = status.to_bytes()
+    assert b"2026-01-01T00:00:00Z" in data
+    assert SessionStatus.from_bytes(data) == status
+    assert pickle.loads(pickle.dumps(status)) == status
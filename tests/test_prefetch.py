@@ -0,0 +1,159 @@
+"""Tests for speculative session creation."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from facevault import AsyncFaceVaultClient, DeadlineExceededError, PrefetchPolicy
+
+
+def _transport(calls, delay=0.0, fail=False):
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(delay)
+        if fail:
+            return httpx.Response(500, json={"detail": "boom"})
+        n = len(calls)
+        return httpx.Response(200, json={"session_id": f"sess_{n}", "session_token": f"tok_{n}", "steps": []})
+
+    return httpx.MockTransport(handler)
+
+
+def _client(calls, policy=None, **kwargs):
+    return AsyncFaceVaultClient(
+        "fv_live_test", transport=_transport(calls, **kwargs), prefetch=policy or PrefetchPolicy()
+    )
+
+
+async def test_prefetched_session_is_returned_without_a_request():
+    calls = []
+    async with _client(calls) as client:
+        assert await client.prefetch("user-1") is True
+        assert await client.prefetch("user-1") is True  # already held
+        assert len(calls) == 1
+        assert calls[0].url.params["external_user_id"] == "user-1"
+
+        session = await client.create_session("user-1")
+        assert session.session_id == "sess_1"
+        assert "sid=sess_1" in session.webapp_url
+        assert len(calls) == 1
+
+        # The slot is consumed: the next call goes to the API.
+        assert (await client.create_session("user-1")).session_id == "sess_2"
+    stats = client.stats()
+    assert stats.counter("prefetch_started") == 1
+    assert stats.counter("prefetch_hits") == 1
+    assert stats.counter("prefetch_misses") == 1
+
+
+async def test_prefetch_is_keyed_by_require_poa():
+    calls = []
+    async with _client(calls) as client:
+        await client.prefetch("user-1")
+        session = await client.create_session("user-1", require_poa=True)
+        assert session.session_id == "sess_2"
+        assert calls[1].url.params["require_poa"] == "true"
+
+
+async def test_create_session_waits_for_prefetch_in_flight():
+    calls = []
+    async with _client(calls, delay=0.05) as client:
+        task = asyncio.ensure_future(client.prefetch("user-1"))
+        await asyncio.sleep(0.01)
+        session = await client.create_session("user-1")
+        assert session.session_id == "sess_1"
+        assert len(calls) == 1
+        assert await task is True
+
+
+async def test_create_session_deadline_bounds_wait_for_prefetch():
+    calls = []
+    async with _client(calls, delay=0.2) as client:
+        task = asyncio.ensure_future(client.prefetch("user-1"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(DeadlineExceededError):
+            await client.create_session("user-1", timeout=0.05)
+        await task
+        [unused] = client.unused_prefetches()
+        assert unused.reason == "abandoned"
+        assert unused.session.session_id == "sess_1"
+
+
+async def test_cancelled_wait_for_prefetch_is_recorded():
+    calls = []
+    async with _client(calls, delay=0.1) as client:
+        task = asyncio.ensure_future(client.prefetch("user-1"))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(client.create_session("user-1"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await task
+        [unused] = client.unused_prefetches()
+        assert unused.reason == "abandoned"
+        assert unused.session.session_id == "sess_1"
+
+
+async def test_failed_prefetch_falls_back():
+    calls = []
+    async with _client(calls, fail=True) as client:
+        assert await client.prefetch("user-1") is False
+        assert client.stats().counter("prefetch_failed") == 1
+        with pytest.raises(Exception):
+            await client.create_session("user-1")
+        assert len(calls) == 2
+        assert client.unused_prefetches() == []
+
+
+async def test_expired_and_evicted_sessions_are_reported():
+    calls = []
+    policy = PrefetchPolicy(ttl=0.05, max_entries=2)
+    client = _client(calls, policy)
+    for user in ("a", "b", "c"):
+        await client.prefetch(user)
+    assert [(u.external_user_id, u.reason) for u in client.unused_prefetches()] == [("a", "evicted")]
+
+    await asyncio.sleep(0.06)
+    assert (await client.create_session("b")).session_id == "sess_4"
+    unused = client.unused_prefetches()
+    assert sorted((u.external_user_id, u.reason) for u in unused) == [("b", "expired"), ("c", "expired")]
+    assert all(u.created_at <= time.time() for u in unused)
+    assert client.unused_prefetches() == []
+
+    await client.prefetch("d")
+    await client.close()
+    assert [(u.external_user_id, u.reason) for u in client.unused_prefetches()] == [("d", "closed")]
+    assert client.stats().counter("prefetch_unused") == 4
+
+
+async def test_expiry_does_not_depend_on_start_order():
+    from facevault.metrics import ClientStats
+    from facevault.models import Session
+    from facevault.prefetch import _Prefetcher
+
+    prefetcher = _Prefetcher(PrefetchPolicy(ttl=0.05), ClientStats())
+    slow, fast = prefetcher.begin(("slow", None)), prefetcher.begin(("fast", None))
+    prefetcher.finish(("fast", None), fast, Session("sess_fast", "tok", [], "https://app"))
+    await asyncio.sleep(0.06)
+    # Began first but finished last: still fresh, and ahead of the expired slot.
+    prefetcher.finish(("slow", None), slow, Session("sess_slow", "tok", [], "https://app"))
+
+    assert [(u.external_user_id, u.reason) for u in prefetcher.unused()] == [("fast", "expired")]
+    assert (await prefetcher.take(("slow", None))).session_id == "sess_slow"
+
+
+async def test_prefetch_requires_policy():
+    async with AsyncFaceVaultClient("fv_live_test") as client:
+        with pytest.raises(RuntimeError):
+            await client.prefetch("user-1")
+        assert client.unused_prefetches() == []
+
+
+def test_policy_validation():
+    with pytest.raises(ValueError):
+        PrefetchPolicy(ttl=0)
+    with pytest.raises(ValueError):
+        PrefetchPolicy(max_entries=0)
@@ -0,0 +1,224 @@
+"""Tests for the session registry."""
+
+import threading
+import time
+
+import pytest
+
+from facevault import (
+    AsyncFaceVaultClient,
+    FaceVaultClient,
+    InMemorySessionRegistry,
+    Session,
+    SessionRegistry,
+    SessionStatus,
+    SQLiteSessionRegistry,
+    WebhookEvent,
+)
+from facevault.testing import FakeFaceVault
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def registry(request, tmp_path):
+    if request.param == "memory":
+        reg = InMemorySessionRegistry()
+    else:
+        reg = SQLiteSessionRegistry(str(tmp_path / "sessions.db"))
+    yield reg
+    reg.close()
+
+
+def _session(session_id):
+    return Session(session_id=session_id, session_token="tok", steps=[], webapp_url="https://app")
+
+
+def test_latest_for_user(registry):
+    registry.record_session(_session("s1"), "alice", created_at=100.0)
+    registry.record_session(_session("s2"), "alice", created_at=300.0)
+    registry.record_session(_session("s3"), "alice", created_at=200.0)
+    registry.record_session(_session("s4"), "bob", created_at=400.0)
+
+    assert registry.latest_for_user("alice").session_id == "s2"
+    assert [r.session_id for r in registry.for_user("alice")] == ["s1", "s3", "s2"]
+    assert registry.latest_for_user("carol") is None
+    assert len(registry) == 4
+
+
+def test_status_and_event_updates(registry):
+    registry.record_session(_session("s1"), "alice")
+    registry.record_status(SessionStatus(session_id="s1", status="in_progress", steps={}))
+    assert registry.get("s1").status == "in_progress"
+    assert [r.session_id for r in registry.by_status("in_progress")] == ["s1"]
+    assert registry.by_status("pending") == []
+
+    registry.record_event(WebhookEvent(
+        event="verification.completed",
+        session_id="s1",
+        status="completed",
+        face_match_passed=True,
+        completed_at="2026-01-01T00:00:00Z",
+        trust_score=91.0,
+    ))
+    record = registry.get("s1")
+    assert record.is_terminal
+    assert record.face_match_passed is True
+    assert record.trust_score == 91.0
+    assert record.completed_at == 1767225600.0
+    assert record.external_user_id == "alice"
+
+
+def test_terminal_status_is_not_reopened(registry):
+    registry.record_session(_session("s1"), "alice")
+    registry.record_event(WebhookEvent(event="verification.completed", session_id="s1", status="completed"))
+    # A stale poll result arriving after the webhook.
+    registry.record_status(SessionStatus(session_id="s1", status="in_progress", steps={}))
+    assert registry.get("s1").status == "completed"
+    assert registry.in_progress() == []
+
+
+def test_unknown_session_from_webhook(registry):
+    registry.record_event(WebhookEvent(
+        event="verification.completed", session_id="s9", status="failed", external_user_id="dave",
+    ))
+    assert registry.latest_for_user("dave").status == "failed"
+
+
+def test_in_progress_filters_and_orders_by_staleness(registry):
+    now = time.time()
+    registry.record_session(_session("old"), "a", created_at=now - 3600)
+    registry.record_session(_session("new"), "b", created_at=now)
+    registry.record_session(_session("done"), "c", created_at=now - 3600)
+    registry.record_status(SessionStatus(session_id="done", status="completed", steps={}))
+
+    assert [r.session_id for r in registry.in_progress(older_than=600)] == ["old"]
+    assert {r.session_id for r in registry.in_progress()} == {"old", "new"}
+    # Both were just updated, so nothing is stale yet.
+    assert registry.in_progress(stale_for=60) == []
+    # Touching "old" makes "new" the stalest.
+    registry.record_status(SessionStatus(session_id="old", status="in_progress", steps={}))
+    assert [r.session_id for r in registry.in_progress()] == ["new", "old"]
+    assert len(registry.in_progress(limit=1)) == 1
+
+
+def test_in_progress_by_creation_cutoff(registry):
+    now = time.time()
+    registry.record_session(_session("old1"), "a", created_at=now - 3600)
+    registry.record_session(_session("old2"), "a", created_at=now - 3000)
+    for i in range(20):
+        registry.record_session(_session(f"fresh{i}"), "b", created_at=now)
+    registry.record_status(SessionStatus(session_id="old1", status="in_progress", steps={}))
+
+    # Few sessions pass the creation cutoff; still least recently updated first.
+    assert [r.session_id for r in registry.in_progress(older_than=600)] == ["old2", "old1"]
+    assert [r.session_id for r in registry.in_progress(older_than=600, limit=1)] == ["old2"]
+    assert registry.in_progress(older_than=600, stale_for=60) == []
+
+
+def test_sqlite_in_progress_uses_covering_index(tmp_path):
+    with SQLiteSessionRegistry(str(tmp_path / "sessions.db")) as reg:
+        plan = reg._db.execute(
+            "EXPLAIN QUERY PLAN SELECT session_id FROM facevault_sessions "
+            "WHERE terminal = 0 AND updated_at <= ? AND created_at <= ? ORDER BY updated_at",
+            (0.0, 0.0),
+        ).fetchall()
+    details = " ".join(row[-1] for row in plan)
+    assert "facevault_sessions_open_due" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_record_session_keeps_earlier_creation_time(registry):
+    registry.record_status(SessionStatus(
+        session_id="s1", status="in_progress", steps={}, created_at="2026-01-01T00:00:00Z",
+    ))
+    registry.record_session(_session("s1"), "alice")
+    assert registry.get("s1").created_at == 1767225600.0
+    registry.record_session(_session("s1"), "alice", created_at=1767225500.0)
+    assert registry.get("s1").created_at == 1767225500.0
+
+
+def test_touch_moves_session_to_back_of_queue(registry):
+    now = time.time()
+    for sid in ("s1", "s2"):
+        registry.record_session(_session(sid), "alice", created_at=now - 3600)
+    assert [r.session_id for r in registry.in_progress()] == ["s1", "s2"]
+    registry.touch("s1")
+    assert [r.session_id for r in registry.in_progress()] == ["s2", "s1"]
+    assert registry.get("s1").status == "pending"
+    assert registry.touch("unknown") is None
+
+
+def test_created_between(registry):
+    for i, ts in enumerate((10.0, 20.0, 30.0, 40.0)):
+        registry.record_session(_session(f"s{i}"), "u", created_at=ts)
+    assert [r.session_id for r in registry.created_between(20.0, 40.0)] == ["s1", "s2"]
+
+
+def test_returned_records_are_copies(registry):
+    registry.record_session(_session("s1"), "alice")
+    registry.get("s1").status = "completed"
+    assert registry.get("s1").status == "pending"
+
+
+def test_sqlite_persists_across_instances(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    with SQLiteSessionRegistry(path) as reg:
+        reg.record_session(_session("s1"), "alice")
+    with SQLiteSessionRegistry(path) as reg:
+        assert reg.latest_for_user("alice").session_id == "s1"
+
+
+def test_registry_base_is_abstract():
+    with pytest.raises(TypeError):
+        SessionRegistry()
+
+    class Partial(SessionRegistry):
+        def _load(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_client_records_sessions():
+    fake = FakeFaceVault(progression=("pending", "completed"))
+    registry = InMemorySessionRegistry()
+    client = FaceVaultClient("fv_test_key", transport=fake.transport(), registry=registry)
+
+    session = client.create_session("alice")
+    assert registry.latest_for_user("alice").status == "pending"
+
+    client.get_session(session.session_id)
+    record = registry.get(session.session_id)
+    assert record.status == "completed"
+    assert record.completed_at is not None
+
+
+async def test_async_client_records_sessions():
+    fake = FakeFaceVault(progression=("pending", "completed"))
+    registry = InMemorySessionRegistry()
+    client = AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport(), registry=registry)
+
+    session = await client.create_session("alice")
+    await client.get_session(session.session_id)
+    assert registry.latest_for_user("alice").status == "completed"
+    await client.close()
+
+
+async def test_async_client_writes_registry_off_the_event_loop():
+    class ThreadRecordingRegistry(InMemorySessionRegistry):
+        def __init__(self):
+            super().__init__()
+            self.threads = []
+
+        def _store(self, record):
+            self.threads.append(threading.current_thread())
+            super()._store(record)
+
+    fake = FakeFaceVault(progression=("pending", "completed"))
+    registry = ThreadRecordingRegistry()
+    async with AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport(), registry=registry) as client:
+        session = await client.create_session("alice")
+        await client.get_session(session.session_id)
+
+    assert len(registry.threads) == 2
+    assert threading.current_thread() not in registry.threads
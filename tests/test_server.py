@@ -0,0 +1,198 @@
+"""Tests for the multi-process webhook server."""
+
+import hashlib
+import hmac
+import json
+import os
+import queue
+import re
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from facevault.server import WebhookServer, load_handler
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+SECRET = "whsec_test123"
+
+HANDLER = """
+import json, os
+
+def handle(event):
+    if event.session_id == "boom":
+        raise RuntimeError("handler failed")
+    with open(os.environ["EVENTS_FILE"], "a") as f:
+        f.write(json.dumps({"session_id": event.session_id, "pid": os.getpid()}) + "\\n")
+"""
+
+
+def _signed(payload):
+    body = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode()
+    return body, hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+
+class _Server:
+    """``python -m facevault serve-webhooks`` in a subprocess, with its log lines in a queue."""
+
+    def __init__(self, tmp_path: Path, *args: str):
+        (tmp_path / "hooks.py").write_text(HANDLER)
+        self.events = tmp_path / "events.jsonl"
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(tmp_path), *sys.path]), "EVENTS_FILE": str(self.events)}
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "facevault", "serve-webhooks", "--port", "0", "--secret", SECRET,
+             "--handler", "hooks:handle", *args],
+            env=env, stderr=subprocess.PIPE, text=True, start_new_session=True,
+        )
+        self.lines: queue.Queue = queue.Queue()
+        self._pump_thread = threading.Thread(target=self._pump, daemon=True)
+        self._pump_thread.start()
+        self.url = "http://127.0.0.1:%s/" % self.wait_for(r"Listening on http://127\.0\.0\.1:(\d+)").group(1)
+
+    def _pump(self):
+        for line in self.process.stderr:
+            self.lines.put(line)
+
+    def wait_for(self, pattern, count=1, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        match = None
+        while count:
+            line = self.lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            match = re.search(pattern, line)
+            count -= match is not None
+        return match
+
+    def post(self, payload, signature=None, **kwargs):
+        body, valid = _signed(payload)
+        return httpx.post(self.url, content=body, headers={"X-Signature": signature or valid}, **kwargs)
+
+    def stop(self):
+        if self.process.poll() is None:
+            self.process.send_signal(signal.SIGTERM)
+        return self.process.wait(timeout=10)
+
+    def close(self):
+        if self.process.poll() is None:
+            os.killpg(self.process.pid, signal.SIGKILL)  # the workers too
+            self.process.wait()
+        self._pump_thread.join(timeout=10)
+        self.process.stderr.close()
+
+    def raw(self, request):
+        """Send raw bytes and return everything the server answers before closing."""
+        host, port = self.url[len("http://"):-1].split(":")
+        with socket.create_connection((host, int(port)), timeout=10) as sock:
+            sock.sendall(request)
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    return b"".join(chunks)
+                chunks.append(chunk)
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = _Server(tmp_path, "--workers", "2", "--max-body-size", "4096")
+    yield server
+    server.close()
+
+
+def test_load_handler():
+    assert load_handler("json:dumps") is json.dumps
+    assert load_handler("os.path:join") is os.path.join
+    with pytest.raises(ValueError):
+        load_handler("json.dumps")
+    with pytest.raises(TypeError):
+        load_handler("json:__doc__")
+    with pytest.raises(TypeError, match="async"):
+        load_handler("asyncio:sleep")
+
+
+def test_async_handlers_are_rejected():
+    async def handle(event):
+        pass
+
+    class AsyncCallable:
+        async def __call__(self, event):
+            pass
+
+    for handler in (handle, AsyncCallable()):
+        with pytest.raises(TypeError, match="async"):
+            WebhookServer(handler, SECRET)
+
+
+def test_server_validates_configuration():
+    with pytest.raises(ValueError, match="secret"):
+        WebhookServer(print, "")
+    with pytest.raises(ImportError):
+        WebhookServer("no_such_module_here:handle", SECRET)
+
+
+def test_serves_and_dispatches(server):
+    for i in range(10):
+        response = server.post({"event": "verification.completed", "session_id": f"sess_{i}", "status": "completed"})
+        assert response.status_code == 200
+    events = [json.loads(line) for line in server.events.read_text().splitlines()]
+    assert sorted(e["session_id"] for e in events) == sorted(f"sess_{i}" for i in range(10))
+
+    assert server.post({"session_id": "sess_x"}, signature="0" * 64).status_code == 401
+    assert server.post({"session_id": "boom"}).status_code == 500
+    assert server.post({"session_id": "big", "poa": "x" * 5000}).status_code == 413
+    assert httpx.post(server.url + "elsewhere", content=b"{}").status_code == 404
+
+    server.process.send_signal(signal.SIGUSR1)
+    stats = [json.loads(server.wait_for(r"worker stats (.*)").group(1)) for _ in range(2)]
+    assert sum(s["received"] for s in stats) == 13
+    assert sum(s["accepted"] for s in stats) == 10
+    assert sum(s["too_large"] for s in stats) == 1
+    assert {s["generation"] for s in stats} == {0}
+    assert server.stop() == 0
+
+
+def test_graceful_reload(server):
+    assert server.post({"session_id": "before"}).status_code == 200
+    server.process.send_signal(signal.SIGHUP)
+    server.wait_for(r"generation 0\) exited", count=2)
+
+    assert server.post({"session_id": "after"}).status_code == 200
+    pids = {e["session_id"]: e["pid"] for e in map(json.loads, server.events.read_text().splitlines())}
+    assert pids["before"] != pids["after"]
+    assert server.stop() == 0
+
+
+def test_crashed_worker_is_restarted(server):
+    pid = int(server.wait_for(r"Booted worker (\d+)").group(1))
+    os.kill(pid, signal.SIGKILL)
+    server.wait_for(r"exited unexpectedly")
+    server.wait_for(r"Booted worker")
+    for i in range(4):
+        assert server.post({"session_id": f"s{i}"}).status_code == 200
+    assert server.stop() == 0
+
+
+def test_chunked_bodies(server):
+    body, signature = _signed({"session_id": "chunked", "status": "completed"})
+    with httpx.Client() as client:
+        for _ in range(2):  # the second request reuses the connection
+            response = client.post(
+                server.url, content=iter([body[:10], body[10:]]), headers={"X-Signature": signature}
+            )
+            assert response.status_code == 200
+    sessions = [json.loads(line)["session_id"] for line in server.events.read_text().splitlines()]
+    assert sessions == ["chunked", "chunked"]
+
+    malformed = server.raw(
+        b"POST / HTTP/1.1\r\nHost: x\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n{}\r\n0\r\n\r\n"
+    )
+    assert malformed.startswith(b"HTTP/1.1 400 ")
+    unsupported = server.raw(b"POST / HTTP/1.1\r\nHost: x\r\nTransfer-Encoding: gzip\r\n\r\nxxxx")
+    assert unsupported.startswith(b"HTTP/1.1 411 ")
+    assert server.stop() == 0
@@ -0,0 +1,217 @@
+"""Tests for the reconciliation sweeper."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+import respx
+
+from facevault import (
+    AsyncFaceVaultClient,
+    AsyncSweeper,
+    CircuitBreaker,
+    FaceVaultClient,
+    InMemorySessionRegistry,
+    Session,
+    Sweeper,
+)
+from facevault.testing import FakeFaceVault
+
+
+@pytest.fixture
+def registry():
+    with InMemorySessionRegistry() as reg:
+        yield reg
+
+
+def _stuck_sessions(client, registry, n):
+    """Create n sessions and backdate them so they look stuck."""
+    ids = [client.create_session(f"user-{i}").session_id for i in range(n)]
+    for i, sid in enumerate(ids):
+        record = registry.get(sid)
+        record.created_at = record.updated_at = time.time() - 3600 + i
+        registry._store(record)
+    return ids
+
+
+def test_sweep_refreshes_stalest_first_and_reports_changes(registry):
+    fake = FakeFaceVault(progression=("pending", "completed"))
+    with FaceVaultClient("fv_test_key", transport=fake.transport(), registry=registry) as client:
+        ids = _stuck_sessions(client, registry, 5)
+        seen = []
+
+        sweeper = Sweeper(client, registry=registry, on_change=seen.append, batch_size=2, rate_limit=None)
+        changes = sweeper.sweep_once()
+
+        assert [c.session_id for c in changes] == ids
+        assert all(c.old_status == "pending" and c.new_status == "completed" for c in changes)
+        assert seen == changes
+        assert registry.in_progress() == []
+        assert client.stats().counter("sweeper_changes") == 5
+
+        # Nothing left to do on the next pass.
+        assert sweeper.sweep_once() == []
+
+
+def test_unchanged_sessions_are_not_reported(registry):
+    fake = FakeFaceVault(progression=("pending", "in_progress", "completed"), polls_per_step=100)
+    with FaceVaultClient("fv_test_key", transport=fake.transport(), registry=registry) as client:
+        _stuck_sessions(client, registry, 3)
+
+        changes = Sweeper(client, registry=registry, rate_limit=None).sweep_once()
+        assert changes == []
+        assert client.stats().counter("sweeper_refreshed") == 3
+
+
+def test_recently_refreshed_sessions_are_skipped(registry):
+    fake = FakeFaceVault(progression=("pending", "in_progress", "completed"), polls_per_step=100)
+    with FaceVaultClient("fv_test_key", transport=fake.transport(), registry=registry) as client:
+        _stuck_sessions(client, registry, 3)
+
+        sweeper = Sweeper(client, registry=registry, rate_limit=None, stale_for=60)
+        sweeper.sweep_once()
+        requests = fake.request_count
+        sweeper.sweep_once()
+        assert fake.request_count == requests
+
+
+def test_source_and_rate_limit():
+    fake = FakeFaceVault(progression=("pending", "completed"))
+    with FaceVaultClient("fv_test_key", transport=fake.transport()) as client:
+        ids = [client.create_session(f"user-{i}").session_id for i in range(4)]
+
+        sweeper = Sweeper(client, source=lambda: [(sid, "pending") for sid in ids], batch_size=2, rate_limit=20)
+        start = time.monotonic()
+        changes = sweeper.sweep_once()
+        assert len(changes) == 4
+        # Two batches of two at 20/s: at least 0.1s per batch.
+        assert time.monotonic() - start >= 0.18
+
+
+@respx.mock
+def test_errors_are_counted_and_skipped():
+    respx.get("https://api.facevault.id/api/v1/sessions/gone").mock(
+        return_value=httpx.Response(404, json={"detail": "Session not found"})
+    )
+    respx.get("https://api.facevault.id/api/v1/sessions/broken").mock(
+        return_value=httpx.Response(500, json={})
+    )
+    with FaceVaultClient("fv_live_test") as client:
+        sweeper = Sweeper(client, source=lambda: [("gone", "pending"), ("broken", "pending")], rate_limit=None)
+        assert sweeper.sweep_once() == []
+        assert client.stats().counter("sweeper_not_found") == 1
+        assert client.stats().counter("sweeper_errors") == 1
+
+
+def _broken_and_healthy(registry, broken):
+    """Register ``broken`` stuck sessions that 404 or fail, then one healthy one, stalest first."""
+    ids = [f"broken{i}" for i in range(broken)] + ["healthy"]
+    for i, sid in enumerate(ids):
+        registry.record_session(Session(session_id=sid, session_token="t", steps=[], webapp_url=""), "u")
+        record = registry.get(sid)
+        record.created_at = record.updated_at = time.time() - 3600 + i
+        registry._store(record)
+    for i in range(broken):
+        respx.get(f"https://api.facevault.id/api/v1/sessions/broken{i}").mock(
+            return_value=httpx.Response(404 if i % 2 else 500, json={})
+        )
+    respx.get("https://api.facevault.id/api/v1/sessions/healthy").mock(
+        return_value=httpx.Response(200, json={"session_id": "healthy", "status": "completed", "steps": {}})
+    )
+
+
+@respx.mock
+def test_failing_sessions_do_not_starve_healthy_ones(registry):
+    _broken_and_healthy(registry, 3)
+    with FaceVaultClient("fv_live_test") as client:
+        sweeper = Sweeper(client, registry=registry, rate_limit=None, max_per_sweep=3, stale_for=60)
+        assert sweeper.sweep_once() == []
+        changes = sweeper.sweep_once()
+    assert [c.session_id for c in changes] == ["healthy"]
+    # The broken sessions wait out stale_for before their next attempt.
+    assert sweeper.sweep_once() == []
+    assert {r.session_id for r in registry.in_progress()} == {"broken0", "broken1", "broken2"}
+
+
+@respx.mock
+async def test_async_failing_sessions_do_not_starve_healthy_ones(registry):
+    _broken_and_healthy(registry, 3)
+    async with AsyncFaceVaultClient("fv_live_test") as client:
+        sweeper = AsyncSweeper(client, registry=registry, rate_limit=None, max_per_sweep=3, stale_for=60)
+        assert await sweeper.sweep_once() == []
+        changes = await sweeper.sweep_once()
+    assert [c.session_id for c in changes] == ["healthy"]
+
+
+@respx.mock
+def test_open_circuit_ends_sweep():
+    route = respx.get(url__startswith="https://api.facevault.id/api/v1/sessions/").mock(
+        return_value=httpx.Response(503, json={})
+    )
+    source = [(f"s{i}", "pending") for i in range(10)]
+    with FaceVaultClient("fv_live_test", circuit_breaker=CircuitBreaker(failure_threshold=1)) as client:
+        Sweeper(client, source=lambda: source, batch_size=2, rate_limit=None).sweep_once()
+    assert route.call_count < 10
+
+
+def test_requires_exactly_one_candidate_source(registry):
+    with FaceVaultClient("fv_live_test") as client:
+        with pytest.raises(ValueError):
+            Sweeper(client)
+        with pytest.raises(ValueError):
+            Sweeper(client, registry=registry, source=lambda: [])
+
+
+def test_background_thread(registry):
+    fake = FakeFaceVault(progression=("pending", "completed"))
+    with FaceVaultClient("fv_test_key", transport=fake.transport(), registry=registry) as client:
+        _stuck_sessions(client, registry, 3)
+
+        with Sweeper(client, registry=registry, interval=0.01, rate_limit=None):
+            deadline = time.monotonic() + 2
+            while registry.in_progress() and time.monotonic() < deadline:
+                time.sleep(0.01)
+    assert registry.in_progress() == []
+
+
+async def test_async_sweeper(registry):
+    fake = FakeFaceVault(progression=("pending", "completed"))
+    async with AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport(), registry=registry) as client:
+        for i in range(3):
+            session = await client.create_session(f"user-{i}")
+            record = registry.get(session.session_id)
+            record.created_at = record.updated_at = time.time() - 3600
+            registry._store(record)
+
+        changes = []
+        async with AsyncSweeper(client, registry=registry, on_change=changes.append, interval=0.01, rate_limit=None):
+            for _ in range(200):
+                if len(changes) == 3:
+                    break
+                await asyncio.sleep(0.01)
+    assert len(changes) == 3
+    assert registry.in_progress() == []
+
+
+async def test_async_sweeper_start_and_stop(registry):
+    import anyio
+
+    fake = FakeFaceVault(progression=("pending", "completed"))
+    async with AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport(), registry=registry) as client:
+        session = await client.create_session("user-1")
+        record = registry.get(session.session_id)
+        record.created_at = record.updated_at = time.time() - 3600
+        registry._store(record)
+
+        changes = []
+        sweeper = AsyncSweeper(client, registry=registry, on_change=changes.append, interval=0.01, rate_limit=None)
+        async with anyio.create_task_group() as tasks:
+            sweeper.start(tasks)
+            sweeper.start(tasks)  # already running
+            with anyio.move_on_after(2):
+                while not changes:
+                    await anyio.sleep(0.01)
+            await sweeper.stop()
+        await sweeper.stop()  # already stopped
+    assert len(changes) == 1
@@ -0,0 +1,98 @@
+"""Tests for the in-process FaceVault simulator."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from facevault import AsyncFaceVaultClient, AuthError, FaceVaultClient, FaceVaultError, RateLimitError
+from facevault import parse_event, verify_signature
+from facevault.testing import FakeFaceVault, fixed, lognormal
+
+
+def test_create_and_progress_session():
+    fake = FakeFaceVault(seed=1)
+    client = FaceVaultClient("fv_test_key", transport=fake.transport())
+
+    session = client.create_session("user-1", require_poa=True)
+    assert session.steps == ["liveness", "document", "poa"]
+    assert fake.sessions[session.session_id].external_user_id == "user-1"
+
+    statuses = [client.get_session(session.session_id).status for _ in range(3)]
+    assert statuses == ["in_progress", "completed", "completed"]
+
+    final = client.get_session(session.session_id)
+    assert final.trust_decision == "accept"
+    assert final.steps == {"liveness": True, "document": True, "poa": True}
+    client.close()
+
+
+def test_terminal_status_emits_signed_webhook():
+    received = []
+    fake = FakeFaceVault(seed=1, polls_per_step=2, pass_rate=0.0, on_webhook=lambda b, h: received.append((b, h)))
+    client = FaceVaultClient("fv_test_key", transport=fake.transport())
+    session = client.create_session("user-7")
+
+    fake.complete(session.session_id)
+
+    [(body, headers)] = received
+    assert verify_signature(body, headers["X-Signature"], "whsec_test")
+    event = parse_event(body)
+    assert event.session_id == session.session_id
+    assert event.external_user_id == "user-7"
+    assert event.trust_decision == "reject"
+    assert client.get_session(session.session_id).face_match_passed is False
+    client.close()
+
+
+def test_error_injection():
+    client = FaceVaultClient("fv_test_key", transport=FakeFaceVault(rate_limit_rate=1.0).transport())
+    with pytest.raises(RateLimitError):
+        client.create_session("user-1")
+
+    client = FaceVaultClient("fv_test_key", transport=FakeFaceVault(error_rate=1.0).transport())
+    with pytest.raises(FaceVaultError) as exc_info:
+        client.create_session("user-1")
+    assert exc_info.value.status_code in (500, 503)
+
+
+def test_api_key_check():
+    fake = FakeFaceVault(api_key="fv_test_right")
+    client = FaceVaultClient("fv_test_wrong", transport=fake.transport())
+    with pytest.raises(AuthError):
+        client.create_session("user-1")
+
+
+def test_latency_distributions_are_seeded():
+    import random
+
+    dist = lognormal(0.05, 0.5)
+    a = [dist(random.Random(3)) for _ in range(3)]
+    b = [dist(random.Random(3)) for _ in range(3)]
+    assert a == b
+    assert fixed(0.2)(random.Random()) == 0.2
+
+
+@pytest.mark.asyncio
+async def test_async_transport_concurrency():
+    fake = FakeFaceVault(latency=0.05, seed=2)
+    async with AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport()) as client:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        sessions = await asyncio.gather(*(client.create_session(f"user-{i}") for i in range(20)))
+        elapsed = loop.time() - start
+
+    assert len({s.session_id for s in sessions}) == 20
+    assert elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_asgi_app():
+    fake = FakeFaceVault(seed=4)
+    transport = httpx.ASGITransport(app=fake)
+    async with AsyncFaceVaultClient("fv_test_key", base_url="https://fake.test", transport=transport) as client:
+        session = await client.create_session("user-1")
+        status = await client.get_session(session.session_id)
+
+    assert status.status == "in_progress"
+    assert fake.request_count == 2
@@ -0,0 +1,152 @@
+"""Tests for tracing spans and traceparent propagation."""
+
+import httpx
+import pytest
+import respx
+
+from facevault import AsyncFaceVaultClient, FaceVaultClient, NotFoundError
+from facevault.tracing import InMemoryExporter, SpanExporter, Tracer, current_span
+
+
+BASE_URL = "https://api.facevault.id"
+
+
+def _session_response():
+    return httpx.Response(200, json={"session_id": "sess_1", "session_token": "tok_1", "steps": []})
+
+
+@respx.mock
+def test_span_per_call_with_attempt_child():
+    route = respx.post(f"{BASE_URL}/api/v1/sessions").mock(return_value=_session_response())
+    exporter = InMemoryExporter()
+
+    client = FaceVaultClient("fv_live_test", tracer=Tracer(exporter))
+    client.create_session("user-1")
+
+    attempt, call = exporter.spans
+    assert call.name == "facevault.create_session"
+    assert call.parent_span_id is None
+    assert call.status == "ok"
+    assert call.attributes["http.response.status_code"] == 200
+    assert attempt.name == "HTTP POST"
+    assert attempt.trace_id == call.trace_id
+    assert attempt.parent_span_id == call.span_id
+    assert attempt.attributes["facevault.attempt"] == 0
+
+    traceparent = route.calls[0].request.headers["traceparent"]
+    assert traceparent == f"00-{attempt.trace_id}-{attempt.span_id}-01"
+    client.close()
+
+
+@respx.mock
+def test_calls_join_the_current_trace():
+    respx.post(f"{BASE_URL}/api/v1/sessions").mock(return_value=_session_response())
+    exporter = InMemoryExporter()
+    tracer = Tracer(exporter)
+
+    client = FaceVaultClient("fv_live_test", tracer=tracer)
+    with tracer.start_span("handle_update") as handler:
+        client.create_session("user-1")
+        assert current_span() is handler
+    assert current_span() is None
+
+    call = next(s for s in exporter.spans if s.name == "facevault.create_session")
+    assert call.trace_id == handler.trace_id
+    assert call.parent_span_id == handler.span_id
+    client.close()
+
+
+def test_incoming_traceparent_as_parent():
+    tracer = Tracer()
+    span = tracer.start_span("child", parent="00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01")
+
+    assert span.trace_id == "0af7651916cd43dd8448eb211c80319c"
+    assert span.parent_span_id == "b7ad6b7169203331"
+    with pytest.raises(ValueError):
+        tracer.start_span("bad", parent="not-a-traceparent")
+
+
+@respx.mock
+def test_no_traceparent_without_tracer():
+    route = respx.post(f"{BASE_URL}/api/v1/sessions").mock(return_value=_session_response())
+
+    client = FaceVaultClient("fv_live_test")
+    client.create_session("user-1")
+
+    assert "traceparent" not in route.calls[0].request.headers
+    client.close()
+
+
+@respx.mock
+def test_error_marks_span():
+    respx.get(f"{BASE_URL}/api/v1/sessions/nope").mock(
+        return_value=httpx.Response(404, json={"detail": "Not found"})
+    )
+    respx.get(f"{BASE_URL}/api/v1/sessions/down").mock(side_effect=httpx.ConnectError("refused"))
+    exporter = InMemoryExporter()
+
+    client = FaceVaultClient("fv_live_test", tracer=Tracer(exporter))
+    with pytest.raises(NotFoundError):
+        client.get_session("nope")
+    assert exporter.spans[-1].status == "error"
+
+    exporter.clear()
+    with pytest.raises(httpx.ConnectError):
+        client.get_session("down")
+    attempt, call = exporter.spans
+    assert isinstance(attempt.exception, httpx.ConnectError)
+    assert isinstance(call.exception, httpx.ConnectError)
+    client.close()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_async_client_spans():
+    route = respx.get(f"{BASE_URL}/api/v1/sessions/sess_1").mock(
+        return_value=httpx.Response(200, json={"session_id": "sess_1", "status": "pending", "steps": {}})
+    )
+    exporter = InMemoryExporter()
+
+    async with AsyncFaceVaultClient("fv_live_test", tracer=Tracer(exporter)) as client:
+        await client.get_session("sess_1")
+
+    attempt, call = exporter.spans
+    assert call.name == "facevault.get_session"
+    assert attempt.parent_span_id == call.span_id
+    assert route.calls[0].request.headers["traceparent"].startswith(f"00-{call.trace_id}-")
+
+
+def test_span_exporter_requires_export():
+    with pytest.raises(TypeError):
+        SpanExporter()
+
+    class Incomplete(SpanExporter):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@respx.mock
+def test_opentelemetry_tracer():
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    from facevault.tracing import OpenTelemetryTracer
+
+    route = respx.post(f"{BASE_URL}/api/v1/sessions").mock(return_value=_session_response())
+    otel_exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(otel_exporter))
+
+    client = FaceVaultClient("fv_live_test", tracer=OpenTelemetryTracer(provider))
+    client.create_session("user-1")
+
+    attempt, call = otel_exporter.get_finished_spans()
+    assert call.name == "facevault.create_session"
+    assert attempt.parent.span_id == call.context.span_id
+    traceparent = route.calls[0].request.headers["traceparent"]
+    assert format(attempt.context.span_id, "016x") in traceparent
+    client.close()
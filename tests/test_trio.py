@@ -0,0 +1,234 @@
+"""The async client and its concurrency features running natively under trio."""
+
+import io
+import json
+import time
+
+import httpx
+import pytest
+
+trio = pytest.importorskip("trio")
+
+from facevault import (  # noqa: E402
+    AsyncFaceVaultClient,
+    AsyncSweeper,
+    DeadlineExceededError,
+    EventBatcher,
+    EventBus,
+    FaceVaultBridge,
+    InMemorySessionRegistry,
+    PrefetchPolicy,
+    WebhookEvent,
+)
+from facevault.export import export_sessions  # noqa: E402
+from facevault.hedging import HedgePolicy  # noqa: E402
+from facevault.lanes import BATCH, LanePolicy  # noqa: E402
+from facevault.testing import FakeFaceVault  # noqa: E402
+
+
+def _status_transport(delays, calls):
+    async def handler(request):
+        index = len(calls)
+        calls.append(request)
+        await trio.sleep(delays[index] if index < len(delays) else 0)
+        return httpx.Response(200, json={"session_id": "sess_1", "status": f"attempt-{index}", "steps": {}})
+
+    return httpx.MockTransport(handler)
+
+
+def test_create_and_get_session():
+    fake = FakeFaceVault()
+
+    async def main():
+        async with AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport()) as client:
+            session = await client.create_session("user-1")
+            status = await client.get_session(session.session_id)
+        assert status.session_id == session.session_id
+
+    trio.run(main)
+
+
+def test_deadline():
+    async def handler(request):
+        await trio.sleep(1)
+        return httpx.Response(200, json={"session_id": "sess_1", "status": "pending", "steps": {}})
+
+    async def main():
+        async with AsyncFaceVaultClient("fv_live_test", transport=httpx.MockTransport(handler)) as client:
+            start = trio.current_time()
+            with pytest.raises(DeadlineExceededError):
+                await client.get_session("sess_1", timeout=0.05)
+            assert trio.current_time() - start < 0.5
+            assert client.stats().counter("deadline_exceeded") == 1
+
+    trio.run(main)
+
+
+def test_hedged_request_cancels_loser():
+    calls = []
+    policy = HedgePolicy(initial_delay=0.05, budget=1.0)
+
+    async def main():
+        transport = _status_transport([1.0, 0.0], calls)
+        async with AsyncFaceVaultClient("fv_live_test", transport=transport, hedge=policy) as client:
+            start = trio.current_time()
+            status = await client.get_session("sess_1")
+            assert trio.current_time() - start < 0.5
+        assert status.status == "attempt-1"
+        assert client.stats().counter("hedges_won") == 1
+
+    trio.run(main)
+
+
+def test_lanes_bound_concurrency():
+    active = []
+    peak = []
+
+    async def handler(request):
+        active.append(1)
+        peak.append(len(active))
+        await trio.sleep(0.01)
+        active.pop()
+        return httpx.Response(200, json={"session_id": "s", "status": "pending", "steps": {}})
+
+    lanes = LanePolicy(max_concurrency=4, batch_concurrency=2)
+
+    async def main():
+        async with AsyncFaceVaultClient("fv_live_test", transport=httpx.MockTransport(handler), lanes=lanes) as client:
+            async with trio.open_nursery() as nursery:
+                for i in range(10):
+                    nursery.start_soon(lambda i=i: client.get_session(f"b{i}", priority=BATCH))
+
+    trio.run(main)
+    assert len(peak) == 10
+    assert max(peak) == 2
+
+
+def test_sweeper():
+    fake = FakeFaceVault(progression=("pending", "completed"))
+    registry = InMemorySessionRegistry()
+    changes = []
+
+    async def main():
+        client = AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport(), registry=registry)
+        for i in range(3):
+            session = await client.create_session(f"user-{i}")
+            record = registry.get(session.session_id)
+            record.created_at = record.updated_at = time.time() - 3600
+            registry._store(record)
+
+        async with AsyncSweeper(client, registry=registry, on_change=changes.append, interval=0.01, rate_limit=None):
+            with trio.move_on_after(2):
+                while len(changes) < 3:
+                    await trio.sleep(0.01)
+        await client.close()
+
+    trio.run(main)
+    assert len(changes) == 3
+    assert registry.in_progress() == []
+
+
+def test_sweeper_start_and_stop_in_nursery():
+    fake = FakeFaceVault(progression=("pending", "completed"))
+    registry = InMemorySessionRegistry()
+    changes = []
+
+    async def main():
+        client = AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport(), registry=registry)
+        session = await client.create_session("user-1")
+        record = registry.get(session.session_id)
+        record.created_at = record.updated_at = time.time() - 3600
+        registry._store(record)
+
+        sweeper = AsyncSweeper(client, registry=registry, on_change=changes.append, interval=0.01, rate_limit=None)
+        async with trio.open_nursery() as nursery:
+            sweeper.start(nursery)
+            with trio.move_on_after(2):
+                while not changes:
+                    await trio.sleep(0.01)
+            await sweeper.stop()
+        await client.close()
+
+    trio.run(main)
+    assert len(changes) == 1
+
+
+def test_export():
+    fake = FakeFaceVault()
+    output = io.BytesIO()
+
+    async def main():
+        async with AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport()) as client:
+            ids = [(await client.create_session(f"user-{i}")).session_id for i in range(20)]
+            await export_sessions(client, ids, output, concurrency=4)
+        return ids
+
+    ids = trio.run(main)
+    assert [json.loads(line)["session_id"] for line in output.getvalue().splitlines()] == ids
+
+
+def test_bridge_on_trio():
+    fake = FakeFaceVault()
+    bridge = FaceVaultBridge("fv_test_key", transport=fake.transport(), async_transport=fake.async_transport())
+
+    async def main():
+        session = await bridge.create_session("user-1")
+        # A sync call from a worker thread is routed back onto the trio run.
+        status = await trio.to_thread.run_sync(bridge.get_session, session.session_id)
+        await bridge.aclose()
+        return session, status
+
+    session, status = trio.run(main)
+    assert status.session_id == session.session_id
+    assert bridge.pool_stats()["submitted"] == 0
+    bridge.close()
+
+
+def test_prefetch():
+    fake = FakeFaceVault()
+
+    async def main():
+        client = AsyncFaceVaultClient("fv_test_key", transport=fake.async_transport(), prefetch=PrefetchPolicy())
+        assert await client.prefetch("user-1") is True
+        session = await client.create_session("user-1")
+        await client.close()
+        assert client.stats().counter("prefetch_hits") == 1
+        return session
+
+    assert trio.run(main).session_id
+
+
+def test_event_bus():
+    async def main():
+        bus = EventBus()
+        subscriptions = [bus.subscribe("audit", max_buffer=1, overflow="spill"), bus.subscribe("notifier")]
+        received = {}
+
+        async def consume(subscription):
+            received[subscription.name] = [event.session_id async for event in subscription]
+
+        async with trio.open_nursery() as nursery:
+            for subscription in subscriptions:
+                nursery.start_soon(consume, subscription)
+            for i in range(5):
+                await bus.publish(WebhookEvent(event="verification.completed", session_id=f"s{i}", status="completed"))
+            bus.close()
+        return received
+
+    assert trio.run(main) == {name: [f"s{i}" for i in range(5)] for name in ("audit", "notifier")}
+
+
+def test_event_batcher():
+    batches = []
+
+    async def sink(events):
+        batches.append([event.session_id for event in events])
+
+    async def main():
+        async with EventBatcher(sink, max_size=2, max_age=0.01) as batcher:
+            for i in range(3):
+                await batcher.add(WebhookEvent(event="verification.completed", session_id=f"s{i}", status="completed"))
+            await trio.sleep(0.1)
+
+    trio.run(main)
+    assert batches == [["s0", "s1"], ["s2"]]
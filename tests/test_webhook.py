@@ -2,11 +2,13 @@
 
 import hashlib
 import hmac
+import io
 import json
+from datetime import datetime, timezone
 
 import pytest
 
-from facevault import verify_signature, parse_event
+from facevault import PayloadTooLargeError, StreamingVerifier, parse_event, verify_many, verify_signature
 
 
 def _make_signature(payload: dict, secret: str) -> str:
@@ -102,7 +104,7 @@ def test_parse_event_full():
     assert event.anti_spoofing_score == 0.88
     assert event.anti_spoofing_passed is True
     assert event.confirmed_data == {"full_name": "John Doe"}
-    assert event.completed_at == "2026-01-01T00:00:00Z"
+    assert event.completed_at == datetime(2026, 1, 1, tzinfo=timezone.utc)
     assert event.document_check == {"mrz_valid": True}
     assert event.trust_score == 85.0
     assert event.trust_decision == "accept"
@@ -119,3 +121,176 @@ def test_parse_event_bytes():
 def test_parse_event_invalid_json():
     with pytest.raises(ValueError):
         parse_event("not json")
+
+
+# ── Streaming verification ────────────────────────────────
+
+
+def _canonical(payload: dict) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), sort_keys=True).encode()
+
+
+def _chunks(body: bytes, size: int = 7):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+_PAYLOAD = {
+    "event": "session.completed",
+    "session_id": "sess_1",
+    "status": "completed",
+    "confirmed_data": {"full_name": "John Doe"},
+}
+
+
+@pytest.mark.parametrize("content_length", [None, "exact"])
+def test_streaming_canonical_body(content_length):
+    body = _canonical(_PAYLOAD)
+    sig = _make_signature(_PAYLOAD, "whsec_test123")
+    verifier = StreamingVerifier(
+        sig, "whsec_test123", content_length=len(body) if content_length else None
+    )
+    for chunk in _chunks(body):
+        verifier.update(chunk)
+
+    assert verifier.verify() is True
+    assert verifier.size == len(body)
+    assert bytes(verifier.body) == body
+    assert verifier.event().confirmed_data == {"full_name": "John Doe"}
+
+
+def test_streaming_falls_back_to_canonical_form():
+    body = json.dumps(_PAYLOAD, indent=2).encode()
+    verifier = StreamingVerifier(_make_signature(_PAYLOAD, "whsec_test123"), "whsec_test123")
+    for chunk in _chunks(body):
+        verifier.update(bytearray(chunk))
+
+    assert verifier.verify() is True
+
+
+def test_streaming_rejects_bad_signature():
+    verifier = StreamingVerifier(_make_signature(_PAYLOAD, "other"), "whsec_test123")
+    verifier.update(_canonical(_PAYLOAD))
+    assert verifier.verify() is False
+    assert StreamingVerifier("", "whsec_test123").verify() is False
+
+
+def test_streaming_size_limit():
+    with pytest.raises(PayloadTooLargeError):
+        StreamingVerifier("sig", "secret", max_body_size=10, content_length=11)
+
+    verifier = StreamingVerifier("sig", "secret", max_body_size=10)
+    verifier.update(b"x" * 6)
+    with pytest.raises(PayloadTooLargeError) as excinfo:
+        verifier.update(b"x" * 6)
+    assert isinstance(excinfo.value, ValueError)
+    assert excinfo.value.max_body_size == 10
+
+
+def test_streaming_body_longer_than_declared():
+    verifier = StreamingVerifier("sig", "secret", content_length=4)
+    with pytest.raises(ValueError, match="declared length"):
+        verifier.update(b"12345")
+
+
+def test_streaming_declared_length_reserves_no_memory():
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        verifier = StreamingVerifier("sig", "secret", max_body_size=1 << 30, content_length=256 << 20)
+        verifier.update(b"x" * 100)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 1 << 20
+    assert verifier.body == b"x" * 100
+
+
+async def test_streaming_from_asgi():
+    body = _canonical(_PAYLOAD)
+    messages = [{"type": "http.request", "body": chunk, "more_body": True} for chunk in _chunks(body)]
+    messages.append({"type": "http.request", "body": b"", "more_body": False})
+    scope = {"type": "http", "headers": [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"x-signature", _make_signature(_PAYLOAD, "whsec_test123").encode()),
+    ]}
+
+    async def receive():
+        return messages.pop(0)
+
+    verifier = await StreamingVerifier.from_asgi(scope, receive, "whsec_test123")
+    assert verifier.verify() is True
+    assert verifier.event().session_id == "sess_1"
+
+
+async def test_streaming_from_asgi_rejects_declared_oversize():
+    scope = {"type": "http", "headers": [(b"content-length", b"1000")]}
+
+    async def receive():
+        raise AssertionError("body should not be read")
+
+    with pytest.raises(PayloadTooLargeError):
+        await StreamingVerifier.from_asgi(scope, receive, "secret", max_body_size=100)
+
+
+def test_streaming_from_wsgi():
+    body = _canonical(_PAYLOAD)
+    environ = {
+        "CONTENT_LENGTH": str(len(body)),
+        "HTTP_X_SIGNATURE": _make_signature(_PAYLOAD, "whsec_test123"),
+        "wsgi.input": io.BytesIO(body + b"trailing bytes are not read"),
+    }
+    verifier = StreamingVerifier.from_wsgi(environ, "whsec_test123")
+    assert verifier.verify() is True
+    assert bytes(verifier.body) == body
+
+
+# ── Batch verification ────────────────────────────────────
+
+
+def _batch():
+    secret = "whsec_test123"
+    items, expected = [], []
+    for i in range(40):
+        payload = {"event": "session.completed", "session_id": f"sess_{i}", "poa": {"lines": ["x" * 64] * (i * 10)}}
+        signature = _make_signature(payload, secret)
+        if i % 4 == 0:
+            items.append((_canonical(payload), signature))
+            expected.append(True)
+        elif i % 4 == 1:
+            items.append((json.dumps(payload, indent=2), signature))  # non-canonical str body
+            expected.append(True)
+        elif i % 4 == 2:
+            items.append((_canonical(payload), _make_signature(payload, "other")))
+            expected.append(False)
+        else:
+            items.append((_canonical(payload), ""))
+            expected.append(False)
+    return secret, items, expected
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_verify_many(workers):
+    secret, items, expected = _batch()
+    assert verify_many(items, secret, workers=workers, chunk_size=3) == expected
+    assert [verify_signature(body, sig, secret) for body, sig in items] == expected
+
+
+def test_verify_many_process_pool(monkeypatch):
+    from concurrent.futures import ProcessPoolExecutor
+
+    from facevault import webhook
+
+    monkeypatch.setattr(webhook, "_PROCESS_MIN_ITEMS", 1)
+    secret, items, expected = _batch()
+    assert verify_many(items, secret, workers=2, chunk_size=4) == expected
+
+    with ProcessPoolExecutor(2) as pool:
+        assert verify_many(iter(items), secret, process_pool=pool) == expected
+
+
+def test_verify_many_empty():
+    assert verify_many([], "secret") == []
+    with pytest.raises(ValueError):
+        verify_many([], "secret", chunk_size=0)